@@ -0,0 +1,7 @@
+"""Benchmark suite for the API and ML hot paths.
+
+    python -m benchmarks run [--suite micro|load] [--quick] [-o results.json]
+    python -m benchmarks compare baseline.json results.json
+
+See benchmarks/README.md.
+"""
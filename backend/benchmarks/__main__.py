@@ -0,0 +1,79 @@
+"""Run the benchmark suite or compare two result files."""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+
+def _isolate_state() -> None:
+    """Point the app's on-disk caches and stores at a fresh directory, so runs start cold and leave nothing behind."""
+    state = tempfile.mkdtemp(prefix="benchmarks-")
+    for name, filename in (
+        ("CACHE_DB_PATH", "result_cache.sqlite"),
+        ("CHAT_MEMORY_DB_PATH", "chat_memory.sqlite"),
+        ("PIPELINE_DB_PATH", "pipeline.sqlite"),
+        ("ANN_INDEX_DIR", "semantic_index"),
+    ):
+        os.environ.setdefault(name, os.path.join(state, filename))
+
+
+def run(args) -> int:
+    _isolate_state()
+    # Imported after the environment is set: settings are read at import time
+    from . import load, micro
+    from .harness import environment
+
+    results = []
+    if args.suite in ("all", "micro"):
+        results += micro.run(quick=args.quick)
+    if args.suite in ("all", "load"):
+        results += load.run(quick=args.quick)
+    report = {"environment": {**environment(), "quick": args.quick}, "results": results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def compare(args) -> int:
+    from .harness import compare as compare_runs
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare_runs(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['change']:+8.1%}  {row['metric']:<7} {row['baseline']:>10.3f} -> {row['current']:>10.3f}  {row['benchmark']}  {flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} regression(s) over {args.threshold:.0%} in {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks and write JSON results")
+    run_parser.add_argument("--suite", choices=["all", "micro", "load"], default="all")
+    run_parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast smoke run")
+    run_parser.add_argument("-o", "--output", help="file to write the JSON to (default: stdout)")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files; exits 1 on regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts (default 0.2)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
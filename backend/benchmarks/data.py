@@ -0,0 +1,69 @@
+"""Seeded synthetic jobs, resumes and candidates, so every run measures the same inputs."""
+import random
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+from src.ml.skill_taxonomy import TAXONOMY
+
+SKILLS = [skill for group in TAXONOMY.values() for skill in group]
+LOCATIONS = ["Remote", "London", "New York", "Berlin", "Bangalore", "Singapore", "Toronto", "Paris"]
+TITLES = ["Engineer", "Developer", "Data Scientist", "Analyst", "Architect", "Product Manager", "Designer"]
+FILLER = (
+    "delivered designed built led improved migrated maintained scalable reliable services for customers across "
+    "teams using modern tooling and best practices in production environments with ownership of roadmap quality "
+    "performance security testing documentation mentoring stakeholders"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(FILLER) for _ in range(words)).capitalize() + "."
+
+
+def jobs(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        skills = rng.sample(SKILLS, rng.randint(2, 6))
+        result.append({
+            "title": f"{skills[0].title()} {rng.choice(TITLES)}",
+            "description": " ".join(_sentence(rng, rng.randint(10, 20)) for _ in range(5)) + " " + ", ".join(skills),
+            "location": rng.choice(LOCATIONS),
+            "skills_required": skills,
+        })
+    return result
+
+
+def resume_text(seed: int, pages: int = 1) -> List[str]:
+    """Pages of resume text with the usual sections and a mix of skills."""
+    rng = random.Random(seed)
+    result = []
+    for page in range(pages):
+        lines = [f"Candidate {seed}", f"candidate{seed}@example.com"] if page == 0 else []
+        for heading in ("Experience", "Projects", "Education", "Certifications", "Skills"):
+            lines.append(heading)
+            for _ in range(rng.randint(3, 6)):
+                lines.append(f"{_sentence(rng, rng.randint(8, 16))} {', '.join(rng.sample(SKILLS, 3))}")
+        result.append("\n".join(lines))
+    return result
+
+
+def resume_pdf(seed: int, pages: int = 1) -> bytes:
+    with fitz.open() as doc:
+        for text in resume_text(seed, pages):
+            doc.new_page().insert_text((40, 40), text, fontsize=7)
+        return doc.tobytes()
+
+
+def candidates(count: int, job_ids: List[str], seed: int = 0) -> List[Dict]:
+    """Scored candidate-job pairs, as fed to the shortlister."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"candidate{i}@example.com",
+            "job_id": rng.choice(job_ids),
+            "match_score": rng.random(),
+            "skills": rng.sample(SKILLS, rng.randint(2, 8)),
+        }
+        for i in range(count)
+    ]
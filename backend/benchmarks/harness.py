@@ -0,0 +1,106 @@
+"""Timing, result records and comparison between runs."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def summarize(samples_ms: Iterable[float]) -> Dict[str, float]:
+    samples = np.asarray(list(samples_ms), dtype=np.float64)
+    return {
+        "n": int(len(samples)),
+        "mean_ms": round(float(samples.mean()), 4),
+        "min_ms": round(float(samples.min()), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "max_ms": round(float(samples.max()), 4),
+    }
+
+
+def _done(rounds: int, elapsed: float, min_rounds: int, min_time: float, max_rounds: int) -> bool:
+    return rounds >= max_rounds or (rounds >= min_rounds and elapsed >= min_time)
+
+
+def measure(fn: Callable[[], object], min_rounds: int = 5, min_time: float = 0.5, max_rounds: int = 1000) -> Dict:
+    """Call ``fn`` once to warm up, then until it has run ``min_rounds`` times and for ``min_time`` seconds."""
+    fn()
+    samples = []
+    started = time.perf_counter()
+    while not _done(len(samples), time.perf_counter() - started, min_rounds, min_time, max_rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def measure_async(fn: Callable[[], Awaitable], min_rounds: int = 5, min_time: float = 0.5,
+                        max_rounds: int = 1000) -> Dict:
+    await fn()
+    samples = []
+    started = time.perf_counter()
+    while not _done(len(samples), time.perf_counter() - started, min_rounds, min_time, max_rounds):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def result(suite: str, name: str, params: Dict, stats: Dict, **extra) -> Dict:
+    return {"suite": suite, "name": name, "params": params, "stats": {**stats, **extra}}
+
+
+def environment() -> Dict:
+    """Where and on what the numbers were taken, so runs on different machines aren't compared blindly."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _key(entry: Dict) -> str:
+    return f"{entry['suite']}:{entry['name']}:{json.dumps(entry['params'], sort_keys=True)}"
+
+
+# Lower is better for every compared metric
+COMPARED_METRICS = ("p50_ms", "p95_ms")
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    """Per benchmark and metric, the relative change from ``baseline``; ``regression`` when slower by more than ``threshold``."""
+    before = {_key(entry): entry for entry in baseline["results"]}
+    rows = []
+    for entry in current["results"]:
+        old: Optional[Dict] = before.get(_key(entry))
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            was, now = old["stats"].get(metric), entry["stats"].get(metric)
+            if not was or now is None:
+                continue
+            change = (now - was) / was
+            rows.append({
+                "benchmark": _key(entry),
+                "metric": metric,
+                "baseline": was,
+                "current": now,
+                "change": round(change, 4),
+                "regression": change > threshold,
+            })
+    return rows
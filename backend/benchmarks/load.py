@@ -0,0 +1,162 @@
+"""End-to-end load scenarios: the FastAPI app in-process against mongomock-motor.
+
+Requests go through httpx's ASGI transport, so routing, validation,
+dependencies, the process/thread pools and serialization are all measured;
+only the network and a real MongoDB are not.
+"""
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List
+
+from . import data
+from .harness import result, summarize
+
+SIZES = {
+    "full": {"jobs": 5000, "users": 100, "requests": 500, "uploads": 200, "concurrency": 32},
+    "quick": {"jobs": 1000, "users": 20, "requests": 200, "uploads": 40, "concurrency": 8},
+}
+
+
+async def drive(send: Callable[[int], Awaitable], requests: int, concurrency: int, warmup: int = 0) -> Dict:
+    """Issue ``requests`` calls of ``send(i)`` from ``concurrency`` concurrent clients.
+
+    The first ``warmup`` calls run one at a time and aren't measured (pools
+    starting, caches filling).
+    """
+    for i in range(warmup):
+        await send(i)
+    latencies, statuses = [], Counter()
+    indexes = iter(range(warmup, warmup + requests))
+
+    async def client():
+        for i in indexes:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(latencies),
+        "requests_per_second": round(requests / elapsed, 1),
+        "statuses": dict(statuses),
+    }
+
+
+async def _seed(db, sizes: Dict) -> List[Dict]:
+    """Jobs (with their skill index) and candidate users with profiles; returns the users."""
+    from datetime import datetime
+
+    from src.services.skill_index import rebuild_skill_index
+    from src.utils.password_hasher import password_hasher
+
+    jobs = data.jobs(sizes["jobs"])
+    for i, job in enumerate(jobs):
+        job["posted_by"] = f"recruiter{i % 50}@example.com"
+        job["updated_at"] = datetime.now()
+    await db["jobs"].insert_many(jobs)
+    await rebuild_skill_index(db)
+
+    users = [
+        {"email": f"candidate{i}@example.com", "password": f"password-{i}", "skills": data.jobs(1, seed=i)[0]["skills_required"]}
+        for i in range(sizes["users"])
+    ]
+    slots = asyncio.Semaphore(password_hasher.max_workers)  # stay clear of the hasher's bounded queue
+
+    async def hash_password(password: str) -> str:
+        async with slots:
+            return await password_hasher.hash(password)
+
+    hashes = await asyncio.gather(*(hash_password(user["password"]) for user in users))
+    await db["users"].insert_many([
+        {"email": user["email"], "hashed_password": hashed, "role": "candidate"} for user, hashed in zip(users, hashes)
+    ])
+    await db["candidates"].insert_many([{"email": user["email"], "skills": user["skills"]} for user in users])
+    return users
+
+
+async def _run(quick: bool) -> List[Dict]:
+    import httpx
+    from mongomock_motor import AsyncMongoMockClient
+
+    import src.main as main
+    from src.database import mongo
+    from src.services.job_search import job_search
+    from src.utils.jwt_handler import create_access_token
+
+    sizes = SIZES["quick" if quick else "full"]
+    concurrency, requests = sizes["concurrency"], sizes["requests"]
+    mongo.connect(AsyncMongoMockClient())
+    results = []
+    async with main.app.router.lifespan_context(main.app):
+        db = mongo.get_db()
+        users = await _seed(db, sizes)
+        await job_search.index(db)
+        auth = [{"Authorization": f"Bearer {create_access_token({'sub': u['email'], 'role': 'candidate'})}"} for u in users]
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+
+            def login(i):
+                # Every user logs in once: each request pays for one bcrypt verification
+                user = users[i % len(users)]
+                return client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+
+            warmup = min(concurrency, len(users) // 4)
+            stats = await drive(login, len(users) - warmup, concurrency, warmup=warmup)
+            results.append(result("load", "POST /auth/login", {"concurrency": concurrency, "users": len(users)}, stats))
+
+            # Distinct PDFs, so every upload is extracted rather than served from the content cache
+            pdfs = [data.resume_pdf(seed=i, pages=2) for i in range(sizes["uploads"] + 2)]
+
+            def upload(i):
+                return client.post(
+                    "/resume/upload", files={"file": (f"resume{i}.pdf", pdfs[i], "application/pdf")}, headers=auth[i % len(auth)]
+                )
+
+            stats = await drive(upload, sizes["uploads"], concurrency, warmup=2)
+            results.append(result("load", "POST /resume/upload", {"concurrency": concurrency, "pages": 2}, stats))
+
+            def match(i):
+                return client.get("/match/", params={"limit": 20}, headers=auth[i % len(auth)])
+
+            stats = await drive(match, requests, concurrency, warmup=1)
+            results.append(result("load", "GET /match/", {"concurrency": concurrency, "jobs": sizes["jobs"]}, stats))
+
+            # Follow the cursor chain once, then have clients read those pages in turn
+            cursors, cursor = [None], None
+            while len(cursors) < 50:
+                page = (await client.get("/match/jobs", params={"cursor": cursor} if cursor else {}, headers=auth[0])).json()
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+                cursors.append(cursor)
+
+            def listing(i):
+                cursor = cursors[i % len(cursors)]
+                return client.get("/match/jobs", params={"cursor": cursor} if cursor else {}, headers=auth[i % len(auth)])
+
+            stats = await drive(listing, requests, concurrency, warmup=1)
+            results.append(result("load", "GET /match/jobs", {"concurrency": concurrency, "jobs": sizes["jobs"]}, stats))
+
+            queries = [" ".join(job["skills_required"][:2]) for job in data.jobs(100, seed=1)]
+
+            def search(i):
+                params = {"q": queries[i % len(queries)]}
+                if i % 3 == 0:
+                    params["location"] = data.LOCATIONS[i % len(data.LOCATIONS)]
+                return client.get("/match/search", params=params, headers=auth[i % len(auth)])
+
+            stats = await drive(search, requests, concurrency, warmup=1)
+            results.append(result("load", "GET /match/search", {"concurrency": concurrency, "jobs": sizes["jobs"]}, stats))
+    mongo.close()
+    return results
+
+
+def run(quick: bool = False) -> List[Dict]:
+    return asyncio.run(_run(quick))
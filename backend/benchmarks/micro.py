@@ -0,0 +1,116 @@
+"""Micro-benchmarks of the ML and matching hot paths across growing input sizes."""
+import asyncio
+import os
+import pickle
+import tempfile
+from typing import Dict, List
+
+from . import data
+from .harness import measure, measure_async, result
+
+SIZES = {
+    "full": {
+        "job_matcher": [100, 1000, 10_000],
+        "resume_pages": [1, 4, 16],
+        "shortlist": [1000, 10_000, 100_000],
+        "skill_match": [1000, 10_000, 50_000],
+    },
+    "quick": {
+        "job_matcher": [100, 1000],
+        "resume_pages": [1, 4],
+        "shortlist": [1000, 10_000],
+        "skill_match": [1000],
+    },
+}
+
+
+def _fit_vectorizer(path: str) -> None:
+    """A TF-IDF model fitted on the synthetic jobs, so results don't depend on the deployed model."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(stop_words="english").fit(job["description"] for job in data.jobs(2000, seed=99))
+    with open(path, "wb") as f:
+        pickle.dump(vectorizer, f)
+
+
+def job_matcher(sizes: List[int]) -> List[Dict]:
+    """JobMatcher.match with the descriptions passed in (vectorized per call) and against a prebuilt index."""
+    from src.ml.job_matcher import JobMatcher
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "model.pkl")
+        _fit_vectorizer(model_path)
+        matcher = JobMatcher(model_path)
+    resume = "\n".join(data.resume_text(0, pages=2))
+    results = []
+    for size in sizes:
+        descriptions = [job["description"] for job in data.jobs(size)]
+        stats = measure(lambda: matcher.match(resume, descriptions, top_k=10), min_rounds=3)
+        results.append(result("micro", "job_matcher.match", {"jobs": size}, stats))
+        matcher.set_jobs([str(i) for i in range(size)], descriptions)
+        stats = measure(lambda: matcher.match(resume, top_k=10))
+        results.append(result("micro", "job_matcher.match_indexed", {"jobs": size}, stats))
+    return results
+
+
+def parse_resume(pages: List[int]) -> List[Dict]:
+    from src.ml.cv_parser import parse_resume
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in pages:
+            path = os.path.join(tmp, f"resume-{count}.pdf")
+            with open(path, "wb") as f:
+                f.write(data.resume_pdf(seed=count, pages=count))
+            stats = measure(lambda: parse_resume(path))
+            results.append(result(
+                "micro", "cv_parser.parse_resume", {"pages": count}, stats,
+                pages_per_second=round(count / (stats["p50_ms"] / 1000), 1),
+            ))
+    return results
+
+
+def shortlist(sizes: List[int]) -> List[Dict]:
+    from src.services.shortlisting import shortlist_candidates
+
+    job_ids = [f"job{i}" for i in range(20)]
+    results = []
+    for size in sizes:
+        candidates = data.candidates(size, job_ids)
+        stats = measure(lambda: shortlist_candidates(candidates, min_score=0.5, top_k=10), min_rounds=3)
+        results.append(result("micro", "shortlisting.shortlist_candidates", {"candidates": size}, stats))
+    return results
+
+
+async def _skill_match(sizes: List[int]) -> List[Dict]:
+    from mongomock_motor import AsyncMongoMockClient
+    from src.services.skill_index import match_job_ids, rebuild_skill_index
+
+    skills = data.SKILLS[:6]
+    results = []
+    for size in sizes:
+        db = AsyncMongoMockClient()["benchmarks"]
+        await db["jobs"].insert_many(data.jobs(size))
+        await rebuild_skill_index(db)
+        stats = await measure_async(lambda: match_job_ids(db, skills, limit=20), min_rounds=3)
+        results.append(result("micro", "skill_index.match_job_ids", {"jobs": size, "skills": len(skills)}, stats))
+    return results
+
+
+def skill_match(sizes: List[int]) -> List[Dict]:
+    """The skill-intersection ranking behind GET /match/, over posting lists in mongomock.
+
+    mongomock's own overhead is included, so compare these between runs
+    rather than with a real MongoDB.
+    """
+    return asyncio.run(_skill_match(sizes))
+
+
+def run(quick: bool = False) -> List[Dict]:
+    sizes = SIZES["quick" if quick else "full"]
+    return [
+        *job_matcher(sizes["job_matcher"]),
+        *parse_resume(sizes["resume_pages"]),
+        *shortlist(sizes["shortlist"]),
+        *skill_match(sizes["skill_match"]),
+    ]
@@ -4,6 +4,9 @@ from pydantic_settings import BaseSettings
 
 load_dotenv()  # Load environment variables from .env file
 
+# backend/, so default data file locations don't depend on the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings(BaseSettings):
     # Application settings
     APP_NAME: str = "AI Recruitment Platform"
@@ -12,17 +15,142 @@ class Settings(BaseSettings):
     # MongoDB settings
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     MONGO_DB_NAME: str = os.getenv("MONGO_DB_NAME", "recruitment_db")
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60_000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5_000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5_000))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5_000))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30_000))
+    MONGO_READ_PREFERENCE: str = os.getenv("MONGO_READ_PREFERENCE", "primary")
 
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your_secret_key_here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 60 * 24 * 14))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+    CREDENTIAL_CACHE_SIZE: int = int(os.getenv("CREDENTIAL_CACHE_SIZE", 10_000))
+    CREDENTIAL_CACHE_TTL_SECONDS: int = int(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", 60))
 
     # Email settings (optional)
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", 587))
     SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_START_TLS: bool = os.getenv("SMTP_START_TLS", "true").lower() == "true"
+    SMTP_TIMEOUT_SECONDS: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", 30))
+    EMAIL_FROM: str = os.getenv("EMAIL_FROM", "no-reply@example.com")
+
+    # Outbound email queue (sent only when SMTP_SERVER is set)
+    EMAIL_CONNECTIONS: int = int(os.getenv("EMAIL_CONNECTIONS", 4))
+    EMAIL_RATE_PER_SECOND: float = float(os.getenv("EMAIL_RATE_PER_SECOND", 10))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_RETRY_BASE_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+    EMAIL_LEASE_SECONDS: float = float(os.getenv("EMAIL_LEASE_SECONDS", 300))
+    EMAIL_POLL_SECONDS: float = float(os.getenv("EMAIL_POLL_SECONDS", 2))
+
+    # Interview scheduling
+    INTERVIEW_SLOT_MINUTES: int = int(os.getenv("INTERVIEW_SLOT_MINUTES", 30))
+    INTERVIEW_DAY_START_HOUR: int = int(os.getenv("INTERVIEW_DAY_START_HOUR", 9))
+    INTERVIEW_DAY_END_HOUR: int = int(os.getenv("INTERVIEW_DAY_END_HOUR", 17))
+    INTERVIEW_HORIZON_DAYS: int = int(os.getenv("INTERVIEW_HORIZON_DAYS", 14))
+
+    # JD summarization micro-batching
+    SUMMARY_MAX_BATCH_SIZE: int = int(os.getenv("SUMMARY_MAX_BATCH_SIZE", 8))
+    SUMMARY_MAX_WAIT_MS: int = int(os.getenv("SUMMARY_MAX_WAIT_MS", 25))
+    SUMMARY_MAX_QUEUE: int = int(os.getenv("SUMMARY_MAX_QUEUE", 256))
+
+    # Result cache for JD summaries and resume parses
+    CACHE_DB_PATH: str = os.getenv("CACHE_DB_PATH", os.path.join(BACKEND_DIR, "data", "result_cache.sqlite"))
+    CACHE_MEMORY_SIZE: int = int(os.getenv("CACHE_MEMORY_SIZE", 512))
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    CACHE_MAX_ROWS: int = int(os.getenv("CACHE_MAX_ROWS", 100_000))
+
+    # PDF extraction process pool
+    PDF_BACKEND: str = os.getenv("PDF_BACKEND", "pdfplumber")  # "pdfplumber" or "pymupdf"
+    PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", 2))
+    PDF_MAX_PENDING: int = int(os.getenv("PDF_MAX_PENDING", 16))
+    PDF_TIMEOUT_SECONDS: float = float(os.getenv("PDF_TIMEOUT_SECONDS", 20))
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", 20))
+
+    # Bulk resume ingestion
+    BULK_MAX_FILES: int = int(os.getenv("BULK_MAX_FILES", 10_000))
+    BULK_MAX_FILE_BYTES: int = int(os.getenv("BULK_MAX_FILE_BYTES", 10 * 1024 * 1024))
+    BULK_INSERT_BATCH_SIZE: int = int(os.getenv("BULK_INSERT_BATCH_SIZE", 100))
+
+    # Agent pipeline (python -m src.services.pipeline)
+    PIPELINE_DB_PATH: str = os.getenv("PIPELINE_DB_PATH", "pipeline.sqlite")
+    PIPELINE_PARSE_CONCURRENCY: int = int(os.getenv("PIPELINE_PARSE_CONCURRENCY", 8))
+    PIPELINE_MATCH_BATCH_SIZE: int = int(os.getenv("PIPELINE_MATCH_BATCH_SIZE", 64))
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", 128))
+
+    # Semantic (ANN) retrieval
+    ANN_INDEX_DIR: str = os.getenv("ANN_INDEX_DIR", "semantic_index")
+    ANN_DIM: int = int(os.getenv("ANN_DIM", 128))
+    ANN_NLIST: int = int(os.getenv("ANN_NLIST", 1024))
+    ANN_NPROBE: int = int(os.getenv("ANN_NPROBE", 16))
+    ANN_RERANK_FACTOR: int = int(os.getenv("ANN_RERANK_FACTOR", 4))
+
+    # Job listing response cache (GET /match/jobs, GET /recruiter/jobs)
+    JOB_LIST_CACHE_SIZE: int = int(os.getenv("JOB_LIST_CACHE_SIZE", 1024))
+    JOB_LIST_CACHE_TTL_SECONDS: float = float(os.getenv("JOB_LIST_CACHE_TTL_SECONDS", 5))
+
+    # Job search (GET /match/search)
+    JOB_SEARCH_REFRESH_SECONDS: float = float(os.getenv("JOB_SEARCH_REFRESH_SECONDS", 5))  # pick up other workers' writes
+    JOB_SEARCH_TITLE_WEIGHT: float = float(os.getenv("JOB_SEARCH_TITLE_WEIGHT", 3))  # a title term counts this many times
+    JOB_SEARCH_FACET_SIZE: int = int(os.getenv("JOB_SEARCH_FACET_SIZE", 10))  # values returned per facet
+
+    # Recruiter-side candidate ranking
+    RANKING_BATCH_SIZE: int = int(os.getenv("RANKING_BATCH_SIZE", 500))
+    RANKING_RESCORE_CONCURRENCY: int = int(os.getenv("RANKING_RESCORE_CONCURRENCY", 2))  # background rescores at once
+
+    # Change-stream match worker
+    MATCH_MIN_SCORE: float = float(os.getenv("MATCH_MIN_SCORE", 0.1))
+    MATCH_WORKER_BATCH_SIZE: int = int(os.getenv("MATCH_WORKER_BATCH_SIZE", 500))
+    MATCH_CHANGE_LOG: bool = os.getenv("MATCH_CHANGE_LOG", "false").lower() == "true"  # feed `match_worker --poll`
+    MATCH_CHANGE_LOG_TTL_HOURS: float = float(os.getenv("MATCH_CHANGE_LOG_TTL_HOURS", 72))  # unread events expire
+    MATCH_CHANGE_LOG_OVERLAP_SECONDS: float = float(os.getenv("MATCH_CHANGE_LOG_OVERLAP_SECONDS", 10))  # > clock skew
+
+    # LLM gateway (chatbot, interview questions)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openai")  # "openai" (or any compatible server) or "anthropic"
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+    LLM_API_KEY: str = os.getenv("LLM_API_KEY", os.getenv("OPENAI_API_KEY", ""))
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 32))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 32))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+
+    # WebSocket chat
+    CHAT_MAX_CONNECTIONS: int = int(os.getenv("CHAT_MAX_CONNECTIONS", 5000))  # per worker
+    CHAT_SEND_QUEUE_SIZE: int = int(os.getenv("CHAT_SEND_QUEUE_SIZE", 64))  # frames buffered per connection
+    CHAT_SEND_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_SEND_TIMEOUT_SECONDS", 10))
+    CHAT_HEARTBEAT_SECONDS: float = float(os.getenv("CHAT_HEARTBEAT_SECONDS", 20))
+    CHAT_HEARTBEAT_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_HEARTBEAT_TIMEOUT_SECONDS", 60))
+    CHAT_IDLE_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_IDLE_TIMEOUT_SECONDS", 30 * 60))
+    CHAT_MAX_MESSAGE_CHARS: int = int(os.getenv("CHAT_MAX_MESSAGE_CHARS", 4000))
+
+    # Long-term chat memory
+    CHAT_MEMORY_DB_PATH: str = os.getenv("CHAT_MEMORY_DB_PATH", os.path.join(BACKEND_DIR, "data", "chat_memory.sqlite"))
+    CHAT_MEMORY_MAX_CHARS: int = int(os.getenv("CHAT_MEMORY_MAX_CHARS", 8000))  # summary + recent turns
+    CHAT_MEMORY_KEEP_TURNS: int = int(os.getenv("CHAT_MEMORY_KEEP_TURNS", 4))
+    CHAT_SUMMARY_MAX_CHARS: int = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", 1500))
+    CHAT_MEMORY_MAX_SESSIONS: int = int(os.getenv("CHAT_MEMORY_MAX_SESSIONS", 100_000))
+
+    # Metrics (GET /metrics) and slow-request profiling
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", 0.5))
+    PROFILE_SLOW_REQUEST_MS: float = float(os.getenv("PROFILE_SLOW_REQUEST_MS", 0))  # 0 = profiler off
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
 
     # OAuth2 settings
     OAUTH2_TOKEN_URL: str = "/api/auth/token"
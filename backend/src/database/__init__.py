@@ -1,4 +1,4 @@
 # Makes database a Python package
-from .mongo import get_database
+from .mongo import close, connect, get_database, get_db
 
-__all__ = ["get_database"]
+__all__ = ["close", "connect", "get_database", "get_db"]
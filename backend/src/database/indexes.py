@@ -0,0 +1,108 @@
+import logging
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Declarative index definitions, created idempotently at startup. Every query
+# a route issues should be served by one of these; query_plans.py checks it.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "candidates": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "jobs": [
+        # Recruiter job listing: filter by poster, page newest first by _id
+        IndexModel([("posted_by", ASCENDING), ("_id", DESCENDING)], name="posted_by_id"),
+        # Job search catching up on jobs written by other workers
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "resumes": [
+        IndexModel([("email", ASCENDING), ("uploaded_at", DESCENDING)], name="email_uploaded_at"),
+        IndexModel([("content_hash", ASCENDING)], name="content_hash"),
+    ],
+    "applications": [
+        IndexModel([("job_id", ASCENDING), ("email", ASCENDING)], name="job_id_email_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "matches": [
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("email", ASCENDING), ("score", DESCENDING)], name="email_score"),
+        IndexModel(
+            [("job_id", ASCENDING), ("email", ASCENDING)],
+            name="job_id_email_unique",
+            unique=True,
+            partialFilterExpression={"job_id": {"$exists": True}},
+        ),
+        IndexModel([("candidate_id", ASCENDING)], name="candidate_id", sparse=True),
+    ],
+    "interviews": [
+        IndexModel([("recruiter_email", ASCENDING), ("start", ASCENDING)], name="recruiter_email_start_unique", unique=True),
+        IndexModel([("job_id", ASCENDING), ("candidate_email", ASCENDING)], name="job_id_candidate_email"),
+        IndexModel([("candidate_email", ASCENDING), ("start", ASCENDING)], name="candidate_email_start"),
+    ],
+    "interview_slots": [
+        # One reservation per recruiter and slot, so overlapping bookings from two processes clash
+        IndexModel([("recruiter_email", ASCENDING), ("start", ASCENDING)], name="recruiter_email_start_unique", unique=True),
+        IndexModel([("interview_id", ASCENDING)], name="interview_id"),
+    ],
+    "email_outbox": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+    ],
+    "change_log": [
+        # Events the polling match worker never read don't pile up forever
+        IndexModel(
+            [("logged_at", ASCENDING)],
+            name="logged_at_ttl",
+            expireAfterSeconds=int(settings.MATCH_CHANGE_LOG_TTL_HOURS * 3600),
+        ),
+    ],
+    "job_skill_index": [
+        # One posting per (skill, job): matching reads by skill, unindexing by both
+        IndexModel([("skill", ASCENDING), ("job_id", ASCENDING)], name="skill_job_id_unique", unique=True),
+    ],
+    "candidate_scores": [
+        IndexModel(
+            [("job_id", ASCENDING), ("version", ASCENDING), ("email", ASCENDING)],
+            name="job_id_version_email_unique",
+            unique=True,
+        ),
+        IndexModel(
+            [("job_id", ASCENDING), ("version", ASCENDING), ("score", DESCENDING), ("email", ASCENDING)],
+            name="job_id_version_score_email",
+        ),
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+}
+
+# Indexes superseded by the definitions above, dropped at startup. A stale
+# unique index could reject writes the current layout relies on.
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    # Before rankings were versioned: one score per (job, candidate)
+    "candidate_scores": ["job_id_email_unique", "job_id_score_email"],
+}
+
+
+async def ensure_indexes(db) -> None:
+    """Drop obsolete indexes and create every declared one. Already existing indexes are a no-op for MongoDB.
+
+    A failure on one collection (e.g. duplicate emails blocking a unique index)
+    is logged and doesn't stop the others or the app from starting.
+    """
+    for collection, names in OBSOLETE_INDEXES.items():
+        try:
+            existing = await db[collection].index_information()
+            for name in names:
+                if name in existing:
+                    await db[collection].drop_index(name)
+        except OperationFailure as e:
+            logger.error("Could not drop obsolete indexes on %s: %s", collection, e)
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error("Could not create indexes on %s: %s", collection, e)
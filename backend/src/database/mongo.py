@@ -1,22 +1,50 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from ..config import settings
-from fastapi import Depends
+from ..utils.metrics import command_metrics
 
-# Initialize MongoDB client
-client = AsyncIOMotorClient(settings.MONGO_URI)
+# One Motor client per process. It owns the connection pool, so it is created
+# once in the app lifespan (or by a worker/CLI entry point) and shared by
+# every request instead of being built at import time.
+_client: Optional[AsyncIOMotorClient] = None
 
-# Reference the database
-db = client[settings.MONGO_DB_NAME]
 
-# Collections (you can access them like db["users"], or use aliases below)
-users_collection = db["users"]
-jobs_collection = db["jobs"]
-applications_collection = db["applications"]
-resumes_collection = db["resumes"]
-matches_collection = db["matches"]
+def connect(client: Optional[AsyncIOMotorClient] = None) -> AsyncIOMotorClient:
+    """Create the process-wide client, or install ``client`` (e.g. an in-memory stand-in)."""
+    global _client
+    if _client is None:
+        _client = client or AsyncIOMotorClient(
+            settings.MONGO_URI,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+            socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+            readPreference=settings.MONGO_READ_PREFERENCE,
+            appname=settings.APP_NAME,
+            event_listeners=[command_metrics] if settings.METRICS_ENABLED else [],
+        )
+    return _client
+
+
+def close() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    if _client is None:
+        raise RuntimeError("MongoDB client is not connected; call database.mongo.connect() first")
+    return _client
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    return get_client()[settings.MONGO_DB_NAME]
+
 
 async def get_database():
-    try:
-        yield db
-    finally:
-        pass  # Connection is managed by FastAPI lifespan events
+    yield get_db()
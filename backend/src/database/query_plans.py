@@ -0,0 +1,99 @@
+"""Dev/CI check that every route query is served by an index.
+
+Runs ``explain`` on a representative form of each query the routes issue
+and fails if any winning plan contains a COLLSCAN::
+
+    python -m src.database.query_plans
+"""
+import asyncio
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from bson import ObjectId
+
+from . import mongo
+from .indexes import ensure_indexes
+
+
+class RouteQuery(NamedTuple):
+    route: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[Dict[str, int]] = None
+
+
+PROBE_EMAIL = "query-plan-probe@example.com"
+
+ROUTE_QUERIES: List[RouteQuery] = [
+    RouteQuery("POST /auth/register", "users", {"email": PROBE_EMAIL}),
+    RouteQuery("POST /auth/login", "users", {"email": PROBE_EMAIL}),
+    RouteQuery("GET /profile", "users", {"email": PROBE_EMAIL}),
+    RouteQuery("GET /candidate/profile", "candidates", {"email": PROBE_EMAIL}),
+    RouteQuery("POST /candidate/profile", "candidates", {"email": PROBE_EMAIL}),
+    RouteQuery("GET /recruiter/jobs", "jobs", {"posted_by": PROBE_EMAIL, "_id": {"$lt": ObjectId()}}, {"_id": -1}),
+    RouteQuery("GET /match/jobs", "jobs", {"_id": {"$lt": ObjectId()}}, {"_id": -1}),
+    RouteQuery("GET /match/search", "jobs", {"updated_at": {"$gte": datetime.now()}}),
+    RouteQuery("GET /match/search", "jobs", {"_id": {"$in": [ObjectId()]}}),
+    RouteQuery("GET /match/", "candidates", {"email": PROBE_EMAIL}),
+    RouteQuery("GET /match/", "job_skill_index", {"skill": {"$in": ["python", "docker"]}}),
+    RouteQuery("GET /match/", "jobs", {"_id": {"$in": [ObjectId()]}}),
+    RouteQuery("GET /resume/{resume_id}/file", "resumes", {"_id": ObjectId()}),
+    RouteQuery(
+        "GET /recruiter/job/{job_id}/ranking",
+        "candidate_scores",
+        {"job_id": ObjectId(), "version": ObjectId(), "score": {"$gte": 0.2}},
+        {"score": -1, "email": 1},
+    ),
+    RouteQuery("GET /match/top", "matches", {"email": PROBE_EMAIL, "job_id": {"$exists": True}}, {"score": -1}),
+    RouteQuery("GET /interview/", "interviews", {"recruiter_email": PROBE_EMAIL, "start": {"$gte": datetime.now()}}, {"start": 1}),
+    RouteQuery("GET /interview/", "interviews", {"candidate_email": PROBE_EMAIL, "start": {"$gte": datetime.now()}}, {"start": 1}),
+    RouteQuery("POST /candidate/profile", "candidate_scores", {"job_id": ObjectId(), "version": ObjectId(), "email": PROBE_EMAIL}),
+    RouteQuery("POST /resume/upload", "resumes", {"email": {"$in": [PROBE_EMAIL]}, "content": {"$exists": True}}, {"email": 1, "uploaded_at": -1}),
+]
+
+
+def plan_stages(plan: Dict[str, Any]):
+    """Yield every stage name in an explain plan tree."""
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def explain(db, query: RouteQuery) -> Dict[str, Any]:
+    command = {"find": query.collection, "filter": query.filter}
+    if query.sort:
+        command["sort"] = query.sort
+    return await db.command("explain", command, verbosity="queryPlanner")
+
+
+async def find_collection_scans(db) -> List[RouteQuery]:
+    scans = []
+    for query in ROUTE_QUERIES:
+        result = await explain(db, query)
+        winning_plan = result["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in plan_stages(winning_plan):
+            scans.append(query)
+    return scans
+
+
+async def main() -> int:
+    mongo.connect()
+    try:
+        db = mongo.get_db()
+        await ensure_indexes(db)
+        scans = await find_collection_scans(db)
+    finally:
+        mongo.close()
+    for query in scans:
+        print(f"COLLSCAN  {query.route}: {query.collection}.find({query.filter})")
+    print(f"{len(ROUTE_QUERIES) - len(scans)}/{len(ROUTE_QUERIES)} route queries use an index")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,15 +1,76 @@
-from fastapi import FastAPI, Depends
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from src.routes import auth, user, match, recruiter, candidate, resume
+from src.database import mongo
+from src.database.indexes import ensure_indexes
+from src.routes import auth, user, match, recruiter, candidate, resume, interview, chatbot
+from src.services.summarization import summarization_service
+from src.services.pdf_extraction import pdf_pool
+from src.services.email_outbox import OutboxSender
+from src.services.llm_gateway import llm_gateway
+from src.services.chat_hub import chat_hub
+from src.services.chat_memory import chat_memory
+from src.services.job_search import job_search
+from src.services.candidate_ranking import candidate_rescorer
+from src.services import content_cache
+from src.ml.model_registry import registry
+from src.config import settings
+from src.utils.password_hasher import password_hasher
+from src.utils import metrics
+from src.utils.profiler import SlowRequestProfiler
 from typing import List
 
 security = HTTPBearer()
 
+loop_lag = metrics.LoopLagMonitor(settings.EVENT_LOOP_LAG_INTERVAL_SECONDS)
+profiler = SlowRequestProfiler(
+    settings.PROFILE_SLOW_REQUEST_MS, settings.PROFILE_SAMPLE_INTERVAL_MS, settings.PROFILE_DIR
+) if settings.PROFILE_SLOW_REQUEST_MS > 0 else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mongo.connect()
+    await asyncio.to_thread(content_cache.store.open)
+    await asyncio.to_thread(chat_memory.store.open)
+    await ensure_indexes(mongo.get_db())
+    job_search.warm(mongo.get_db())
+    # Load the shared models now rather than on the first request that needs them
+    await asyncio.to_thread(registry.warm, "tfidf", "semantic_index")
+    if settings.METRICS_ENABLED:
+        loop_lag.start()
+        metrics.track_default_executor()
+        metrics.track_queue("pdf_extraction", lambda: pdf_pool.queue_depth)
+        metrics.track_queue("password_hashing", lambda: password_hasher.queue_depth)
+        metrics.track_queue("summarization", lambda: summarization_service.queue_depth)
+    if profiler:
+        profiler.start()
+    outbox = OutboxSender(mongo.get_db()) if settings.SMTP_SERVER else None
+    if outbox:
+        outbox.start()
+    yield
+    if outbox:
+        await outbox.aclose()
+    await chat_hub.aclose()
+    await candidate_rescorer.aclose()
+    await job_search.aclose()
+    await loop_lag.aclose()
+    if profiler:
+        profiler.stop()
+    await llm_gateway.aclose()
+    await summarization_service.aclose()
+    pdf_pool.shutdown()
+    password_hasher.shutdown()
+    content_cache.store.close()
+    chat_memory.store.close()
+    mongo.close()
+
 app = FastAPI(
     title="AI Recruitment Framework",
     description="This API powers job matching, candidate parsing, job posting, and more using AI-based tools.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS config
@@ -26,6 +87,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # Outermost, so the time includes every other middleware
+    app.add_middleware(metrics.MetricsMiddleware, profiler=profiler)
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
+
 # Include route files with proper tagging
 app.include_router(auth.router, tags=["Authentication"])
 app.include_router(user.router, tags=["User Management"])
@@ -33,6 +103,8 @@ app.include_router(match.router, tags=["AI Matching"])
 app.include_router(recruiter.router, tags=["Recruiter"])
 app.include_router(candidate.router, tags=["Candidate"])
 app.include_router(resume.router, tags=["Resume Processing"])
+app.include_router(interview.router, tags=["Interview Scheduling"])
+app.include_router(chatbot.router, tags=["Chatbot"])
 
 @app.get("/")
 def root():
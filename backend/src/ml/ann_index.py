@@ -0,0 +1,164 @@
+# ml/ann_index.py
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+
+class _InvertedList:
+    """Vectors of one IVF cell, in an array that grows by doubling."""
+
+    def __init__(self, dim: int, vectors: Optional[np.ndarray] = None, ids: Optional[List[str]] = None):
+        self.vectors = vectors if vectors is not None else np.empty((0, dim), dtype=np.float32)
+        self.ids = ids if ids is not None else []
+        self.size = len(self.ids)
+        self.live = np.ones(self.size, dtype=bool)
+
+    def append(self, item_id: str, vector: np.ndarray) -> int:
+        if self.size == len(self.vectors):
+            # Also moves a memory-mapped list into private memory on first insert
+            grown = np.empty((max(8, 2 * self.size), self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+            self.live = np.concatenate([self.live, np.zeros(len(grown) - len(self.live), dtype=bool)])
+        row = self.size
+        self.vectors[row] = vector
+        self.live[row] = True
+        self.ids.append(item_id)
+        self.size += 1
+        return row
+
+    def compact(self) -> None:
+        keep = np.flatnonzero(self.live[:self.size])
+        self.vectors = np.ascontiguousarray(self.vectors[keep])
+        self.ids = [self.ids[row] for row in keep]
+        self.size = len(self.ids)
+        self.live = np.ones(self.size, dtype=bool)
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index over cosine similarity.
+
+    Vectors are L2-normalized and assigned to the closest of ``nlist``
+    k-means centroids. A query scores the centroids, then scans only the
+    ``nprobe`` closest cells. Inserts append to a cell and deletes tombstone
+    the row, so both are O(1); tombstones are compacted on save. The index is
+    saved as .npy files and loaded memory-mapped.
+    """
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 8):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        self.lists = [_InvertedList(self.dim) for _ in range(len(self.centroids))]
+        self._where: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._where
+
+    def __iter__(self):
+        return iter(list(self._where))
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, nlist: int = 256, nprobe: int = 8, seed: int = 0) -> "IVFIndex":
+        """Learn the coarse quantizer from a sample of the vectors to be indexed."""
+        vectors = cls._normalize(vectors)
+        nlist = max(1, min(nlist, len(vectors)))
+        kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=seed, n_init=3, batch_size=4096).fit(vectors)
+        return cls(cls._normalize(kmeans.cluster_centers_), nprobe=nprobe)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert vectors; an id that is already present is replaced.
+
+        An id repeated within the batch is inserted once, with its last vector.
+        """
+        vectors = self._normalize(vectors)
+        last = {item_id: row for row, item_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids, vectors = [ids[row] for row in keep], vectors[keep]
+        self.remove([item_id for item_id in ids if item_id in self._where])
+        cells = np.argmax(vectors @ self.centroids.T, axis=1)
+        for item_id, cell, vector in zip(ids, cells, vectors):
+            row = self.lists[cell].append(item_id, vector)
+            self._where[item_id] = (int(cell), row)
+
+    def remove(self, ids: Sequence[str]) -> None:
+        for item_id in ids:
+            location = self._where.pop(item_id, None)
+            if location is not None:
+                cell, row = location
+                self.lists[cell].live[row] = False
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (id, cosine similarity) pairs, best first."""
+        query = self._normalize(query)[0]
+        nprobe = min(nprobe or self.nprobe, len(self.lists))
+        centroid_scores = self.centroids @ query
+        cells = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        ids, scores = [], []
+        for cell in cells:
+            inverted = self.lists[cell]
+            if inverted.size == 0:
+                continue
+            cell_scores = inverted.vectors[:inverted.size] @ query
+            live = np.flatnonzero(inverted.live[:inverted.size])
+            ids.extend(inverted.ids[row] for row in live)
+            scores.append(cell_scores[live])
+        if not ids:
+            return []
+        scores = np.concatenate(scores)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for inverted in self.lists:
+            inverted.compact()
+        offsets = np.cumsum([0] + [inverted.size for inverted in self.lists])
+        vectors = np.concatenate([inverted.vectors for inverted in self.lists]) if offsets[-1] else np.empty((0, self.dim), np.float32)
+        ids = [item_id for inverted in self.lists for item_id in inverted.ids]
+        np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+        np.save(os.path.join(directory, "vectors.npy"), vectors)
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        np.save(os.path.join(directory, "ids.npy"), np.array(ids, dtype=str))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"nprobe": self.nprobe}, f)
+        self._where = {
+            item_id: (cell, row)
+            for cell, inverted in enumerate(self.lists)
+            for row, item_id in enumerate(inverted.ids)
+        }
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode="r") -> "IVFIndex":
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        index = cls(np.load(os.path.join(directory, "centroids.npy")), nprobe=meta["nprobe"])
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mmap_mode)
+        offsets = np.load(os.path.join(directory, "offsets.npy"))
+        ids = np.load(os.path.join(directory, "ids.npy")).tolist()
+        for cell in range(len(index.lists)):
+            start, end = offsets[cell], offsets[cell + 1]
+            index.lists[cell] = _InvertedList(index.dim, vectors[start:end], ids[start:end])
+            for row, item_id in enumerate(ids[start:end]):
+                index._where[item_id] = (cell, row)
+        return index
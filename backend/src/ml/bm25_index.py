@@ -0,0 +1,337 @@
+# ml/bm25_index.py
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .skill_taxonomy import tokenize
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to we will with "
+    "you your who what which".split()
+)
+
+
+def terms(text: str) -> List[str]:
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+class _Growable:
+    """Append-only numpy array with amortized O(1) appends."""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, values) -> None:
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self.size + len(values)
+        if end > len(self._data):
+            grown = np.zeros(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:end] = values
+        self.size = end
+
+    def view(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    def replace(self, values: np.ndarray, copy: bool = True) -> None:
+        """Start over from ``values``; with ``copy=False`` they are used as is (until the next append) when the dtype matches."""
+        self._data = np.array(values, dtype=self._data.dtype) if copy else np.asarray(values, dtype=self._data.dtype)
+        self.size = len(values)
+
+
+class _Postings:
+    """One term's postings: doc slots and weighted term frequencies, plus appends not yet merged."""
+
+    __slots__ = ("slots", "tfs", "pending")
+
+    def __init__(self):
+        self.slots = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.float32)
+        self.pending: List[Tuple[int, float]] = []
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.pending:
+            slots, tfs = zip(*self.pending)
+            self.slots = np.concatenate([self.slots, np.asarray(slots, dtype=np.int32)])
+            self.tfs = np.concatenate([self.tfs, np.asarray(tfs, dtype=np.float32)])
+            self.pending = []
+        return self.slots, self.tfs
+
+
+class _Facet:
+    """(doc slot, value code) pairs for one keyword field; a doc can have several values."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+        self.docs = _Growable(np.int32)
+        self.value_codes = _Growable(np.int32)
+
+    def add(self, slot: int, values: Iterable[str]) -> None:
+        codes = []
+        for value in dict.fromkeys(values):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        if codes:
+            self.docs.append([slot] * len(codes))
+            self.value_codes.append(codes)
+
+    def mask(self, size: int, values: Iterable[str]) -> np.ndarray:
+        """Docs having any of ``values``."""
+        mask = np.zeros(size, dtype=bool)
+        codes = [self.codes[value] for value in values if value in self.codes]
+        if codes:
+            mask[self.docs.view()[np.isin(self.value_codes.view(), codes)]] = True
+        return mask
+
+    def counts(self, mask: np.ndarray, size: int) -> List[Tuple[str, int]]:
+        """The ``size`` most frequent values among the docs in ``mask``."""
+        if not self.values:
+            return []
+        counts = np.bincount(self.value_codes.view()[mask[self.docs.view()]], minlength=len(self.values))
+        top = np.argsort(-counts, kind="stable")[:size]
+        return [(self.values[code], int(counts[code])) for code in top if counts[code]]
+
+
+class BM25Index:
+    """In-memory inverted index with BM25 ranking, keyword filters and facet counts.
+
+    Documents have weighted text fields (a title term counts ``weight``
+    times) and keyword facet fields. Postings are numpy arrays, so a query
+    is scored, filtered and faceted with a handful of vectorized operations
+    over the postings of its terms rather than per-document Python.
+
+    Updates are incremental: ``add`` appends to the postings (merged into the
+    arrays the next time a term is searched) and ``remove`` tombstones the
+    document. Once a quarter of the slots are tombstones the arrays are
+    compacted. Document frequencies count tombstoned documents until then.
+    Searches and updates may come from different threads.
+    """
+
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, field_weights: Dict[str, float], facets: Iterable[str] = (), k1: float = 1.2, b: float = 0.75):
+        self.field_weights = field_weights
+        self.k1 = k1
+        self.b = b
+        self._ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._lengths = _Growable(np.float32)
+        self._live = _Growable(bool)
+        self._total_length = 0.0
+        self._postings: Dict[str, _Postings] = {}
+        self._facets = {name: _Facet() for name in facets}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    def add(self, doc_id: str, fields: Dict[str, str], facets: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        """Index a document; an id that is already indexed is replaced."""
+        weighted = Counter()
+        for field, weight in self.field_weights.items():
+            for term in terms(fields.get(field) or ""):
+                weighted[term] += weight
+        length = sum(weighted.values())
+        with self._lock:
+            self.remove(doc_id)
+            slot = len(self._ids)
+            self._ids.append(doc_id)
+            self._slots[doc_id] = slot
+            self._lengths.append([length])
+            self._live.append([True])
+            self._total_length += length
+            for term, tf in weighted.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.pending.append((slot, tf))
+            for name, facet in self._facets.items():
+                facet.add(slot, (facets or {}).get(name) or ())
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                return
+            self._live.view()[slot] = False
+            self._ids[slot] = None
+            self._total_length -= float(self._lengths.view()[slot])
+            if len(self._ids) - len(self._slots) > self.COMPACT_RATIO * len(self._ids):
+                self._compact()
+
+    def _compact(self) -> None:
+        live = self._live.view()
+        remap = np.cumsum(live, dtype=np.int64) - 1
+        for term in list(self._postings):
+            postings = self._postings[term]
+            slots, tfs = postings.arrays()
+            keep = live[slots]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            postings.slots = remap[slots[keep]].astype(np.int32)
+            postings.tfs = tfs[keep]
+        for facet in self._facets.values():
+            keep = live[facet.docs.view()]
+            facet.docs.replace(remap[facet.docs.view()[keep]])
+            facet.value_codes.replace(facet.value_codes.view()[keep])
+        self._lengths.replace(self._lengths.view()[live])
+        self._ids = [doc_id for doc_id in self._ids if doc_id is not None]
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+        self._live.replace(np.ones(len(self._ids), dtype=bool))
+
+    def flush(self) -> None:
+        """Merge pending appends now (e.g. after a bulk load) rather than on first search."""
+        with self._lock:
+            for postings in self._postings.values():
+                postings.arrays()
+
+    def _scores(self, query_terms: List[str], size: int) -> np.ndarray:
+        scores = np.zeros(size, dtype=np.float32)
+        docs = max(len(self._slots), 1)
+        lengths = self._lengths.view()
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(self._total_length / docs, 1e-9))
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            slots, tfs = postings.arrays()
+            df = len(slots)
+            idf = math.log(1 + (docs - df + 0.5) / (df + 0.5))
+            # A doc appears at most once per term, so fancy-index += is safe
+            scores[slots] += idf * tfs * (self.k1 + 1) / (tfs + norm[slots])
+        return scores
+
+    def search(
+        self,
+        query: str = "",
+        filters: Optional[Dict[str, Iterable[str]]] = None,
+        k: int = 20,
+        offset: int = 0,
+        facet_size: int = 10,
+    ) -> Dict:
+        """Rank documents matching ``query`` (any of its terms) and ``filters``.
+
+        Within a filter field the values are alternatives; different fields
+        must all match. Without query terms, matches are returned newest
+        first. Facet counts cover every match, not just the returned page.
+
+        :return: {"total": int, "hits": [(doc_id, score), ...], "facets": {field: [(value, count), ...]}}
+        """
+        query_terms = list(dict.fromkeys(terms(query)))
+        with self._lock:
+            size = len(self._ids)
+            mask = self._live.view().copy()
+            scores = None
+            if query_terms:
+                scores = self._scores(query_terms, size)
+                mask &= scores > 0
+            for name, values in (filters or {}).items():
+                values = list(values or ())
+                if values:
+                    mask &= self._facets[name].mask(size, values)
+            facets = {name: facet.counts(mask, facet_size) for name, facet in self._facets.items()}
+            matched = np.flatnonzero(mask)
+            end = offset + k
+            if scores is None:
+                page = matched[::-1][offset:end]
+                hits = [(self._ids[slot], 0.0) for slot in page]
+            else:
+                matched_scores = scores[matched]
+                if end < len(matched):
+                    top = np.argpartition(-matched_scores, end - 1)[:end]
+                else:
+                    top = np.arange(len(matched))
+                # Ties go to the newer document
+                top = top[np.lexsort((-matched[top], -matched_scores[top]))][offset:end]
+                hits = [(self._ids[matched[i]], float(matched_scores[i])) for i in top]
+        return {"total": int(len(matched)), "hits": hits, "facets": facets}
+
+
+def _synthetic_jobs(count: int, seed: int = 0):
+    """Job-like documents drawn from Zipf-distributed vocabulary, for the benchmark."""
+    from .skill_taxonomy import TAXONOMY
+
+    rng = np.random.default_rng(seed)
+    skills = [skill for group in TAXONOMY.values() for skill in group]
+    words = [f"w{i}" for i in range(20_000)] + skills
+    cumulative = np.cumsum(1 / np.arange(1, len(words) + 1) ** 1.1)
+    cumulative /= cumulative[-1]
+    locations = ["remote", "london", "new york", "berlin", "bangalore", "singapore", "toronto", "paris"] + [
+        f"city {i}" for i in range(200)
+    ]
+    titles = ["engineer", "developer", "analyst", "scientist", "manager", "designer", "architect", "intern"]
+    for i in range(count):
+        drawn = np.searchsorted(cumulative, rng.random(int(rng.integers(60, 200))))
+        body = " ".join(words[j] for j in drawn)
+        job_skills = list(rng.choice(skills, size=int(rng.integers(2, 7)), replace=False))
+        title = f"{rng.choice(job_skills)} {rng.choice(titles)}"
+        location = locations[min(int(rng.zipf(1.5)) - 1, len(locations) - 1)]
+        yield str(i), {"title": title, "description": f"{body} {' '.join(job_skills)}"}, {
+            "location": [location], "skills": job_skills,
+        }
+
+
+def benchmark(jobs: int = 100_000, queries: int = 2000, seed: int = 0) -> dict:
+    """Build time and search latency percentiles over synthetic jobs."""
+    import time
+
+    from .skill_taxonomy import TAXONOMY
+
+    docs = list(_synthetic_jobs(jobs, seed))
+    index = BM25Index({"title": 3.0, "description": 1.0}, facets=("location", "skills"))
+    start = time.perf_counter()
+    for doc_id, fields, facets in docs:
+        index.add(doc_id, fields, facets)
+    index.flush()
+    build = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed + 1)
+    skills = [skill for group in TAXONOMY.values() for skill in group]
+    vocabulary = [f"w{i}" for i in range(2000)] + skills
+    latencies = []
+    for i in range(queries):
+        query = " ".join(rng.choice(vocabulary, size=int(rng.integers(1, 4))))
+        filters = {}
+        if i % 3 == 0:
+            filters["location"] = ["remote"]
+        if i % 4 == 0:
+            filters["skills"] = list(rng.choice(skills, size=2, replace=False))
+        if i % 10 == 0:
+            query = ""  # filter-only browse
+        start = time.perf_counter()
+        index.search(query, filters, k=20)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if i % 50 == 0:  # interleave live updates with the queries
+            doc_id, fields, facets = next(_synthetic_jobs(1, seed + i + 7))
+            index.add(f"live-{i}", fields, facets)
+    latencies = np.array(latencies)
+    return {
+        "jobs": jobs,
+        "queries": queries,
+        "build_seconds": round(build, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+    }
+
+
+if __name__ == "__main__":
+    # python -m src.ml.bm25_index [jobs] [queries]
+    import json
+    import sys
+
+    print(json.dumps(benchmark(*(int(arg) for arg in sys.argv[1:3])), indent=2))
@@ -1,15 +1,153 @@
 # ml/cv_parser.py
+import re
+from typing import Dict, List
+
 import fitz  # PyMuPDF
 
-def parse_resume(file_path: str) -> dict:
-    text = ""
-    doc = fitz.open(file_path)
-    for page in doc:
-        text += page.get_text()
+from .skill_taxonomy import skill_matcher
+
+# Bump when the parse output changes, so cached parses from an older parser aren't served
+CV_PARSER_VERSION = 2
+
+# Section -> heading phrases that open it
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "professional summary", "objective", "about me", "career objective"],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "internships", "internship",
+    ],
+    "education": ["education", "academic background", "academics", "qualifications", "academic qualifications"],
+    "certifications": [
+        "certifications", "certification", "certificates", "licenses and certifications",
+        "licenses & certifications", "courses", "training",
+    ],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies"],
+    "projects": ["projects", "personal projects", "academic projects"],
+}
+
+_HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+# A heading is a short line on its own, optionally numbered or followed by a colon
+_HEADING = re.compile(r"^\W*(?:\d+[.)]\s*)?([a-z &]+?)\s*:?\s*$")
+_MAX_HEADING_CHARS = 40
+
+
+def segment_sections(text: str) -> Dict[str, str]:
+    """Split resume text into sections by recognised headings.
+
+    Text before the first heading is kept under ``header`` (usually name and
+    contact details). A section that appears twice is concatenated.
+    """
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped and len(stripped) <= _MAX_HEADING_CHARS:
+            heading = _HEADING.match(stripped.lower())
+            if heading and heading.group(1) in _HEADING_TO_SECTION:
+                current = _HEADING_TO_SECTION[heading.group(1)]
+                sections.setdefault(current, [])
+                continue
+        if stripped:
+            sections.setdefault(current, []).append(stripped)
+    return {section: "\n".join(lines) for section, lines in sections.items()}
 
-    # Example: crude extraction
-    skills = [word for word in text.split() if word.lower() in {"python", "java", "react", "docker"}]
+
+def extract_profile(text: str) -> dict:
+    """Structured fields from resume text: skills (by taxonomy category) and sections."""
+    sections = segment_sections(text)
+    skills = skill_matcher.extract(text)
     return {
         "full_text": text,
-        "extracted_skills": list(set(skills))
+        "extracted_skills": skills,
+        "skill_categories": skill_matcher.by_category(skills),
+        "sections": sections,
+        "education": sections.get("education", "").splitlines(),
+        "experience": sections.get("experience", "").splitlines(),
+        "certifications": sections.get("certifications", "").splitlines(),
     }
+
+
+def _parse_document(doc, max_pages=None) -> dict:
+    # One join instead of repeated +=, which copies the text once per page
+    text = "".join(page.get_text() for page in doc.pages(0, max_pages))
+    return extract_profile(text)
+
+
+def parse_resume(file_path: str) -> dict:
+    with fitz.open(file_path) as doc:
+        return _parse_document(doc)
+
+
+def parse_resume_bytes(data: bytes, max_pages=None) -> dict:
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return _parse_document(doc, max_pages)
+
+
+def _synthetic_resume(seed: int, pages: int) -> List[str]:
+    """Pages of plausible resume text with sections and a mix of skills."""
+    import random
+
+    rng = random.Random(seed)
+    skills = list(skill_matcher.categories)
+    filler = ("delivered designed built led improved migrated maintained scalable reliable services for customers "
+              "across teams using modern tooling and best practices in production environments").split()
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(filler) for _ in range(n)).capitalize() + "."
+
+    result = []
+    for page in range(pages):
+        lines = [f"Candidate {seed} candidate{seed}@example.com"] if page == 0 else []
+        for heading in ("Experience", "Projects", "Education", "Certifications", "Skills"):
+            lines.append(heading)
+            for _ in range(rng.randint(3, 6)):
+                lines.append(f"{sentence(rng.randint(8, 16))} {', '.join(rng.sample(skills, 3))} {sentence(6)}")
+        result.append("\n".join(lines))
+    return result
+
+
+def benchmark(resumes: int = 200, pages: int = 2) -> dict:
+    """Pages per second for text extraction plus parsing, and for parsing alone, on synthetic PDFs."""
+    import time
+
+    texts = [_synthetic_resume(seed, pages) for seed in range(resumes)]
+    pdfs = []
+    for resume in texts:
+        with fitz.open() as doc:
+            for page_text in resume:
+                doc.new_page().insert_text((40, 40), page_text, fontsize=7)
+            pdfs.append(doc.tobytes())
+
+    total_pages = resumes * pages
+    start = time.perf_counter()
+    for data in pdfs:
+        parse_resume_bytes(data)
+    end_to_end = time.perf_counter() - start
+
+    joined = ["".join(resume) for resume in texts]
+    start = time.perf_counter()
+    for text in joined:
+        extract_profile(text)
+    extraction = time.perf_counter() - start
+    return {
+        "resumes": resumes,
+        "pages": total_pages,
+        "pdf_pages_per_second": round(total_pages / end_to_end, 1),
+        "extraction_pages_per_second": round(total_pages / extraction, 1),
+    }
+
+
+if __name__ == "__main__":
+    # python -m src.ml.cv_parser resume.pdf          # print the parse
+    # python -m src.ml.cv_parser --bench [resumes] [pages_per_resume]
+    import json
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        print(json.dumps(benchmark(*(int(arg) for arg in sys.argv[2:4])), indent=2))
+    elif len(sys.argv) == 2:
+        parsed = parse_resume(sys.argv[1])
+        parsed.pop("full_text")
+        print(json.dumps(parsed, indent=2))
+    else:
+        sys.exit("usage: python -m src.ml.cv_parser RESUME.pdf | --bench [resumes] [pages_per_resume]")
@@ -0,0 +1,54 @@
+# ml/embeddings.py
+import os
+from typing import List
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .model_registry import read_vectorizer, save_vectorizer
+
+
+class TextEmbedder:
+    """Dense CPU text embeddings: TF-IDF projected onto a truncated SVD basis (LSA).
+
+    The projection maps synonyms and related terms close together, which
+    sparse TF-IDF cosine can't, and yields short float32 vectors suited to
+    an ANN index. The embedder keeps its own vectorizer so its vectors stay
+    comparable even if the shared TF-IDF model is republished.
+    """
+
+    def __init__(self, vectorizer: TfidfVectorizer, components: np.ndarray):
+        self.vectorizer = vectorizer
+        self.components = components  # (dim, n_terms)
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, texts: List[str], dim: int = 128, vectorizer: TfidfVectorizer = None) -> "TextEmbedder":
+        if vectorizer is None:
+            vectorizer = TfidfVectorizer(sublinear_tf=True, min_df=2 if len(texts) >= 100 else 1)
+            tfidf = vectorizer.fit_transform(texts)
+        else:
+            tfidf = vectorizer.transform(texts)
+        dim = max(1, min(dim, tfidf.shape[1] - 1, tfidf.shape[0] - 1))
+        svd = TruncatedSVD(n_components=dim, random_state=0).fit(tfidf)
+        return cls(vectorizer, svd.components_.astype(np.float32))
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized float32 embeddings, one row per text."""
+        vectors = np.asarray(self.vectorizer.transform(texts) @ self.components.T, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        save_vectorizer(self.vectorizer, directory)
+        np.save(os.path.join(directory, "components.npy"), self.components)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode="r") -> "TextEmbedder":
+        return cls(read_vectorizer(directory), np.load(os.path.join(directory, "components.npy"), mmap_mode=mmap_mode))
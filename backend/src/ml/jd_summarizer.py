@@ -1,12 +1,37 @@
 # ml/jd_summarizer.py
-from typing import Dict
-from transformers import pipeline
+import os
+from typing import Dict, List
+from .model_registry import registry
+
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+
+
+def _load_summarizer():
+    # transformers is only imported once a summary is actually requested
+    from transformers import pipeline
+    return pipeline("summarization", model=SUMMARIZER_MODEL)
+
+
+registry.register("summarizer", _load_summarizer)
+
+
+SUMMARY_KWARGS = {"max_length": 150, "min_length": 40, "do_sample": False}
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
 
 def summarize_jd(jd_text: str) -> Dict:
-    summary = summarizer(jd_text, max_length=150, min_length=40, do_sample=False)[0]["summary_text"]
+    summarizer = registry.get("summarizer")
+    summary = summarizer(jd_text, **SUMMARY_KWARGS)[0]["summary_text"]
     return {
         "original": jd_text,
         "summary": summary
     }
+
+
+def summarize_jds(jd_texts: List[str]) -> List[Dict]:
+    """Summarize several JDs in one batched generation call."""
+    summarizer = registry.get("summarizer")
+    outputs = summarizer(jd_texts, batch_size=len(jd_texts), truncation=True, **SUMMARY_KWARGS)
+    return [
+        {"original": jd_text, "summary": output["summary_text"]}
+        for jd_text, output in zip(jd_texts, outputs)
+    ]
@@ -1,29 +1,193 @@
 import os
 import pickle
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from .bm25_index import _Growable
+from .model_registry import registry
+
 
 class JobMatcher:
-    def __init__(self, model_path="ml/model.pkl"):
-        if not os.path.exists(model_path):
-            raise FileNotFoundError("Model not found. Please train and save it first.")
-        with open(model_path, "rb") as f:
-            self.vectorizer = pickle.load(f)
+    # Compact the job matrix once this fraction of its rows are removed jobs
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, model_path=None):
+        # By default use the process-wide vectorizer from the model registry.
+        # The instance keeps the version it started with, so its job matrix
+        # and the resumes scored against it always share one vocabulary.
+        if model_path is None:
+            self.vectorizer = registry.get("tfidf")
+            self.model_version = registry.version("tfidf")
+        else:
+            if not os.path.exists(model_path):
+                raise FileNotFoundError("Model not found. Please train and save it first.")
+            with open(model_path, "rb") as f:
+                self.vectorizer = pickle.load(f)
+            self.model_version = None
+
+        # Precomputed job index: one L2-normalized row per job, so a dot
+        # product with a normalized resume vector is the cosine similarity.
+        # The CSR arrays grow geometrically, so adding jobs costs only the new rows.
+        self.job_ids = []
+        self._rows = {}
+        self._set_matrix(sparse.csr_matrix((0, self._width), dtype=np.float32))
+
+    @property
+    def _width(self):
+        return len(self.vectorizer.vocabulary_)
+
+    def _set_matrix(self, matrix):
+        """Replace the job rows; arrays of the right dtype (e.g. memory-mapped) are used without copying."""
+        self._data = _Growable(np.float32, capacity=0)
+        self._indices = _Growable(np.int32, capacity=0)
+        self._indptr = _Growable(np.int32, capacity=0)
+        self._data.replace(matrix.data, copy=False)
+        self._indices.replace(matrix.indices, copy=False)
+        self._indptr.replace(matrix.indptr, copy=False)
+        self._live = _Growable(bool, capacity=0)
+        self._live.append(np.ones(matrix.shape[0], dtype=bool))
+
+    def _append_rows(self, matrix):
+        offset = self._indptr.view()[-1]
+        self._data.append(matrix.data)
+        self._indices.append(matrix.indices)
+        self._indptr.append(matrix.indptr[1:] + offset)
+        self._live.append(np.ones(matrix.shape[0], dtype=bool))
+
+    @property
+    def _job_matrix(self):
+        return sparse.csr_matrix(
+            (self._data.view(), self._indices.view(), self._indptr.view()),
+            shape=(len(self._indptr.view()) - 1, self._width), copy=False,
+        )
+
+    def _vectorize(self, texts):
+        if len(texts) == 0:  # the vectorizer rejects an empty batch
+            return sparse.csr_matrix((0, self._width), dtype=np.float32)
+        return normalize(self.vectorizer.transform(texts).astype(np.float32), norm="l2", copy=False)
+
+    @staticmethod
+    def _top_k(scores, top_k):
+        """Row-wise top-k of a dense score matrix, best first, without a full sort."""
+        k = min(top_k, scores.shape[1])
+        if k == 0:
+            return np.zeros((scores.shape[0], 0), dtype=np.intp)
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+        return np.take_along_axis(part, order, axis=1)
+
+    @property
+    def job_count(self):
+        return len(self._rows)
+
+    def set_jobs(self, job_ids, job_descriptions):
+        """Replace the job index with the given jobs."""
+        job_ids = list(job_ids)
+        if len(set(job_ids)) != len(job_ids):
+            raise ValueError("Duplicate job ids")
+        self._set_matrix(self._vectorize(job_descriptions))
+        self.job_ids = job_ids
+        self._rows = {job_id: row for row, job_id in enumerate(job_ids)}
+
+    def add_jobs(self, job_ids, job_descriptions):
+        """Add jobs to the index; an id that is already indexed is replaced.
+
+        An id repeated within the batch is indexed once, with its last description.
+        """
+        last = {job_id: description for job_id, description in zip(job_ids, job_descriptions)}
+        job_ids, job_descriptions = list(last), list(last.values())
+        self.remove_jobs([job_id for job_id in job_ids if job_id in self._rows])
+        start = len(self.job_ids)
+        self._append_rows(self._vectorize(job_descriptions))
+        self.job_ids.extend(job_ids)
+        self._rows.update((job_id, start + offset) for offset, job_id in enumerate(job_ids))
 
-    def match(self, resume_text, job_descriptions, top_k=3):
+    def remove_jobs(self, job_ids):
+        """Drop jobs from the index. Rows are tombstoned and compacted lazily."""
+        for job_id in job_ids:
+            row = self._rows.pop(job_id, None)
+            if row is not None:
+                self._live.view()[row] = False
+        if len(self.job_ids) and (~self._live.view()).sum() > self.COMPACT_RATIO * len(self.job_ids):
+            self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self._live.view())
+        self._set_matrix(self._job_matrix[keep])
+        self.job_ids = [self.job_ids[row] for row in keep]
+        self._rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+
+    def save_jobs(self, path):
+        """Persist the job index (compacted) to a directory of .npy files."""
+        self._compact()
+        os.makedirs(path, exist_ok=True)
+        m = self._job_matrix
+        for name, array in (("data", m.data), ("indices", m.indices), ("indptr", m.indptr),
+                            ("shape", np.array(m.shape)), ("job_ids", np.array(self.job_ids, dtype=str))):
+            np.save(os.path.join(path, f"{name}.npy"), array)
+
+    def load_jobs(self, path, mmap_mode="r"):
+        """Load a job index written by :meth:`save_jobs` with the same vectorizer.
+
+        The matrix is memory-mapped by default so worker processes share it;
+        the first add_jobs/remove_jobs compaction copies it into private memory.
+        """
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ("data", "indices", "indptr", "shape", "job_ids")
+        }
+        shape = tuple(int(n) for n in arrays["shape"])
+        if shape[1] != self._width:
+            raise ValueError("Job index was built with a different vectorizer")
+        self._set_matrix(sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=shape, copy=False))
+        self.job_ids = [str(job_id) for job_id in arrays["job_ids"]]
+        self._rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+
+    def match_many(self, resumes, top_k=3, batch_size=256, min_score=None):
+        """
+        Score a batch of resumes against the precomputed job index.
+
+        :param resumes: list of str - Resume texts
+        :param top_k: int - Number of top matches to return per resume
+        :param batch_size: int - Resumes scored per sparse matrix multiply (bounds the dense score block)
+        :param min_score: float - If given, leave out matches scoring below it
+        :return: list (one per resume) of lists of tuples [(job_id, similarity_score), ...]
+        """
+        results = []
+        jobs_t = self._job_matrix.T.tocsc()
+        dead = ~self._live.view()
+        for start in range(0, len(resumes), batch_size):
+            scores = (self._vectorize(resumes[start:start + batch_size]) @ jobs_t).toarray()
+            scores[:, dead] = -np.inf
+            if min_score is not None:
+                scores[scores < min_score] = -np.inf
+            top = self._top_k(scores, min(top_k, self.job_count))
+            for row, indices in enumerate(top):
+                results.append([(self.job_ids[i], float(scores[row, i])) for i in indices if scores[row, i] > -np.inf])
+        return results
+
+    def match(self, resume_text, job_descriptions=None, top_k=3):
         """
         :param resume_text: str - Text of the candidate resume
-        :param job_descriptions: list of str - List of job description texts
+        :param job_descriptions: list of str - List of job description texts; if omitted the
+            precomputed job index is used and job ids are returned instead of indices
         :param top_k: int - Number of top matches to return
         :return: list of tuples [(index, similarity_score), ...]
         """
-        all_texts = [resume_text] + job_descriptions
-        vectors = self.vectorizer.transform(all_texts)
+        if job_descriptions is None:
+            return self.match_many([resume_text], top_k=top_k)[0]
 
-        resume_vector = vectors[0]
-        job_vectors = vectors[1:]
+        similarities = self.similarities(resume_text, job_descriptions)[np.newaxis, :]
+        top_indices = self._top_k(similarities, top_k)[0]
 
-        similarities = cosine_similarity(resume_vector, job_vectors).flatten()
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        return [(i, similarities[0, i]) for i in top_indices]
 
-        return [(i, similarities[i]) for i in top_indices]
+    def similarities(self, text, others):
+        """
+        Cosine similarity of one text to each of ``others``, in input order.
+
+        Cosine is symmetric, so this scores a resume against jobs or a job against resumes.
+
+        :return: numpy array of float32 scores, one per text in ``others``
+        """
+        return (self._vectorize(others) @ self._vectorize([text]).T).toarray().ravel()
@@ -0,0 +1,223 @@
+# ml/model_registry.py
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+TFIDF_PICKLE_PATH = os.getenv("TFIDF_PICKLE_PATH", os.path.join(ML_DIR, "model.pkl"))
+TFIDF_ARTIFACT_DIR = os.getenv("TFIDF_ARTIFACT_DIR", os.path.join(ML_DIR, "artifacts", "tfidf"))
+MODEL_RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_CHECK_SECONDS", 30))
+
+# Artifact directories hold one sub-directory per published version and a
+# CURRENT file naming the live one, so publishing is a single atomic rename.
+CURRENT_FILE = "CURRENT"
+
+
+class ModelRegistry:
+    """Process-wide store of lazily loaded models that can be swapped at runtime.
+
+    Each model is loaded on the first ``get`` and shared by every caller in the
+    process. If a model was registered with a ``version`` callable, ``get``
+    polls it at most every ``check_interval`` seconds; when the version changes
+    the new model is loaded on a background thread and swapped in once ready,
+    so requests keep using the previous version meanwhile.
+    """
+
+    def __init__(self, check_interval: float = MODEL_RELOAD_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._version_fns: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._versions: Dict[str, Any] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._reloading = set()
+        # _lock guards the registry's own state and is only held briefly; each
+        # model also has a load lock so two threads never load it at once
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], version: Optional[Callable[[], Any]] = None) -> None:
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+            if version is not None:
+                self._version_fns[name] = version
+
+    def get(self, name: str) -> Any:
+        """The model, loading it on first use; may block for the load, so call it off the event loop."""
+        model = self._models.get(name)
+        if model is None:
+            with self._load_lock(name):
+                model = self._models.get(name)
+                if model is None:
+                    model = self._load(name)
+        elif self.check_interval > 0 and name in self._version_fns:
+            now = time.monotonic()
+            if now - self._checked_at.get(name, 0) >= self.check_interval:
+                self._checked_at[name] = now
+                if self._version_fns[name]() != self._versions.get(name):
+                    self._reload_in_background(name)
+        return model
+
+    def version(self, name: str) -> Any:
+        return self._versions.get(name)
+
+    def warm(self, *names: str) -> None:
+        """Load models ahead of the first request; a model that can't be loaded yet is logged and skipped."""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning("Model %s not loaded: %s", name, e)
+
+    def reload(self, name: str) -> Any:
+        """Load the current version of a model and swap it in.
+
+        Callers of ``get`` keep receiving the previous version while it loads.
+        """
+        with self._load_lock(name):
+            return self._load(name)
+
+    def _load_lock(self, name: str) -> threading.Lock:
+        lock = self._load_locks.get(name)
+        if lock is None:
+            raise KeyError(f"Unknown model: {name}")
+        return lock
+
+    def _load(self, name: str) -> Any:
+        version_fn = self._version_fns.get(name)
+        version = version_fn() if version_fn else None
+        model = self._loaders[name]()
+        # Publishing the model and its version is a pair of dict assignments
+        # under the lock, so readers see either the old model or the new one
+        with self._lock:
+            self._models[name] = model
+            self._versions[name] = version
+            self._checked_at[name] = time.monotonic()
+        return model
+
+    def _reload_in_background(self, name: str) -> None:
+        with self._lock:
+            if name in self._reloading:
+                return
+            self._reloading.add(name)
+
+        def run():
+            try:
+                self.reload(name)
+            except Exception as e:  # keep serving the loaded version; the next check retries
+                logger.warning("Reloading model %s failed: %s", name, e)
+            finally:
+                with self._lock:
+                    self._reloading.discard(name)
+
+        threading.Thread(target=run, name=f"reload-{name}", daemon=True).start()
+
+
+def current_artifact_version(artifact_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(artifact_dir, CURRENT_FILE)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def publish_artifact(artifact_dir: str, version: str) -> None:
+    """Point CURRENT at ``version``; the rename makes the switch atomic for readers."""
+    tmp = os.path.join(artifact_dir, CURRENT_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(artifact_dir, CURRENT_FILE))
+
+
+def new_artifact_version(artifact_dir: str) -> Tuple[str, str]:
+    """Create and return (version, directory) for an artifact about to be written."""
+    version = str(int(time.time() * 1000))
+    version_dir = os.path.join(artifact_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    return version, version_dir
+
+
+def save_vectorizer(vectorizer: TfidfVectorizer, directory: str) -> None:
+    """Write a fitted TF-IDF vectorizer as .npy arrays plus its parameters."""
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    np.save(os.path.join(directory, "vocabulary.npy"), np.array(terms, dtype=str))
+    np.save(os.path.join(directory, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    params = {
+        key: value for key, value in vectorizer.get_params().items()
+        if isinstance(value, (str, int, float, bool, tuple, list, type(None)))
+    }
+    with open(os.path.join(directory, "params.json"), "w") as f:
+        json.dump(params, f)
+
+
+def read_vectorizer(directory: str) -> TfidfVectorizer:
+    """Rebuild a TF-IDF vectorizer written by :func:`save_vectorizer`.
+
+    The IDF weights stay memory-mapped, so every worker process reading the
+    same artifact shares those pages through the OS page cache.
+    """
+    with open(os.path.join(directory, "params.json")) as f:
+        params = json.load(f)
+    if isinstance(params.get("ngram_range"), list):
+        params["ngram_range"] = tuple(params["ngram_range"])
+
+    terms = np.load(os.path.join(directory, "vocabulary.npy"), mmap_mode="r")
+    idf = np.load(os.path.join(directory, "idf.npy"), mmap_mode="r")
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(terms)}
+    vectorizer.idf_ = idf
+    return vectorizer
+
+
+def export_vectorizer(vectorizer: TfidfVectorizer, artifact_dir: str = TFIDF_ARTIFACT_DIR) -> str:
+    """Write a fitted TF-IDF vectorizer in the memory-mappable format and publish it as the current version."""
+    version, version_dir = new_artifact_version(artifact_dir)
+    save_vectorizer(vectorizer, version_dir)
+    publish_artifact(artifact_dir, version)
+    return version
+
+
+def load_vectorizer(artifact_dir: str = TFIDF_ARTIFACT_DIR) -> TfidfVectorizer:
+    """Load the current published version of a TF-IDF vectorizer."""
+    version = current_artifact_version(artifact_dir)
+    if version is None:
+        raise FileNotFoundError(f"No published vectorizer in {artifact_dir}")
+    return read_vectorizer(os.path.join(artifact_dir, version))
+
+
+def _load_tfidf() -> TfidfVectorizer:
+    if current_artifact_version(TFIDF_ARTIFACT_DIR) is not None:
+        return load_vectorizer(TFIDF_ARTIFACT_DIR)
+    if not os.path.exists(TFIDF_PICKLE_PATH):
+        raise FileNotFoundError("Model not found. Please train and save it first.")
+    with open(TFIDF_PICKLE_PATH, "rb") as f:
+        try:
+            return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError) as e:
+            # Same signal as a missing model: callers treat both as "no TF-IDF model yet"
+            raise FileNotFoundError(f"{TFIDF_PICKLE_PATH} is not a pickled vectorizer ({e}); train and publish one") from e
+
+
+registry = ModelRegistry()
+registry.register("tfidf", _load_tfidf, version=lambda: current_artifact_version(TFIDF_ARTIFACT_DIR))
+
+
+if __name__ == "__main__":
+    # Publish the pickled vectorizer in the memory-mappable format:
+    #   python -m src.ml.model_registry [model.pkl] [artifact_dir]
+    import sys
+
+    pickle_path = sys.argv[1] if len(sys.argv) > 1 else TFIDF_PICKLE_PATH
+    artifact_dir = sys.argv[2] if len(sys.argv) > 2 else TFIDF_ARTIFACT_DIR
+    with open(pickle_path, "rb") as f:
+        print(f"Published version {export_vectorizer(pickle.load(f), artifact_dir)} to {artifact_dir}")
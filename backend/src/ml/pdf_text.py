@@ -0,0 +1,34 @@
+# ml/pdf_text.py
+import io
+from typing import Optional
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+PDF_BACKENDS = ("pdfplumber", "pymupdf")
+
+
+def extract_text_pdfplumber(data: bytes, max_pages: Optional[int] = None) -> str:
+    """Extract the text of a PDF with pdfplumber, reading each page once."""
+    texts = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[:max_pages]:
+            text = page.extract_text()
+            if text:
+                texts.append(text)
+    return "\n".join(texts)
+
+
+def extract_text_pymupdf(data: bytes, max_pages: Optional[int] = None) -> str:
+    """Extract the text of a PDF with PyMuPDF, reading each page once."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "\n".join(page.get_text() for page in doc.pages(0, max_pages))
+
+
+def extract_text(data: bytes, backend: str = "pdfplumber", max_pages: Optional[int] = None) -> str:
+    """Extract PDF text with the chosen backend; only the first ``max_pages`` pages are read."""
+    if backend == "pdfplumber":
+        return extract_text_pdfplumber(data, max_pages)
+    if backend == "pymupdf":
+        return extract_text_pymupdf(data, max_pages)
+    raise ValueError(f"Unknown PDF backend: {backend}")
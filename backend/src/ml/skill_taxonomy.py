@@ -0,0 +1,205 @@
+# ml/skill_taxonomy.py
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Optional JSON file in the same shape as TAXONOMY, replacing the built-in one
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH")
+
+# category -> canonical skill -> aliases (the canonical name always matches too)
+TAXONOMY: Dict[str, Dict[str, List[str]]] = {
+    "languages": {
+        "python": ["python3"],
+        "java": [],
+        "javascript": ["js", "ecmascript"],
+        "typescript": [],
+        "c++": ["cpp"],
+        "c#": ["csharp", "c sharp"],
+        "golang": ["go lang"],
+        "rust": [],
+        "ruby": [],
+        "php": [],
+        "kotlin": [],
+        "swift": [],
+        "scala": [],
+        "matlab": [],
+        "sql": [],
+        "bash": ["shell scripting"],
+        "html": ["html5"],
+        "css": ["css3"],
+    },
+    "frameworks": {
+        "react": ["react.js", "reactjs"],
+        "angular": ["angular.js", "angularjs"],
+        "vue": ["vue.js", "vuejs"],
+        "next.js": ["nextjs"],
+        "node.js": ["nodejs"],
+        "express.js": ["expressjs"],
+        "django": [],
+        "flask": [],
+        "fastapi": ["fast api"],
+        "spring boot": ["springboot", "spring framework"],
+        ".net": ["dotnet", "asp.net", ".net core"],
+        "ruby on rails": ["rails"],
+        "tensorflow": [],
+        "pytorch": [],
+        "scikit-learn": ["sklearn", "scikit learn"],
+        "pandas": [],
+        "numpy": [],
+        "spark": ["apache spark", "pyspark"],
+        "hadoop": [],
+        "langchain": [],
+    },
+    "data": {
+        "mongodb": ["mongo"],
+        "postgresql": ["postgres"],
+        "mysql": [],
+        "redis": [],
+        "elasticsearch": ["elastic search"],
+        "kafka": ["apache kafka"],
+        "snowflake": [],
+        "tableau": [],
+        "power bi": ["powerbi"],
+        "excel": ["microsoft excel", "ms excel"],
+    },
+    "cloud": {
+        "aws": ["amazon web services"],
+        "azure": ["microsoft azure"],
+        "gcp": ["google cloud", "google cloud platform"],
+        "docker": [],
+        "kubernetes": ["k8s"],
+        "terraform": [],
+        "ansible": [],
+        "jenkins": [],
+        "ci/cd": ["cicd", "continuous integration", "continuous delivery"],
+        "linux": [],
+        "git": ["github", "gitlab"],
+    },
+    "practices": {
+        "machine learning": ["ml"],
+        "deep learning": [],
+        "natural language processing": ["nlp"],
+        "computer vision": [],
+        "data analysis": ["data analytics"],
+        "data engineering": [],
+        "rest api": ["restful", "rest apis", "restful api", "restful apis"],
+        "graphql": [],
+        "microservices": ["microservice"],
+        "agile": ["scrum", "kanban"],
+        "unit testing": ["tdd", "test driven development"],
+        "devops": [],
+        "ui/ux": ["ux", "ui design", "user experience"],
+    },
+    "soft_skills": {
+        "communication": ["communication skills"],
+        "leadership": ["team leadership"],
+        "project management": [],
+        "problem solving": ["problem-solving"],
+        "teamwork": ["collaboration"],
+    },
+}
+
+# Words, keeping the punctuation inside skill names: "node.js", "c++", "c#", ".net"
+_TOKEN = re.compile(r"\.?[a-z0-9](?:[a-z0-9.]*[a-z0-9])?[+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class SkillMatcher:
+    """Finds taxonomy skills in text in one pass with an Aho-Corasick automaton over word tokens.
+
+    Every alias is tokenized the way text is, so multi-word skills
+    ("machine learning") and punctuated ones ("node.js", "c++") match whole
+    words only: "java" never matches inside "javascript". The automaton is
+    built once; matching costs one dictionary step per token whatever the
+    size of the dictionary.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Dict[str, Iterable[str]]]):
+        self.categories: Dict[str, str] = {}
+        # Trie over tokens: goto[state][token] -> state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at a state (its own and those reached by failure links): [(length, skill)]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+        for category, skills in taxonomy.items():
+            for skill, aliases in skills.items():
+                self.categories[skill] = category
+                for pattern in (skill, *aliases):
+                    self._add(tokenize(pattern), skill)
+        self._link()
+
+    def _add(self, tokens: List[str], skill: str) -> None:
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            following = self._goto[state].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][token] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = following
+        self._out[state].append((len(tokens), skill))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[following] = target if target != following else 0
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """Every match as (start token, end token, skill), overlaps included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, skill in out[state]:
+                matches.append((position + 1 - length, position + 1, skill))
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical skills in ``text``, in order of first mention.
+
+        Overlapping matches resolve leftmost-longest, so "spring boot" is
+        one mention rather than also counting a shorter alias inside it.
+        """
+        skills = {}
+        covered = 0
+        for start, end, skill in sorted(self.find(tokenize(text)), key=lambda m: (m[0], -m[1])):
+            if start >= covered:
+                skills.setdefault(skill, None)
+                covered = end
+        return list(skills)
+
+    def by_category(self, skills: Iterable[str]) -> Dict[str, List[str]]:
+        grouped: Dict[str, List[str]] = {}
+        for skill in skills:
+            grouped.setdefault(self.categories.get(skill, "other"), []).append(skill)
+        return grouped
+
+
+def load_taxonomy(path: Optional[str] = SKILL_TAXONOMY_PATH) -> Dict[str, Dict[str, List[str]]]:
+    if path:
+        with open(path) as f:
+            return json.load(f)
+    return TAXONOMY
+
+
+skill_matcher = SkillMatcher(load_taxonomy())
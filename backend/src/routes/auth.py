@@ -1,14 +1,12 @@
 # routes/auth.py
 
 from fastapi import APIRouter, HTTPException, status, Depends, Body
-from fastapi.security import OAuth2PasswordBearer
-from pydantic import Field
-from passlib.context import CryptContext
-from jose import jwt, JWTError
-from ..models.user import UserCreate, UserLogin, TokenData
+from pydantic import BaseModel, Field
+from jose import JWTError
+from ..models.user import UserCreate, UserLogin
 from ..database.mongo import get_database
-from datetime import datetime, timedelta
-import os
+from ..utils.jwt_handler import REFRESH_TOKEN, create_access_token, create_refresh_token, decode_token
+from ..utils.password_hasher import HasherBusyError, password_hasher
 
 router = APIRouter(
     prefix="/auth",
@@ -16,40 +14,16 @@ router = APIRouter(
     responses={
         400: {"description": "Bad request"},
         401: {"description": "Unauthorized"},
-        500: {"description": "Internal server error"}
+        500: {"description": "Internal server error"},
+        503: {"description": "Too many concurrent logins, retry later"}
     }
 )
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Secret & algorithm
-SECRET_KEY = os.getenv("SECRET_KEY", "super-secret")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(..., description="Refresh token returned by /auth/login")
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_pw, hashed_pw) -> bool:
-    return pwd_context.verify(plain_pw, hashed_pw)
-
-def create_token(data: dict, expires_delta: timedelta = timedelta(minutes=60)):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-        if email is None or role is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return TokenData(email=email, role=role)
-    except JWTError:
-        raise HTTPException(status_code=403, detail="Token is invalid or expired")
+def hasher_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
 @router.post(
     "/register",
@@ -73,7 +47,10 @@ async def register(user: UserCreate, db=Depends(get_database)):
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = hash_password(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HasherBusyError:
+        raise hasher_busy()
     user_dict = {
         "email": user.email,
         "hashed_password": hashed_password,
@@ -86,7 +63,7 @@ async def register(user: UserCreate, db=Depends(get_database)):
     "/login",
     status_code=status.HTTP_200_OK,
     summary="User login",
-    description="Authenticate user and return JWT token",
+    description="Authenticate user and return an access token and a refresh token",
     responses={
         200: {"description": "Successful login with token"},
         401: {"description": "Invalid credentials"}
@@ -101,8 +78,47 @@ async def login(user: UserLogin, db=Depends(get_database)):
     """
     users_collection = db["users"]
     db_user = await users_collection.find_one({"email": user.email})
-    if not db_user or not verify_password(user.password, db_user["hashed_password"]):
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(user.password, db_user["hashed_password"])
+    except HasherBusyError:
+        raise hasher_busy()
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with a different bcrypt cost than BCRYPT_ROUNDS: upgrade it transparently
+        await users_collection.update_one({"_id": db_user["_id"]}, {"$set": {"hashed_password": new_hash}})
 
-    token = create_token({"sub": db_user["email"], "role": db_user["role"]})
-    return {"access_token": token, "role": db_user["role"]}
+    claims = {"sub": db_user["email"], "role": db_user["role"]}
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
+        "token_type": "bearer",
+        "role": db_user["role"]
+    }
+
+@router.post(
+    "/refresh",
+    status_code=status.HTTP_200_OK,
+    summary="Refresh access token",
+    description="Exchange a refresh token for a new access token without re-entering the password",
+    responses={
+        200: {"description": "New access token"},
+        401: {"description": "Invalid or expired refresh token"}
+    }
+)
+async def refresh(body: RefreshRequest, db=Depends(get_database)):
+    try:
+        claims = decode_token(body.refresh_token, token_type=REFRESH_TOKEN)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    # Re-read the user so a deleted account or changed role takes effect
+    db_user = await db["users"].find_one({"email": claims["email"]}, {"email": 1, "role": 1})
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    return {
+        "access_token": create_access_token({"sub": db_user["email"], "role": db_user["role"]}),
+        "token_type": "bearer",
+        "role": db_user["role"]
+    }
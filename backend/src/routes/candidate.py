@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from pymongo import ReturnDocument
 from pydantic import BaseModel, Field
 from typing import List
-from ..database.mongo import db
+from ..database.mongo import get_database
 from ..utils.jwt_handler import get_current_user
+from ..services.candidate_ranking import candidate_rescorer
+from ..services.match_worker import log_change
 
 router = APIRouter(
     prefix="/candidate",
@@ -34,10 +37,15 @@ class ProfileResponse(BaseModel):
         403: {"description": "Only candidates can access this route"}
     }
 )
-async def save_profile(profile: CandidateProfile, user=Depends(get_current_user)):
+async def save_profile(profile: CandidateProfile, user=Depends(get_current_user), db=Depends(get_database)):
     if user["role"] != "candidate":
         raise HTTPException(status_code=403, detail="Only candidates can access this route")
-    db.candidates.update_one({"email": user["email"]}, {"$set": profile.dict()}, upsert=True)
+    saved = await db.candidates.find_one_and_update(
+        {"email": user["email"]}, {"$set": profile.dict()},
+        projection={"_id": 1}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    candidate_rescorer.schedule(db, user["email"])
+    await log_change(db, "candidates", "update", saved["_id"])
     return {"message": "Profile saved"}
 
 @router.get(
@@ -51,11 +59,11 @@ async def save_profile(profile: CandidateProfile, user=Depends(get_current_user)
         404: {"description": "Profile not found"}
     }
 )
-async def get_profile(user=Depends(get_current_user)):
+async def get_profile(user=Depends(get_current_user), db=Depends(get_database)):
     if user["role"] != "candidate":
         raise HTTPException(status_code=403, detail="Only candidates can access this route")
-    profile = db.candidates.find_one({"email": user["email"]}, {"_id": 0})
-    if profile:
-        return profile
-    return {"name": "", "education": "", "experience": "", "skills": ""}
+    profile = await db.candidates.find_one({"email": user["email"]}, {"_id": 0})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
 
@@ -1,9 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, status
+from fastapi.responses import StreamingResponse
+from jose import JWTError
 from pydantic import BaseModel
-import openai
-import os
-
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from typing import Optional
+from ..services.chat_hub import TRY_AGAIN_LATER, ChatConnection, chat_hub
+from ..services.chat_memory import chat_memory
+from ..services.llm_gateway import LLMError, llm_gateway
+from ..utils.ai_helpers import generate_questions
+from ..utils.jwt_handler import decode_token, get_current_user
+import json
 
 router = APIRouter()
 
@@ -12,8 +17,51 @@ class Query(BaseModel):
 
 @router.post("/chat")
 async def chatbot_reply(query: Query):
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": query.message}]
-    )
-    return {"reply": response['choices'][0]['message']['content']}
+    try:
+        reply = await llm_gateway.complete([{"role": "user", "content": query.message}])
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return {"reply": reply}
+
+@router.post("/chat/stream")
+async def chatbot_stream(query: Query, user=Depends(get_current_user)):
+    """Stream the reply as server-sent events: one ``token`` event per chunk, then ``done`` (or ``error``)."""
+    async def events():
+        try:
+            async for token in llm_gateway.stream([{"role": "user", "content": query.message}]):
+                yield f"event: token\ndata: {json.dumps(token)}\n\n"
+        except LLMError as e:
+            yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.get("/chat/questions")
+async def interview_questions(job_role: str, user=Depends(get_current_user)):
+    try:
+        return {"questions": await generate_questions(job_role)}
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+@router.delete("/chat/memory", status_code=204)
+async def forget_conversation(user=Depends(get_current_user)):
+    await chat_memory.aforget(user["email"])
+
+@router.websocket("/chat/ws")
+async def chat_socket(websocket: WebSocket, token: Optional[str] = None):
+    """Streaming chat with long-term memory.
+
+    Browsers can't set headers on a WebSocket, so the access token is passed
+    as ``?token=``. See ``ChatConnection`` for the frame protocol.
+    """
+    try:
+        user = decode_token(token or "")
+    except JWTError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if chat_hub.full():
+        await websocket.close(code=TRY_AGAIN_LATER)
+        return
+    await websocket.accept()
+    await chat_hub.serve(ChatConnection(websocket, user))
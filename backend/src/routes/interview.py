@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from ..database.mongo import get_database
+from ..utils.jwt_handler import get_current_user
+from ..services.interview_scheduler import INTERVIEWS_COLLECTION, schedule_interviews
+
+router = APIRouter(
+    prefix="/interview",
+    tags=["Interview Scheduling"],
+    responses={
+        401: {"description": "Unauthorized"},
+        403: {"description": "Forbidden"},
+        500: {"description": "Internal server error"}
+    }
+)
+
+class ScheduleRequest(BaseModel):
+    job_id: str = Field(..., example="665f1c2e9b1e8a3d4c2b1a00", description="Job the interviews are for")
+    candidates: List[str] = Field(..., min_length=1, max_length=1000, example=["candidate@example.com"], description="Shortlisted candidate emails")
+    interviewers: Optional[List[str]] = Field(None, example=["recruiter@example.com"], description="Interviewer emails; defaults to the recruiter")
+    duration_minutes: int = Field(30, ge=15, le=240, example=45, description="Interview length")
+    start_after: Optional[datetime] = Field(None, description="Earliest interview start; defaults to now")
+
+class Interview(BaseModel):
+    candidate_email: str = Field(..., description="Candidate email")
+    recruiter_email: str = Field(..., description="Interviewer email")
+    start: datetime = Field(..., description="Interview start")
+    end: datetime = Field(..., description="Interview end")
+
+class ScheduleResponse(BaseModel):
+    scheduled: List[Interview] = Field(..., description="Booked interviews; invitations are queued for email")
+    unplaced: List[str] = Field(..., description="Candidates with no free slot within the scheduling horizon")
+
+@router.post(
+    "/schedule",
+    response_model=ScheduleResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Schedule interviews",
+    description="Assign interview slots to a batch of candidates across interviewer calendars and queue the invitations",
+    responses={
+        201: {"description": "Interviews scheduled"},
+        403: {"description": "Only the recruiter who posted the job can schedule interviews"},
+        404: {"description": "Job not found"}
+    }
+)
+async def schedule(request: ScheduleRequest, user=Depends(get_current_user), db=Depends(get_database)):
+    if user["role"] != "recruiter":
+        raise HTTPException(status_code=403, detail="Only recruiters can schedule interviews")
+    try:
+        job = await db.jobs.find_one({"_id": ObjectId(request.job_id)}, {"title": 1, "posted_by": 1})
+    except InvalidId:
+        job = None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get("posted_by") != user["email"]:
+        raise HTTPException(status_code=403, detail="Job was posted by another recruiter")
+
+    interviews, unplaced = await schedule_interviews(
+        db,
+        job,
+        request.candidates,
+        request.interviewers or [user["email"]],
+        duration_minutes=request.duration_minutes,
+        start_after=request.start_after,
+    )
+    return {"scheduled": interviews, "unplaced": unplaced}
+
+@router.get(
+    "/",
+    response_model=List[Interview],
+    summary="List upcoming interviews",
+    description="Upcoming interviews for the current recruiter or candidate",
+    responses={
+        200: {"description": "Interviews retrieved successfully"}
+    }
+)
+async def list_interviews(user=Depends(get_current_user), db=Depends(get_database)):
+    field = "recruiter_email" if user["role"] == "recruiter" else "candidate_email"
+    cursor = db[INTERVIEWS_COLLECTION].find(
+        {field: user["email"], "start": {"$gte": datetime.now()}, "status": "scheduled"}, {"_id": 0}
+    )
+    return await cursor.sort("start", 1).to_list(length=500)
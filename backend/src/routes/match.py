@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
 from pydantic import BaseModel, Field
 from ..database.mongo import get_database
 from ..utils.jwt_handler import get_current_user
-from typing import List, Dict, Any
+from ..services.skill_index import match_job_ids, skill_list
+from ..services.retrieval import top_k_jobs, top_k_resumes, job_text
+from ..services.match_worker import top_matches
+from ..services.job_listing import conditional_response, job_list_cache, parse_fields
+from ..services.job_search import job_search
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import List, Dict, Any, Optional
 
 router = APIRouter(
     prefix="/match",
@@ -21,57 +28,278 @@ class JobMatch(BaseModel):
     location: str = Field(..., description="Job location")
     skills_required: List[str] = Field(..., description="Required skills")
 
+class MatchedJob(JobMatch):
+    id: str = Field(..., description="Job id")
+    overlap: int = Field(..., description="Number of the candidate's skills the job requires")
+
+class MatchPage(BaseModel):
+    items: List[MatchedJob] = Field(..., description="Matched jobs, best overlap first")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+class RankedCandidate(BaseModel):
+    resume_id: str = Field(..., description="Resume id")
+    filename: Optional[str] = Field(None, description="Uploaded resume file name")
+    email: Optional[str] = Field(None, description="Candidate email, if the resume is linked to an account")
+    score: float = Field(..., description="Similarity to the job, higher is better")
+
+class ScoredJob(JobMatch):
+    id: str = Field(..., description="Job id")
+    score: float = Field(..., description="Similarity to the candidate, higher is better")
+
+class JobListing(BaseModel):
+    id: str = Field(..., description="Job id")
+    title: Optional[str] = Field(None, description="Job title")
+    description: Optional[str] = Field(None, description="Job description (only if requested in fields)")
+    location: Optional[str] = Field(None, description="Job location")
+    skills_required: Optional[List[str]] = Field(None, description="Required skills")
+    posted_by: Optional[str] = Field(None, description="Email of the recruiter who posted the job")
+
+class JobPage(BaseModel):
+    items: List[JobListing] = Field(..., description="Jobs, newest first, with the requested fields")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+class SearchHit(JobListing):
+    score: float = Field(..., description="BM25 relevance to the query, 0 when there is no query")
+
+class FacetCount(BaseModel):
+    value: str = Field(..., description="Facet value (lowercased)")
+    count: int = Field(..., description="Matching jobs with this value")
+
+class SearchResults(BaseModel):
+    total: int = Field(..., description="Number of jobs matching the query and filters")
+    items: List[SearchHit] = Field(..., description="Matching jobs, most relevant first")
+    facets: Dict[str, List[FacetCount]] = Field(..., description="Most common locations and skills among all matches")
+
 class MatchResponse(BaseModel):
     message: str = Field(..., description="Operation result")
 
 @router.get(
     "/jobs",
-    response_model=List[JobMatch],
     summary="List all jobs",
-    description="Get a list of all available jobs",
+    description=(
+        "Page through all jobs, newest first. Only the requested fields are returned "
+        "(default: title, location, skills_required). Responses carry an ETag; send it back in "
+        "If-None-Match to get 304 Not Modified when the page hasn't changed."
+    ),
     responses={
-        200: {"description": "Jobs retrieved successfully"}
+        200: {"description": "Jobs retrieved successfully", "model": JobPage},
+        304: {"description": "Page unchanged since the ETag in If-None-Match"},
+        400: {"description": "Invalid cursor or unknown field"}
     }
 )
 async def list_all_jobs(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated fields, e.g. title,location,description"),
     user: dict = Depends(get_current_user),
     db=Depends(get_database)
 ):
-    jobs = await db["jobs"].find({}, {"_id": 0}).to_list(length=100)
-    return jobs
+    try:
+        body, etag = await job_list_cache.page("all", db, {}, parse_fields(fields), limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return conditional_response(request, body, etag)
+
+@router.get(
+    "/search",
+    response_model=SearchResults,
+    response_model_exclude_none=True,
+    summary="Search jobs",
+    description=(
+        "Full-text search on job title and description, ranked by BM25 (title matches weigh more). "
+        "Filter by location and skills (repeat a parameter to allow several values) and get facet counts "
+        "over all matches. Without q, matching jobs are returned newest first."
+    ),
+    responses={
+        200: {"description": "Search results"},
+        400: {"description": "Unknown field"}
+    }
+)
+async def search_jobs(
+    q: str = Query("", max_length=200, description="Search text"),
+    location: List[str] = Query([], description="Only jobs in one of these locations"),
+    skills: List[str] = Query([], description="Only jobs requiring one of these skills"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, le=1000, description="Number of results to skip"),
+    fields: Optional[str] = Query(None, description="Comma separated fields, e.g. title,location,description"),
+    user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    try:
+        fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await job_search.search(db, q, location, skills, fields, limit, offset)
 
 @router.get(
     "/",
-    response_model=List[JobMatch],
+    response_model=MatchPage,
     summary="Match jobs to candidate",
-    description="Find jobs matching candidate's skills",
+    description="Find jobs matching candidate's skills, ranked by skill overlap",
     responses={
         200: {"description": "Matching jobs found"},
+        400: {"description": "Invalid cursor"},
         403: {"description": "Only candidates can view matched jobs"},
         404: {"description": "Candidate profile or skills not found"}
     }
 )
 async def match_jobs(
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     user: dict = Depends(get_current_user),
     db=Depends(get_database)
 ):
     if user.get("role") != "candidate":
         raise HTTPException(status_code=403, detail="Only candidates can view matched jobs")
 
-    profile = await db["candidates"].find_one({"email": user["email"]})
+    profile = await db["candidates"].find_one({"email": user["email"]}, {"skills": 1})
     if not profile or "skills" not in profile:
         raise HTTPException(status_code=404, detail="Candidate profile or skills not found")
 
-    candidate_skills = set(map(str.lower, profile["skills"]))
-    all_jobs = await db["jobs"].find().to_list(length=100)
+    try:
+        ranked, next_cursor = await match_job_ids(db, profile["skills"], limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    jobs = await db["jobs"].find({"_id": {"$in": [job_id for job_id, _ in ranked]}}).to_list(length=limit)
+    jobs_by_id = {job["_id"]: job for job in jobs}
+    matched_jobs = []
+    for job_id, overlap in ranked:
+        job = jobs_by_id.get(job_id)
+        if job is None:  # deleted since it was indexed
+            continue
+        job["skills_required"] = skill_list(job.get("skills_required"))
+        job["id"] = str(job.pop("_id"))
+        job["overlap"] = overlap
+        matched_jobs.append(job)
+
+    return {"items": matched_jobs, "next_cursor": next_cursor}
+
+@router.get(
+    "/semantic",
+    response_model=List[ScoredJob],
+    summary="Semantic job matches for candidate",
+    description="Find the jobs closest to the candidate's profile in the semantic index, re-ranked by exact TF-IDF similarity",
+    responses={
+        200: {"description": "Matching jobs found"},
+        403: {"description": "Only candidates can view matched jobs"},
+        404: {"description": "Candidate profile not found"},
+        503: {"description": "Semantic index has not been built"}
+    }
+)
+async def semantic_match_jobs(
+    k: int = Query(10, ge=1, le=100, description="Number of jobs to return"),
+    exact: bool = Query(True, description="Re-rank the approximate results with exact TF-IDF scores"),
+    user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    if user.get("role") != "candidate":
+        raise HTTPException(status_code=403, detail="Only candidates can view matched jobs")
+
+    profile = await db["candidates"].find_one({"email": user["email"]}, {"bio": 1, "skills": 1})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Candidate profile not found")
+    query = " ".join([profile.get("bio", "")] + list(profile.get("skills", [])))
+
+    try:
+        ranked = await top_k_jobs(db, query, k=k, exact=exact)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Semantic index has not been built")
+
+    jobs = await db["jobs"].find({"_id": {"$in": [ObjectId(job_id) for job_id, _ in ranked]}}).to_list(length=k)
+    jobs_by_id = {str(job["_id"]): job for job in jobs}
     matched_jobs = []
+    for job_id, score in ranked:
+        job = jobs_by_id.get(job_id)
+        if job is None:
+            continue
+        job["skills_required"] = skill_list(job.get("skills_required"))
+        job["id"] = str(job.pop("_id"))
+        job["score"] = score
+        matched_jobs.append(job)
+    return matched_jobs
 
-    for job in all_jobs:
-        job_skills = set(map(str.lower, job["skills_required"].split(",")))
-        if candidate_skills & job_skills:  # intersection exists
-            job["_id"] = str(job["_id"])
-            matched_jobs.append(job)
+@router.get(
+    "/job/{job_id}/candidates",
+    response_model=List[RankedCandidate],
+    summary="Top candidates for a job",
+    description="Find the resumes closest to a job in the semantic index, re-ranked by exact TF-IDF similarity",
+    responses={
+        200: {"description": "Candidates found"},
+        403: {"description": "Only the recruiter who posted the job can rank candidates"},
+        404: {"description": "Job not found"},
+        503: {"description": "Semantic index has not been built"}
+    }
+)
+async def top_candidates_for_job(
+    job_id: str,
+    k: int = Query(50, ge=1, le=200, description="Number of candidates to return"),
+    exact: bool = Query(True, description="Re-rank the approximate results with exact TF-IDF scores"),
+    user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    if user.get("role") != "recruiter":
+        raise HTTPException(status_code=403, detail="Only recruiters can rank candidates")
+    try:
+        job = await db["jobs"].find_one({"_id": ObjectId(job_id)})
+    except InvalidId:
+        job = None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get("posted_by") != user["email"]:
+        raise HTTPException(status_code=403, detail="Only the recruiter who posted the job can rank candidates")
 
+    try:
+        ranked = await top_k_resumes(db, job_text(job), k=k, exact=exact)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Semantic index has not been built")
+
+    resumes = await db["resumes"].find(
+        {"_id": {"$in": [ObjectId(resume_id) for resume_id, _ in ranked]}},
+        {"filename": 1, "email": 1}
+    ).to_list(length=k)
+    resumes_by_id = {str(resume["_id"]): resume for resume in resumes}
+    return [
+        {
+            "resume_id": resume_id,
+            "filename": resumes_by_id[resume_id].get("filename"),
+            "email": resumes_by_id[resume_id].get("email"),
+            "score": score
+        }
+        for resume_id, score in ranked if resume_id in resumes_by_id
+    ]
+
+@router.get(
+    "/top",
+    response_model=List[ScoredJob],
+    summary="Precomputed job matches for candidate",
+    description="Read the candidate's best matches as kept up to date by the match worker",
+    responses={
+        200: {"description": "Matching jobs found"},
+        403: {"description": "Only candidates can view matched jobs"}
+    }
+)
+async def precomputed_matches(
+    limit: int = Query(20, ge=1, le=100, description="Number of jobs to return"),
+    user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    if user.get("role") != "candidate":
+        raise HTTPException(status_code=403, detail="Only candidates can view matched jobs")
+
+    matches = await top_matches(db, user["email"], limit=limit)
+    jobs = await db["jobs"].find({"_id": {"$in": [match["job_id"] for match in matches]}}).to_list(length=limit)
+    jobs_by_id = {job["_id"]: job for job in jobs}
+    matched_jobs = []
+    for match in matches:
+        job = jobs_by_id.get(match["job_id"])
+        if job is None:
+            continue
+        job["skills_required"] = skill_list(job.get("skills_required"))
+        job["id"] = str(job.pop("_id"))
+        job["score"] = match["score"]
+        matched_jobs.append(job)
     return matched_jobs
 
 @router.post(
@@ -1,8 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List
-from ..database.mongo import db
+from typing import List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from ..database.mongo import get_database
 from ..utils.jwt_handler import get_current_user
+from ..services.skill_index import index_job, unindex_job
+from ..services.retrieval import JOBS, index_document
+from ..services.candidate_ranking import (
+    decode_cursor, encode_cursor, ensure_ranking, invalidate_job, ranked_candidates, scored_candidates
+)
+from ..services.shortlisting import Shortlister, shortlist_stream
+from ..services.job_listing import conditional_response, job_list_cache, parse_fields
+from ..services.job_search import job_search
+from ..services.match_worker import log_change
+from datetime import datetime
+import json
 
 router = APIRouter(
     prefix="/recruiter",
@@ -22,6 +36,7 @@ class Job(BaseModel):
 
 class JobResponse(BaseModel):
     message: str = Field(..., example="Job posted successfully", description="Operation result")
+    job_id: str = Field(..., example="665f1c2e9b1e8a3d4c2b1a00", description="Id of the new job")
 
 @router.post(
     "/job",
@@ -34,26 +49,180 @@ class JobResponse(BaseModel):
         403: {"description": "Only recruiters can post jobs"}
     }
 )
-async def post_job(job: Job, user=Depends(get_current_user)):
+async def post_job(job: Job, user=Depends(get_current_user), db=Depends(get_database)):
     if user["role"] != "recruiter":
         raise HTTPException(status_code=403, detail="Only recruiters can post jobs")
     job_data = job.dict()
     job_data["posted_by"] = user["email"]
-    db.jobs.insert_one(job_data)
-    return {"message": "Job posted successfully"}
+    job_data["updated_at"] = datetime.now()
+    result = await db.jobs.insert_one(job_data)
+    await index_job(db, result.inserted_id, job.skills_required)
+    await index_document(db, JOBS, result.inserted_id)
+    await job_search.add(result.inserted_id, job_data)
+    await log_change(db, "jobs", "insert", result.inserted_id)
+    job_list_cache.invalidate()
+    return {"message": "Job posted successfully", "job_id": str(result.inserted_id)}
 
 @router.get(
     "/jobs",
-    response_model=List[Job],
     summary="Get recruiter's jobs",
-    description="Retrieve all jobs posted by the recruiter",
+    description=(
+        "Page through the jobs posted by the recruiter, newest first, with only the requested fields "
+        "(default: title, location, skills_required). Supports If-None-Match like GET /match/jobs."
+    ),
     responses={
         200: {"description": "Jobs retrieved successfully"},
+        304: {"description": "Page unchanged since the ETag in If-None-Match"},
+        400: {"description": "Invalid cursor or unknown field"},
         403: {"description": "Only recruiters can view their jobs"}
     }
 )
-async def get_jobs(user=Depends(get_current_user)):
+async def get_jobs(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated fields, e.g. title,location,description"),
+    user=Depends(get_current_user),
+    db=Depends(get_database)
+):
     if user["role"] != "recruiter":
         raise HTTPException(status_code=403, detail="Only recruiters can view their jobs")
-    jobs = list(db.jobs.find({"posted_by": user["email"]}, {"_id": 0}))
-    return jobs
+    try:
+        body, etag = await job_list_cache.page(
+            ("posted_by", user["email"]), db, {"posted_by": user["email"]}, parse_fields(fields), limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return conditional_response(request, body, etag)
+
+async def live_ranking(db, job: dict):
+    """Version of the job's stored ranking, (re)computed if needed; 503 without a matching model."""
+    try:
+        return await ensure_ranking(db, job)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Matching model is not available; train and publish one")
+
+async def get_own_job(job_id: str, user: dict, db) -> dict:
+    if user["role"] != "recruiter":
+        raise HTTPException(status_code=403, detail="Only recruiters can manage jobs")
+    try:
+        job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    except InvalidId:
+        job = None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get("posted_by") != user["email"]:
+        raise HTTPException(status_code=403, detail="Job was posted by another recruiter")
+    return job
+
+@router.put(
+    "/job/{job_id}",
+    response_model=JobResponse,
+    summary="Update job",
+    description="Replace a job posting; its stored candidate ranking is recomputed on next read",
+    responses={
+        200: {"description": "Job updated successfully"},
+        403: {"description": "Only the recruiter who posted the job can update it"},
+        404: {"description": "Job not found"}
+    }
+)
+async def update_job(job_id: str, job: Job, user=Depends(get_current_user), db=Depends(get_database)):
+    existing = await get_own_job(job_id, user, db)
+    job_data = {**job.dict(), "updated_at": datetime.now()}
+    await db.jobs.update_one({"_id": existing["_id"]}, {"$set": job_data})
+    await unindex_job(db, existing["_id"], existing.get("skills_required"))
+    await index_job(db, existing["_id"], job.skills_required)
+    await index_document(db, JOBS, existing["_id"])
+    await job_search.add(existing["_id"], job_data)
+    await invalidate_job(db, existing["_id"])
+    await log_change(db, "jobs", "update", existing["_id"])
+    job_list_cache.invalidate()
+    return {"message": "Job updated successfully", "job_id": job_id}
+
+@router.get(
+    "/job/{job_id}/ranking",
+    summary="Rank candidates for a job",
+    description=(
+        "Stream every candidate scoring at least min_score against the job, best first, as "
+        "newline-delimited JSON: one {email, score} object per candidate, then {next_cursor}"
+    ),
+    responses={
+        200: {"description": "Ranked candidates", "content": {"application/x-ndjson": {}}},
+        400: {"description": "Invalid cursor"},
+        403: {"description": "Only the recruiter who posted the job can rank candidates"},
+        404: {"description": "Job not found"},
+        503: {"description": "Matching model is not available"}
+    }
+)
+async def rank_candidates(
+    job_id: str,
+    min_score: float = Query(0.0, ge=0.0, le=1.0, description="Only return candidates scoring at least this"),
+    limit: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user=Depends(get_current_user),
+    db=Depends(get_database)
+):
+    job = await get_own_job(job_id, user, db)
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    version = await live_ranking(db, job)
+
+    async def lines():
+        sent = 0
+        last = None
+        async for doc in ranked_candidates(db, job["_id"], version, min_score=min_score, limit=limit, cursor=cursor):
+            if sent == limit:
+                yield json.dumps({"next_cursor": encode_cursor(last["score"], last["email"])}) + "\n"
+                return
+            yield json.dumps(doc) + "\n"
+            sent += 1
+            last = doc
+        yield json.dumps({"next_cursor": None}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get(
+    "/job/{job_id}/shortlist",
+    summary="Shortlist candidates for a job",
+    description=(
+        "Stream one {id, reasons, missing} line per rejected candidate as newline-delimited JSON, "
+        "then a final {shortlisted, stats} line with the best k qualified candidates"
+    ),
+    responses={
+        200: {"description": "Rejections followed by the shortlist", "content": {"application/x-ndjson": {}}},
+        403: {"description": "Only the recruiter who posted the job can shortlist"},
+        404: {"description": "Job not found"},
+        503: {"description": "Matching model is not available"}
+    }
+)
+async def shortlist_job(
+    job_id: str,
+    k: int = Query(10, ge=1, le=1000, description="Shortlist size"),
+    min_score: float = Query(0.8, ge=0.0, le=1.0, description="Minimum match score"),
+    max_missing: int = Query(0, ge=0, description="Required skills a candidate may lack"),
+    user=Depends(get_current_user),
+    db=Depends(get_database)
+):
+    job = await get_own_job(job_id, user, db)
+    version = await live_ranking(db, job)
+    shortlister = Shortlister(
+        min_score=min_score,
+        top_k=k,
+        required_skills={job["_id"]: job.get("skills_required")},
+        max_missing=max_missing,
+    )
+
+    async def lines():
+        async for rejection in shortlist_stream(scored_candidates(db, job["_id"], version), shortlister):
+            rejection.pop("job_id", None)
+            yield json.dumps(rejection) + "\n"
+        shortlisted = [
+            {"id": candidate["id"], "match_score": candidate["match_score"]}
+            for candidate in shortlister.shortlist().get(job["_id"], [])
+        ]
+        yield json.dumps({"shortlisted": shortlisted, "stats": shortlister.stats()}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,8 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
-import pdfplumber
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from ..config import settings
 from ..database.mongo import get_database
-from typing import Dict, Any
+from ..services.pdf_extraction import PdfTimeoutError, extract_pdf_text
+from ..services.resume_ingest import ingest_resumes, list_pdf_sources
+from ..services.retrieval import RESUMES, index_document
+from ..services.candidate_ranking import candidate_rescorer
+from ..services.match_worker import log_change
+from ..utils.jwt_handler import get_current_user
+from ..utils.result_cache import content_key
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import json
+import tempfile
 
 router = APIRouter(
     prefix="/resume",
@@ -23,37 +34,101 @@ class ResumeResponse(BaseModel):
     response_model=ResumeResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Upload and parse resume",
-    description="Upload a PDF resume and extract its text content",
+    description="Upload a PDF resume for the signed-in user and extract its text content",
     responses={
         201: {"description": "Resume processed successfully"},
         400: {"description": "Invalid file format"},
+        422: {"description": "Resume took too long to process"},
         500: {"description": "Error processing resume"}
     }
 )
 async def upload_resume(
     file: UploadFile = File(..., description="PDF resume file to upload"),
+    backend: Optional[str] = Query(None, description="PDF extractor: pdfplumber or pymupdf (defaults to PDF_BACKEND)"),
+    user=Depends(get_current_user),
     db=Depends(get_database)
 ):
     try:
-        with pdfplumber.open(file.file) as pdf:
-            text = "\n".join(
-                page.extract_text() 
-                for page in pdf.pages 
-                if page.extract_text()
-            )
+        data = await file.read()
+        text = await extract_pdf_text(data, backend)
 
+        # The owner's email ties the text to their candidate profile for ranking and matching
         resume_data = {
+            "email": user["email"],
             "filename": file.filename,
-            "content": text
+            "content": text,
+            "content_hash": content_key(data),
+            "uploaded_at": datetime.now()
         }
 
-        await db["resumes"].insert_one(resume_data)
+        result = await db["resumes"].insert_one(resume_data)
+        await index_document(db, RESUMES, result.inserted_id)
+        candidate_rescorer.schedule(db, user["email"])
+        await log_change(db, "resumes", "insert", result.inserted_id, {"email": user["email"]})
         return {
             "msg": "Resume uploaded successfully", 
             "extracted_text": text[:500]  # sample output
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PdfTimeoutError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing resume: {str(e)}"
         )
+
+@router.post(
+    "/bulk",
+    summary="Bulk upload resumes",
+    description="Recruiters only: upload several PDF resumes or ZIP archives of them. Files are parsed in parallel "
+                "and progress is streamed back as Server-Sent Events: one `progress` event per file, "
+                "then a `done` event with totals.",
+    responses={
+        200: {"description": "Event stream of ingestion progress", "content": {"text/event-stream": {}}},
+        400: {"description": "No PDF files found"},
+        403: {"description": "Only recruiters can bulk upload resumes"},
+        413: {"description": "Too many files"}
+    }
+)
+async def bulk_upload_resumes(
+    files: List[UploadFile] = File(..., description="PDF resumes and/or ZIP archives of PDF resumes"),
+    user=Depends(get_current_user),
+    db=Depends(get_database)
+):
+    if user["role"] != "recruiter":
+        raise HTTPException(status_code=403, detail="Only recruiters can bulk upload resumes")
+    # The uploads are closed once this handler returns, so copy them to files
+    # the event stream owns; archives are then read member by member.
+    spooled = []
+    sources = []
+    try:
+        for upload in files:
+            tmp = tempfile.TemporaryFile()
+            spooled.append(tmp)
+            while chunk := await upload.read(1024 * 1024):
+                tmp.write(chunk)
+            sources.extend(list_pdf_sources(upload.filename, tmp))
+        if not sources:
+            raise HTTPException(status_code=400, detail="No PDF files found")
+        if len(sources) > settings.BULK_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"At most {settings.BULK_MAX_FILES} files per upload")
+    except BaseException:
+        for tmp in spooled:
+            tmp.close()
+        raise
+
+    async def event_stream():
+        try:
+            async for event in ingest_resumes(sources, db):
+                yield f"event: {event.pop('event')}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            for tmp in spooled:
+                tmp.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
 from src.models.user import UserBase, UserInDB
 from src.database.mongo import get_database
+from src.services.blob_store import RangeNotSatisfiable, ResumeBlobStore, content_disposition, parse_range
+from src.services.match_worker import log_change
+from src.utils.jwt_handler import get_current_user
 from datetime import datetime
+from typing import Optional
 import os
 
 router = APIRouter()
@@ -15,15 +23,68 @@ async def get_user_profile(email: str, db=Depends(get_database)):
 
 @router.post("/resume")
 async def upload_resume(
-    email: str,
     file: UploadFile = File(...),
+    user=Depends(get_current_user),
     db=Depends(get_database)
 ):
-    content = await file.read()
-    await db["resumes"].insert_one({
+    # Stored under the signed-in user: downloads trust this email as the owner
+    email = user["email"]
+    # The file goes to GridFS in chunks; the resume document only references it
+    stored = await ResumeBlobStore(db).save(file, metadata={"email": email})
+    result = await db["resumes"].insert_one({
         "email": email,
         "filename": file.filename,
-        "content": content,
+        "content_type": file.content_type,
+        "file_id": stored["file_id"],
+        "length": stored["length"],
+        "content_hash": stored["content_hash"],
         "uploaded_at": datetime.now()
     })
-    return {"message": "Resume uploaded successfully"}
+    await log_change(db, "resumes", "insert", result.inserted_id, {"email": email})
+    return {"message": "Resume uploaded successfully", "resume_id": str(result.inserted_id)}
+
+@router.get("/resume/{resume_id}/file")
+async def download_resume(
+    resume_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    user=Depends(get_current_user),
+    db=Depends(get_database)
+):
+    try:
+        resume = await db["resumes"].find_one(
+            {"_id": ObjectId(resume_id)}, {"email": 1, "file_id": 1, "filename": 1, "content_type": 1}
+        )
+    except InvalidId:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if not resume or "file_id" not in resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    # Candidates may only download their own CV; recruiters may download any
+    if user["role"] != "recruiter" and resume.get("email") != user["email"]:
+        raise HTTPException(status_code=403, detail="Not allowed to download this resume")
+
+    store = ResumeBlobStore(db)
+    try:
+        grid_out = await store.open(resume["file_id"])
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Resume file not found")
+
+    size = grid_out.length
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": content_disposition(resume.get("filename")),
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        store.iter_range(grid_out, start, end),
+        status_code=206 if byte_range else 200,
+        media_type=resume.get("content_type") or "application/octet-stream",
+        headers=headers
+    )
@@ -0,0 +1,108 @@
+# services/blob_store.py
+import hashlib
+import os
+import re
+import unicodedata
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from urllib.parse import quote
+
+from bson import ObjectId
+from fastapi import UploadFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+RESUME_BUCKET = "resume_files"
+CHUNK_SIZE = 255 * 1024  # GridFS default chunk size
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into inclusive (start, end) offsets.
+
+    Returns None when the whole file should be sent (no header, or a form we
+    don't support such as multiple ranges, which RFC 9110 lets us ignore).
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def content_disposition(filename: Optional[str], fallback: str = "resume") -> str:
+    """``attachment`` header value for a user-supplied filename.
+
+    The exact name goes in RFC 5987 ``filename*`` (UTF-8, percent-encoded);
+    ``filename`` carries an ASCII-only approximation for older clients, with
+    quotes, backslashes and control characters replaced, so no filename can
+    break the header or fail latin-1 encoding.
+    """
+    filename = filename or fallback
+
+    def to_ascii(text: str) -> str:
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+        return re.sub(r'[^A-Za-z0-9._ ()-]', "_", text).strip()
+
+    stem, ext = os.path.splitext(filename)
+    stem = to_ascii(stem)
+    ascii_name = (stem if re.search(r"[A-Za-z0-9]", stem) else fallback) + to_ascii(ext)
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+class ResumeBlobStore:
+    """Raw resume files in GridFS, written and read in chunks so no file is held in memory whole."""
+
+    def __init__(self, db, bucket_name: str = RESUME_BUCKET):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name, chunk_size_bytes=CHUNK_SIZE)
+
+    async def save(self, upload: UploadFile, metadata: Optional[Dict] = None) -> Dict:
+        """Stream an upload into GridFS; returns its file id, length and SHA-256."""
+        digest = hashlib.sha256()
+        grid_in = self.bucket.open_upload_stream(
+            upload.filename or "resume",
+            metadata={**(metadata or {}), "content_type": upload.content_type},
+        )
+        try:
+            while chunk := await upload.read(CHUNK_SIZE):
+                digest.update(chunk)
+                await grid_in.write(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        return {"file_id": grid_in._id, "length": grid_in.length, "content_hash": digest.hexdigest()}
+
+    async def open(self, file_id: ObjectId):
+        return await self.bucket.open_download_stream(file_id)
+
+    async def iter_range(self, grid_out, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield bytes ``start``..``end`` (inclusive) of an open GridFS file."""
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, file_id: ObjectId) -> None:
+        await self.bucket.delete(file_id)
@@ -0,0 +1,292 @@
+# services/candidate_ranking.py
+import asyncio
+import base64
+import binascii
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+
+from ..config import settings
+from ..ml.job_matcher import JobMatcher
+from ..utils.metrics import timed
+from .retrieval import job_text
+
+logger = logging.getLogger(__name__)
+
+# Materialized rankings: one score document per (job, version, candidate),
+# plus one state document per ranked job naming the live version and the
+# model that produced it. A recompute writes a new version next to the live
+# one and then flips the state document, so readers never see it half done.
+SCORES_COLLECTION = "candidate_scores"
+RANKINGS_COLLECTION = "job_rankings"
+
+_locks: Dict[str, asyncio.Lock] = {}
+_lock_users: Counter = Counter()
+
+
+@asynccontextmanager
+async def _job_lock(key: str):
+    """Per-job lock, dropped once no request holds or waits for it."""
+    lock = _locks.setdefault(key, asyncio.Lock())
+    _lock_users[key] += 1
+    try:
+        async with lock:
+            yield
+    finally:
+        _lock_users[key] -= 1
+        if not _lock_users[key]:
+            del _lock_users[key]
+            del _locks[key]
+
+
+def candidate_text(profile: dict, resume: Optional[dict] = None) -> str:
+    parts = [profile.get("bio", ""), " ".join(profile.get("skills") or [])]
+    if resume:
+        parts.append(resume.get("content", ""))
+    return " ".join(parts)
+
+
+def encode_cursor(score: float, email: str) -> str:
+    return base64.urlsafe_b64encode(f"{score!r}:{email}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        score, email = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        return float(score), email
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+async def latest_resumes(db, emails: List[str]) -> Dict[str, dict]:
+    """Most recent resume with extracted text for each email, in one query."""
+    latest = {}
+    cursor = db["resumes"].find(
+        {"email": {"$in": emails}, "content": {"$exists": True}}, {"email": 1, "content": 1}
+    ).sort([("email", 1), ("uploaded_at", -1)])
+    async for resume in cursor:
+        latest.setdefault(resume["email"], resume)
+    return latest
+
+
+async def _score_batch(db, matcher: JobMatcher, job_id, version: ObjectId, text: str, profiles: List[dict]) -> None:
+    resumes = await latest_resumes(db, [profile["email"] for profile in profiles])
+    texts = [candidate_text(profile, resumes.get(profile["email"])) for profile in profiles]
+    scores = await asyncio.to_thread(timed("job_matcher_similarities", matcher.similarities), text, texts)
+    await db[SCORES_COLLECTION].bulk_write([
+        InsertOne({"job_id": job_id, "version": version, "email": profile["email"], "score": float(score)})
+        for profile, score in zip(profiles, scores)
+    ], ordered=False)
+
+
+async def compute_ranking(db, job: dict, batch_size: Optional[int] = None) -> ObjectId:
+    """Score every candidate against ``job`` as a new version and make it live; returns the version.
+
+    The previous version stays readable until the new one is complete, and
+    is deleted after the switch.
+    """
+    batch_size = batch_size or settings.RANKING_BATCH_SIZE
+    matcher = await asyncio.to_thread(JobMatcher)
+    text = job_text(job)
+    version = ObjectId()
+
+    scored = 0
+    batch = []
+    async for profile in db["candidates"].find({}, {"email": 1, "bio": 1, "skills": 1}).batch_size(batch_size):
+        batch.append(profile)
+        if len(batch) == batch_size:
+            await _score_batch(db, matcher, job["_id"], version, text, batch)
+            scored += len(batch)
+            batch = []
+    if batch:
+        await _score_batch(db, matcher, job["_id"], version, text, batch)
+        scored += len(batch)
+
+    await db[RANKINGS_COLLECTION].replace_one(
+        {"_id": job["_id"]},
+        {"version": version, "model_version": matcher.model_version, "candidates": scored, "computed_at": datetime.now()},
+        upsert=True,
+    )
+    await db[SCORES_COLLECTION].delete_many({"job_id": job["_id"], "version": {"$ne": version}})
+    return version
+
+
+async def ensure_ranking(db, job: dict) -> ObjectId:
+    """Compute the job's ranking unless a current one is already stored; returns the live version."""
+    model_version = (await asyncio.to_thread(JobMatcher)).model_version
+
+    def current(state: Optional[dict]) -> bool:
+        return state is not None and "version" in state and state.get("model_version") == model_version
+
+    state = await db[RANKINGS_COLLECTION].find_one({"_id": job["_id"]}, {"version": 1, "model_version": 1})
+    if current(state):
+        return state["version"]
+    async with _job_lock(str(job["_id"])):
+        # Another request may have computed it while this one waited for the lock
+        state = await db[RANKINGS_COLLECTION].find_one({"_id": job["_id"]}, {"version": 1, "model_version": 1})
+        if current(state):
+            return state["version"]
+        return await compute_ranking(db, job)
+
+
+async def ranked_candidates(
+    db,
+    job_id,
+    version: ObjectId,
+    min_score: float = 0.0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """Yield up to ``limit`` score documents of a ranking version, best first.
+
+    The threshold and the keyset cursor are part of the query, so only the
+    requested page is read, straight off the (job_id, version, score, email) index.
+    Yields ``limit + 1`` documents at most; the extra one tells the caller
+    there is a next page.
+    """
+    query = {"job_id": job_id, "version": version, "score": {"$gte": min_score}}
+    if cursor is not None:
+        after_score, after_email = decode_cursor(cursor)
+        query["$or"] = [
+            {"score": {"$lt": after_score}},
+            {"score": after_score, "email": {"$gt": after_email}},
+        ]
+    page = db[SCORES_COLLECTION].find(query, {"_id": 0, "email": 1, "score": 1})
+    async for doc in page.sort([("score", -1), ("email", 1)]).limit(limit + 1):
+        yield doc
+
+
+async def scored_candidates(db, job_id, version: ObjectId, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+    """Stream every score of a ranking version as shortlister input, with each candidate's skills."""
+    batch_size = batch_size or settings.RANKING_BATCH_SIZE
+    cursor = db[SCORES_COLLECTION].find(
+        {"job_id": job_id, "version": version}, {"_id": 0, "email": 1, "score": 1}
+    ).batch_size(batch_size)
+    batch = []
+
+    async def flush():
+        profiles = db["candidates"].find({"email": {"$in": [doc["email"] for doc in batch]}}, {"email": 1, "skills": 1})
+        skills = {profile["email"]: profile.get("skills", []) async for profile in profiles}
+        return [
+            {"id": doc["email"], "job_id": job_id, "match_score": doc["score"], "skills": skills.get(doc["email"], [])}
+            for doc in batch
+        ]
+
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            for candidate in await flush():
+                yield candidate
+            batch = []
+    if batch:
+        for candidate in await flush():
+            yield candidate
+
+
+async def invalidate_job(db, job_id) -> None:
+    """Drop a job's stored ranking; it is recomputed on the next request."""
+    await db[RANKINGS_COLLECTION].delete_one({"_id": job_id})
+    await db[SCORES_COLLECTION].delete_many({"job_id": job_id})
+
+
+async def rescore_candidate(db, email: str, batch_size: Optional[int] = None) -> int:
+    """Update one candidate's score in every stored ranking after their profile changed.
+
+    Only that candidate's rows are rewritten; the rest of each ranking stays
+    valid. Returns the number of rankings updated.
+    """
+    batch_size = batch_size or settings.RANKING_BATCH_SIZE
+    profile = await db["candidates"].find_one({"email": email}, {"email": 1, "bio": 1, "skills": 1})
+    if profile is None:
+        await db[SCORES_COLLECTION].delete_many({"email": email})
+        return 0
+    versions = {
+        state["_id"]: state["version"]
+        async for state in db[RANKINGS_COLLECTION].find({"version": {"$exists": True}}, {"version": 1})
+    }
+    if not versions:
+        return 0
+    resumes = await latest_resumes(db, [email])
+    text = candidate_text(profile, resumes.get(email))
+    matcher = await asyncio.to_thread(JobMatcher)
+
+    updated = 0
+    ranked_ids = list(versions)
+    for start in range(0, len(ranked_ids), batch_size):
+        jobs = await db["jobs"].find(
+            {"_id": {"$in": ranked_ids[start:start + batch_size]}},
+            {"title": 1, "description": 1, "skills_required": 1},
+        ).to_list(length=None)
+        if not jobs:
+            continue
+        scores = await asyncio.to_thread(
+            timed("job_matcher_similarities", matcher.similarities), text, [job_text(job) for job in jobs]
+        )
+        await db[SCORES_COLLECTION].bulk_write([
+            UpdateOne(
+                {"job_id": job["_id"], "version": versions[job["_id"]], "email": email},
+                {"$set": {"score": float(score)}},
+                upsert=True,
+            )
+            for job, score in zip(jobs, scores)
+        ], ordered=False)
+        updated += len(jobs)
+    return updated
+
+
+class CandidateRescorer:
+    """Runs :func:`rescore_candidate` in the background, off the request that changed the candidate.
+
+    A rescore costs one similarity per ranked job, so profile saves and
+    resume uploads only schedule it. At most ``concurrency`` run at once;
+    a candidate changed again while being rescored is rescored once more
+    afterwards, and further changes meanwhile coalesce into that one run.
+    """
+
+    def __init__(self, concurrency: int = 2):
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._again: Set[str] = set()
+
+    def schedule(self, db, email: str) -> None:
+        if email in self._tasks:
+            self._again.add(email)
+        else:
+            self._tasks[email] = asyncio.create_task(self._run(db, email))
+
+    async def _run(self, db, email: str) -> None:
+        try:
+            async with self._slots:
+                while True:
+                    self._again.discard(email)
+                    try:
+                        await rescore_candidate(db, email)
+                    except Exception as e:  # the next change or full recompute catches up
+                        logger.warning("Rescoring %s failed: %s", email, e)
+                    if email not in self._again:
+                        return
+        finally:
+            del self._tasks[email]
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self) -> None:
+        """Wait for every scheduled rescore (for scripts and tests)."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values())
+
+    async def aclose(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._again.clear()
+
+
+candidate_rescorer = CandidateRescorer(settings.RANKING_RESCORE_CONCURRENCY)
@@ -0,0 +1,228 @@
+# services/chat_hub.py
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from ..config import settings
+from .chat_memory import chat_memory
+from .llm_gateway import LLMError, llm_gateway
+
+logger = logging.getLogger(__name__)
+
+# WebSocket close codes
+NORMAL_CLOSURE = 1000
+GOING_AWAY = 1001
+UNSUPPORTED_DATA = 1003
+TRY_AGAIN_LATER = 1013
+
+_CLOSE = object()
+
+
+class ChatConnection:
+    """One chat WebSocket: a reader task and a writer fed by a bounded queue.
+
+    Everything sent to the client goes through ``outbox``. Token streaming
+    awaits queue space, so a slow client slows the LLM stream it is reading
+    rather than buffering it in memory, and a client that falls more than
+    ``send_timeout`` behind is disconnected. Heartbeats use ``send_nowait``
+    and are simply dropped when the queue is already full.
+
+    Client frames are JSON: ``{"type": "message", "content": ...}`` or
+    ``{"type": "ping"}``; a binary frame closes the connection with 1003.
+    Server frames: ``token``, ``done``, ``error``, ``ping`` and ``pong``.
+    """
+
+    def __init__(self, websocket: WebSocket, user: dict, queue_size: int = settings.CHAT_SEND_QUEUE_SIZE,
+                 send_timeout: float = settings.CHAT_SEND_TIMEOUT_SECONDS):
+        self.websocket = websocket
+        self.user = user
+        self.send_timeout = send_timeout
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.last_seen = self.last_active = time.monotonic()
+        self.close_code: Optional[int] = None
+        self.conversation: Optional[dict] = None
+        self._reply: Optional[asyncio.Task] = None
+        self._client_gone = False
+
+    @property
+    def generating(self) -> bool:
+        return self._reply is not None and not self._reply.done()
+
+    @property
+    def closed(self) -> bool:
+        return self.close_code is not None
+
+    def close(self, code: int = NORMAL_CLOSURE) -> None:
+        """Stop the connection; pending frames are discarded."""
+        if self.closed:
+            return
+        self.close_code = code
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        self.outbox.put_nowait(_CLOSE)
+
+    def send_nowait(self, frame: dict) -> bool:
+        if self.closed or self.outbox.full():
+            return False
+        self.outbox.put_nowait(frame)
+        return True
+
+    async def send(self, frame: dict) -> bool:
+        if self.closed:
+            return False
+        try:
+            await asyncio.wait_for(self.outbox.put(frame), self.send_timeout)
+        except asyncio.TimeoutError:
+            logger.info("Closing chat for %s: client is not reading", self.user["email"])
+            self.close(TRY_AGAIN_LATER)
+            return False
+        return not self.closed
+
+    async def serve(self) -> None:
+        """Run until the client leaves or the connection is closed; the caller has accepted the socket."""
+        reader = asyncio.create_task(self._read())
+        try:
+            await self._write()
+        finally:
+            reader.cancel()
+            if self._reply is not None:
+                self._reply.cancel()
+            if not self._client_gone:
+                try:
+                    await self.websocket.close(self.close_code or NORMAL_CLOSURE)
+                except (RuntimeError, OSError):
+                    pass
+
+    async def _write(self) -> None:
+        while True:
+            frame = await self.outbox.get()
+            if frame is _CLOSE:
+                return
+            try:
+                # A stalled TCP write counts as a slow client too
+                await asyncio.wait_for(self.websocket.send_text(json.dumps(frame)), self.send_timeout)
+            except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError, OSError):
+                self.close(GOING_AWAY)
+                return
+
+    async def _read(self) -> None:
+        try:
+            while not self.closed:
+                try:
+                    text = await self.websocket.receive_text()
+                except KeyError:  # a binary frame: Starlette finds no "text" in the message
+                    self.close(UNSUPPORTED_DATA)
+                    return
+                self.last_seen = time.monotonic()
+                try:
+                    frame = json.loads(text)
+                    kind = frame.get("type")
+                except (ValueError, AttributeError):
+                    kind = None
+                if kind == "ping":
+                    self.send_nowait({"type": "pong"})
+                elif kind == "pong":
+                    continue
+                elif kind == "message" and isinstance(frame.get("content"), str) and frame["content"].strip():
+                    self.last_active = self.last_seen
+                    if self.generating:
+                        self.send_nowait({"type": "error", "detail": "Still answering the previous message"})
+                    elif len(frame["content"]) > settings.CHAT_MAX_MESSAGE_CHARS:
+                        self.send_nowait({"type": "error", "detail": "Message is too long"})
+                    else:
+                        self._reply = asyncio.create_task(self._answer(frame["content"]))
+                else:
+                    self.send_nowait({"type": "error", "detail": "Expected {\"type\": \"message\", \"content\": ...}"})
+        except (WebSocketDisconnect, RuntimeError):
+            self._client_gone = True
+            self.close(NORMAL_CLOSURE)
+
+    async def _answer(self, message: str) -> None:
+        email = self.user["email"]
+        if self.conversation is None:
+            self.conversation = await chat_memory.aload(email)
+        tokens = []
+        try:
+            async for token in llm_gateway.stream(chat_memory.prompt(self.conversation, message)):
+                tokens.append(token)
+                if not await self.send({"type": "token", "content": token}):
+                    return
+        except LLMError as e:
+            await self.send({"type": "error", "detail": str(e)})
+            return
+        # Stored before "done": the client may leave as soon as it sees it, which cancels this task
+        await chat_memory.record(email, self.conversation, message, "".join(tokens))
+        await self.send({"type": "done"})
+
+
+class ChatHub:
+    """Registry of open chat connections with one shared heartbeat task.
+
+    Every ``heartbeat`` seconds the sweeper pings each connection, closes the
+    ones that haven't sent a frame (including pongs) for ``heartbeat_timeout``
+    and the ones whose user hasn't sent a message for ``idle_timeout``. A
+    single task for the whole process keeps idle connections cheap.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.CHAT_MAX_CONNECTIONS,
+        heartbeat: float = settings.CHAT_HEARTBEAT_SECONDS,
+        heartbeat_timeout: float = settings.CHAT_HEARTBEAT_TIMEOUT_SECONDS,
+        idle_timeout: float = settings.CHAT_IDLE_TIMEOUT_SECONDS,
+    ):
+        self.max_connections = max_connections
+        self.heartbeat = heartbeat
+        self.heartbeat_timeout = heartbeat_timeout
+        self.idle_timeout = idle_timeout
+        self.connections: Set[ChatConnection] = set()
+        self.evicted = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def full(self) -> bool:
+        return len(self.connections) >= self.max_connections
+
+    async def serve(self, connection: ChatConnection) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+        self.connections.add(connection)
+        try:
+            await connection.serve()
+        finally:
+            self.connections.discard(connection)
+
+    def sweep(self) -> None:
+        now = time.monotonic()
+        for connection in list(self.connections):
+            if now - connection.last_seen > self.heartbeat_timeout or now - connection.last_active > self.idle_timeout:
+                self.evicted += 1
+                connection.close(GOING_AWAY)
+            else:
+                connection.send_nowait({"type": "ping"})
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self.sweep()
+
+    async def aclose(self) -> None:
+        for connection in list(self.connections):
+            connection.close(GOING_AWAY)
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.connections),
+            "generating": sum(c.generating for c in self.connections),
+            "queued_frames": sum(c.outbox.qsize() for c in self.connections),
+            "evicted": self.evicted,
+        }
+
+
+chat_hub = ChatHub()
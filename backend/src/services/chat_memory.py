@@ -0,0 +1,194 @@
+# services/chat_memory.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ..config import settings
+from .llm_gateway import LLMError, llm_gateway
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "Condense this conversation between a job-seeker or recruiter and an assistant into notes of at most "
+    "{limit} characters. Keep names, skills, roles, preferences and open questions; drop pleasantries."
+)
+
+
+class ChatMemoryStore:
+    """Per-user conversation memory in SQLite, pruned to the ``max_sessions`` most recently used users.
+
+    Like the result cache's SQLiteStore, the database is opened on first use
+    (or by ``open``), so importing this module touches no files. Every call
+    is blocking SQLite I/O: from async code, go through ChatMemory's
+    ``aload``/``aforget``/``record``.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str, max_sessions: int = 100_000):
+        self.path = path
+        self.max_sessions = max_sessions
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def open(self) -> None:
+        with self._lock:
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_memory ("
+                " user TEXT PRIMARY KEY, summary TEXT NOT NULL, turns TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS chat_memory_updated ON chat_memory (updated_at)")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load(self, user: str) -> Dict:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT summary, turns FROM chat_memory WHERE user = ?", (user,)
+            ).fetchone()
+        if row is None:
+            return {"summary": "", "turns": []}
+        return {"summary": row[0], "turns": json.loads(row[1])}
+
+    def save(self, user: str, conversation: Dict) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_memory (user, summary, turns, updated_at) VALUES (?, ?, ?, ?)",
+                (user, conversation["summary"], json.dumps(conversation["turns"]), time.time()),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM chat_memory WHERE user IN ("
+                    " SELECT user FROM chat_memory ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_sessions,),
+                )
+
+    def delete(self, user: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM chat_memory WHERE user = ?", (user,))
+
+
+class ChatMemory:
+    """Bounded conversation memory: a running summary plus the most recent turns.
+
+    A conversation never holds more than roughly ``max_chars`` characters.
+    Once it grows past that, the oldest turns (everything but the last
+    ``keep_turns`` exchanges) are folded into the summary by the LLM, so the
+    prompt stays a fixed size however long the user has been chatting. If
+    the LLM is unavailable the folded turns are appended to the summary and
+    its oldest text is cut instead.
+    """
+
+    def __init__(
+        self,
+        store: ChatMemoryStore,
+        max_chars: int = settings.CHAT_MEMORY_MAX_CHARS,
+        keep_turns: int = settings.CHAT_MEMORY_KEEP_TURNS,
+        summary_chars: int = settings.CHAT_SUMMARY_MAX_CHARS,
+    ):
+        self.store = store
+        self.max_chars = max_chars
+        self.keep_turns = keep_turns
+        self.summary_chars = summary_chars
+
+    def load(self, user: str) -> Dict:
+        return self.store.load(user)
+
+    def forget(self, user: str) -> None:
+        self.store.delete(user)
+
+    async def aload(self, user: str) -> Dict:
+        return await asyncio.to_thread(self.store.load, user)
+
+    async def aforget(self, user: str) -> None:
+        await asyncio.to_thread(self.store.delete, user)
+
+    @staticmethod
+    def prompt(conversation: Dict, message: str) -> List[Dict[str, str]]:
+        """Messages for the LLM: summary as a system note, recent turns, then the new message."""
+        messages = []
+        if conversation["summary"]:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {conversation['summary']}"})
+        messages.extend(conversation["turns"])
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    @staticmethod
+    def size(summary: str, turns: List[Dict[str, str]]) -> int:
+        return len(summary) + sum(len(turn["content"]) for turn in turns)
+
+    async def record(self, user: str, conversation: Dict, message: str, reply: str) -> None:
+        """Append an exchange and persist it, then compact if over budget and persist again.
+
+        The exchange is stored before the (possibly slow) summary call, so a
+        caller cancelled while compacting doesn't lose it.
+        """
+        conversation["turns"].extend([
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": reply},
+        ])
+        await asyncio.to_thread(self.store.save, user, conversation)
+        if await self.compact(conversation):
+            await asyncio.to_thread(self.store.save, user, conversation)
+
+    async def compact(self, conversation: Dict) -> bool:
+        """Fold the oldest turns into the summary if over budget; returns whether anything changed."""
+        turns = conversation["turns"]
+        if self.size(conversation["summary"], turns) <= self.max_chars:
+            return False
+        keep = 2 * self.keep_turns
+        while keep > 2 and self.size(conversation["summary"], turns[-keep:]) > self.max_chars:
+            keep -= 2
+        folded = turns[:-keep]
+        if not folded:
+            return False
+        # Only touch the conversation once the summary is in, so a cancelled call leaves it whole
+        summary = await self.summarize(conversation["summary"], folded)
+        conversation["summary"], conversation["turns"] = summary, turns[-keep:]
+        return True
+
+    async def summarize(self, summary: str, turns: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+        if summary:
+            transcript = f"Earlier notes: {summary}\n{transcript}"
+        try:
+            summary = await llm_gateway.complete(
+                [
+                    {"role": "system", "content": SUMMARY_PROMPT.format(limit=self.summary_chars)},
+                    {"role": "user", "content": transcript},
+                ],
+                temperature=0,
+                max_tokens=self.summary_chars // 3,
+            )
+        except LLMError as e:
+            logger.warning("Conversation summary failed, truncating instead: %s", e)
+            summary = transcript
+        # Keep the most recent part if the model (or the fallback) overshoots
+        return summary.strip()[-self.summary_chars:]
+
+
+chat_memory = ChatMemory(ChatMemoryStore(settings.CHAT_MEMORY_DB_PATH, settings.CHAT_MEMORY_MAX_SESSIONS))
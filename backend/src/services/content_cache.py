@@ -0,0 +1,49 @@
+# services/content_cache.py
+from typing import Dict
+
+from ..config import settings
+from ..ml.cv_parser import CV_PARSER_VERSION, parse_resume_bytes
+from ..ml.jd_summarizer import SUMMARIZER_MODEL, summarize_jd
+from ..ml.pdf_text import PDF_BACKENDS, extract_text
+from ..utils.result_cache import ResultCache, SQLiteStore
+
+# Opened in the app lifespan (or on first use by scripts)
+store = SQLiteStore(settings.CACHE_DB_PATH)
+
+
+def _cache(namespace: str) -> ResultCache:
+    return ResultCache(
+        namespace,
+        store=store,
+        memory_size=settings.CACHE_MEMORY_SIZE,
+        ttl=settings.CACHE_TTL_SECONDS,
+        max_rows=settings.CACHE_MAX_ROWS,
+    )
+
+
+# Namespaces carry the producer so a model or extractor change never serves stale results
+summary_cache = _cache(f"jd_summary:{SUMMARIZER_MODEL}")
+resume_parse_cache = _cache(f"resume_parse:pymupdf:v{CV_PARSER_VERSION}")
+pdf_text_caches = {backend: _cache(f"pdf_text:{backend}") for backend in PDF_BACKENDS}
+llm_cache = _cache(f"llm:{settings.LLM_PROVIDER}:{settings.LLM_MODEL}")
+
+
+def cached_summarize_jd(jd_text: str) -> Dict:
+    return summary_cache.get_or_compute(jd_text, lambda: summarize_jd(jd_text))
+
+
+def cached_parse_resume(data: bytes) -> Dict:
+    return resume_parse_cache.get_or_compute(
+        data, lambda: parse_resume_bytes(data, settings.PDF_MAX_PAGES)
+    )
+
+
+def cached_extract_pdf_text(data: bytes, backend: str = settings.PDF_BACKEND) -> str:
+    return pdf_text_caches[backend].get_or_compute(
+        data, lambda: extract_text(data, backend, settings.PDF_MAX_PAGES)
+    )
+
+
+def cache_stats() -> Dict[str, dict]:
+    caches = (summary_cache, resume_parse_cache, *pdf_text_caches.values(), llm_cache)
+    return {cache.namespace: cache.stats() for cache in caches}
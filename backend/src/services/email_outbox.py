@@ -0,0 +1,203 @@
+# services/email_outbox.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+
+import aiosmtplib
+from pymongo import ReturnDocument
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Durable outbound queue: one document per message, moving
+# pending -> sending -> sent, or back to pending with a later
+# next_attempt_at after a transient failure, or to failed.
+OUTBOX_COLLECTION = "email_outbox"
+
+
+async def enqueue_emails(db, messages: List[dict]) -> int:
+    """Queue messages (``to``, ``subject``, ``body``, optional ``reply_to``) for delivery."""
+    if not messages:
+        return 0
+    now = datetime.now()
+    await db[OUTBOX_COLLECTION].insert_many([
+        {**message, "status": "pending", "attempts": 0, "next_attempt_at": now, "created_at": now}
+        for message in messages
+    ])
+    return len(messages)
+
+
+class RateLimiter:
+    """Token bucket shared by every sender: at most ``rate`` sends per second, bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SmtpConnection:
+    """One SMTP session reused across messages, reconnecting when the server drops it."""
+
+    def __init__(self):
+        self._client: Optional[aiosmtplib.SMTP] = None
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_SERVER,
+            port=settings.SMTP_PORT,
+            start_tls=settings.SMTP_START_TLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        )
+        await client.connect()
+        if settings.SMTP_USERNAME:
+            await client.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        return client
+
+    async def send(self, message: EmailMessage) -> None:
+        if self._client is None or not self._client.is_connected:
+            self._client = await self._connect()
+        try:
+            await self._client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # The server closed an idle session; retry once on a fresh one
+            self._client = await self._connect()
+            await self._client.send_message(message)
+
+    async def close(self) -> None:
+        if self._client is not None and self._client.is_connected:
+            try:
+                await self._client.quit()
+            except aiosmtplib.SMTPException:
+                self._client.close()
+        self._client = None
+
+
+def build_message(doc: dict) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.EMAIL_FROM
+    message["To"] = doc["to"]
+    message["Subject"] = doc["subject"]
+    if doc.get("reply_to"):
+        message["Reply-To"] = doc["reply_to"]
+    message.set_content(doc["body"])
+    return message
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies (bad recipient, rejected content) won't succeed on retry."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= e.code < 600 for e in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and 500 <= error.code < 600
+
+
+class OutboxSender:
+    """Delivers the outbox over ``connections`` reused SMTP sessions.
+
+    Each session claims one pending message at a time with an atomic
+    find-and-update, so several app processes can drain the same outbox. A
+    claim is a lease: a message stuck in ``sending`` after a crash becomes
+    claimable again once ``locked_until`` passes. Transient failures are
+    retried with exponential backoff up to ``max_attempts``.
+    """
+
+    def __init__(self, db, connections: Optional[int] = None, rate: Optional[float] = None,
+                 max_attempts: Optional[int] = None):
+        self.db = db
+        self.connections = connections or settings.EMAIL_CONNECTIONS
+        self.limiter = RateLimiter(rate or settings.EMAIL_RATE_PER_SECOND)
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self.sent = 0
+        self.failed = 0
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.now()
+        return await self.db[OUTBOX_COLLECTION].find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": "sending", "locked_until": now + timedelta(seconds=settings.EMAIL_LEASE_SECONDS)}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _deliver(self, connection: SmtpConnection, doc: dict) -> None:
+        await self.limiter.acquire()
+        try:
+            await connection.send(build_message(doc))
+        except (aiosmtplib.SMTPException, OSError) as e:
+            attempts = doc["attempts"] + 1
+            update = {"attempts": attempts, "last_error": str(e)[:500]}
+            if is_permanent(e) or attempts >= self.max_attempts:
+                update["status"] = "failed"
+                self.failed += 1
+                logger.warning("Giving up on email %s to %s: %s", doc["_id"], doc["to"], e)
+            else:
+                update["status"] = "pending"
+                update["next_attempt_at"] = datetime.now() + timedelta(
+                    seconds=settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+                )
+            await self.db[OUTBOX_COLLECTION].update_one({"_id": doc["_id"]}, {"$set": update})
+            if isinstance(e, (OSError, aiosmtplib.SMTPConnectError, aiosmtplib.SMTPTimeoutError)):
+                await connection.close()  # connection-level failure: reconnect for the next message
+            return
+        self.sent += 1
+        await self.db[OUTBOX_COLLECTION].update_one(
+            {"_id": doc["_id"]}, {"$set": {"status": "sent", "sent_at": datetime.now()}, "$inc": {"attempts": 1}}
+        )
+
+    async def _run(self, until_idle: bool = False) -> None:
+        connection = SmtpConnection()
+        try:
+            while not self._stopping.is_set():
+                doc = await self.claim()
+                if doc is None:
+                    if until_idle:
+                        return
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), settings.EMAIL_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                try:
+                    await self._deliver(connection, doc)
+                except Exception:
+                    logger.exception("Unexpected error sending email %s", doc["_id"])
+        finally:
+            await connection.close()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.connections)]
+
+    async def drain(self) -> None:
+        """Send until nothing is due, then return (for scripts and tests)."""
+        await asyncio.gather(*(self._run(until_idle=True) for _ in range(self.connections)))
+
+    async def aclose(self) -> None:
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "failed": self.failed, "connections": len(self._tasks)}
@@ -1,13 +1,277 @@
 # services/interview_scheduler.py
-from datetime import datetime
-from typing import Dict
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
 
-def schedule_interview(candidate_email: str, recruiter_email: str, datetime_str: str) -> Dict:
-    dt = datetime.fromisoformat(datetime_str)
-    # In a real app, you'd add to calendar or send email
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from ..config import settings
+from .email_outbox import enqueue_emails
+
+INTERVIEWS_COLLECTION = "interviews"
+# One document per (recruiter, slot) an interview covers, under a unique index
+SLOTS_COLLECTION = "interview_slots"
+# Rounds of re-reading calendars after another process booked a slot first
+MAX_BOOKING_ATTEMPTS = 3
+DUPLICATE_KEY = 11000
+
+_schedule_lock = asyncio.Lock()
+
+
+class SlotGrid:
+    """Fixed-length time slots from ``start`` over ``days``; a calendar is an int with bit i set when slot i is free."""
+
+    def __init__(self, start: datetime, days: int, slot_minutes: int):
+        self.slot = timedelta(minutes=slot_minutes)
+        # Round up to a slot boundary so grids built at different times line up
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = day + -(-(start - day) // self.slot) * self.slot
+        self.size = int(timedelta(days=days) / self.slot)
+
+    @property
+    def end(self) -> datetime:
+        return self.time(self.size)
+
+    def time(self, index: int) -> datetime:
+        return self.start + index * self.slot
+
+    def index(self, when: datetime) -> int:
+        """Slot containing ``when``, clamped to the grid."""
+        return max(0, min(self.size, (when - self.start) // self.slot))
+
+    def span(self, start: datetime, end: datetime) -> int:
+        """Bitmap of every slot overlapping [start, end)."""
+        first = self.index(start)
+        last = min(self.size, self.index(end - timedelta(microseconds=1)) + 1) if end > self.start else 0
+        return ((1 << (last - first)) - 1) << first if last > first else 0
+
+    def working_hours(self, day_start: int, day_end: int, weekdays_only: bool = True) -> int:
+        """Bitmap of slots inside working hours."""
+        mask = 0
+        day = self.start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < self.end:
+            if not weekdays_only or day.weekday() < 5:
+                mask |= self.span(day + timedelta(hours=day_start), day + timedelta(hours=day_end))
+            day += timedelta(days=1)
+        return mask
+
+
+def run_starts(free: int, length: int) -> int:
+    """Bitmap of slots where ``length`` consecutive free slots begin."""
+    starts = free
+    for shift in range(1, length):
+        starts &= free >> shift
+    return starts
+
+
+def allocate_slots(
+    calendars: Dict[str, int],
+    candidates: Iterable[str],
+    length: int,
+) -> List[Tuple[str, Optional[str], Optional[int]]]:
+    """Give each candidate the earliest slot run any interviewer still has free, in one pass.
+
+    A heap orders interviewers by their earliest free run, so each assignment
+    costs one pop and a recomputation for the interviewer just booked. Ties
+    go to the interviewer with fewer bookings. Candidates left over once
+    every calendar is full get ``(candidate, None, None)``.
+
+    :return: [(candidate, interviewer, first_slot_index), ...] in input order
+    """
+    calendars = dict(calendars)
+    booked = {interviewer: 0 for interviewer in calendars}
+
+    def earliest(interviewer: str) -> Optional[int]:
+        starts = run_starts(calendars[interviewer], length)
+        return (starts & -starts).bit_length() - 1 if starts else None
+
+    heap = []
+    for interviewer in calendars:
+        first = earliest(interviewer)
+        if first is not None:
+            heap.append((first, 0, interviewer))
+    heapq.heapify(heap)
+
+    block = (1 << length) - 1
+    assignments = []
+    for candidate in candidates:
+        if not heap:
+            assignments.append((candidate, None, None))
+            continue
+        first, _, interviewer = heapq.heappop(heap)
+        assignments.append((candidate, interviewer, first))
+        calendars[interviewer] &= ~(block << first)
+        booked[interviewer] += 1
+        following = earliest(interviewer)
+        if following is not None:
+            heapq.heappush(heap, (following, booked[interviewer], interviewer))
+    return assignments
+
+
+async def load_calendars(db, grid: SlotGrid, interviewers: List[str]) -> Dict[str, int]:
+    """Free-slot bitmaps: working hours minus interviews already booked in the grid's window."""
+    hours = grid.working_hours(settings.INTERVIEW_DAY_START_HOUR, settings.INTERVIEW_DAY_END_HOUR)
+    calendars = {interviewer: hours for interviewer in interviewers}
+    booked = db[INTERVIEWS_COLLECTION].find(
+        {
+            "recruiter_email": {"$in": interviewers},
+            "start": {"$lt": grid.end},
+            "end": {"$gt": grid.start},
+            "status": "scheduled",
+        },
+        {"recruiter_email": 1, "start": 1, "end": 1},
+    )
+    async for interview in booked:
+        calendars[interview["recruiter_email"]] &= ~grid.span(interview["start"], interview["end"])
+    # Reservations whose interview insert never landed still hold their slot
+    reserved = db[SLOTS_COLLECTION].find(
+        {"recruiter_email": {"$in": interviewers}, "start": {"$gte": grid.start, "$lt": grid.end}},
+        {"recruiter_email": 1, "start": 1},
+    )
+    async for slot in reserved:
+        calendars[slot["recruiter_email"]] &= ~grid.span(slot["start"], slot["start"] + grid.slot)
+    return calendars
+
+
+def invite_email(interview: dict, job: dict) -> dict:
+    start = interview["start"].strftime("%A %d %B %Y, %H:%M")
+    body = (
+        f"Hello,\n\n"
+        f"Thank you for applying for the {job.get('title', 'open')} position. We would like to invite you "
+        f"to an interview on {start} ({interview['duration_minutes']} minutes) with {interview['recruiter_email']}.\n\n"
+        f"Please reply to this email if the time does not suit you.\n"
+    )
     return {
-        "status": "scheduled",
-        "candidate": candidate_email,
-        "recruiter": recruiter_email,
-        "time": dt.isoformat()
+        "to": interview["candidate_email"],
+        "subject": f"Interview invitation: {job.get('title', 'your application')}",
+        "body": body,
+        "reply_to": interview["recruiter_email"],
     }
+
+
+async def schedule_interviews(
+    db,
+    job: dict,
+    candidates: List[str],
+    interviewers: List[str],
+    duration_minutes: int = 30,
+    start_after: Optional[datetime] = None,
+) -> Tuple[List[dict], List[str]]:
+    """Book interviews for a batch of candidates and queue their invitations.
+
+    Candidates who already have an interview scheduled for this job are skipped.
+    If another process books one of the chosen slots first, those candidates
+    are placed again from a reloaded calendar.
+
+    :return: (booked interview documents, candidates that couldn't be fitted in the horizon)
+    """
+    if start_after is not None and start_after.tzinfo is not None:
+        # Interview times are stored as naive local time, like datetime.now()
+        start_after = start_after.astimezone().replace(tzinfo=None)
+    slot_minutes = settings.INTERVIEW_SLOT_MINUTES
+    length = max(1, -(-duration_minutes // slot_minutes))
+    grid = SlotGrid(start_after or datetime.now(), settings.INTERVIEW_HORIZON_DAYS, slot_minutes)
+
+    booked, unplaced = [], []
+    try:
+        # Serialized so two batches in this process don't race each other; across
+        # processes every slot an interview covers is reserved under a unique
+        # (recruiter_email, start) key first, so overlapping interviews clash.
+        async with _schedule_lock:
+            scheduled = db[INTERVIEWS_COLLECTION].find(
+                {"job_id": job["_id"], "candidate_email": {"$in": candidates}, "status": "scheduled"},
+                {"candidate_email": 1},
+            )
+            skip = {interview["candidate_email"] async for interview in scheduled}
+            pending = [candidate for candidate in dict.fromkeys(candidates) if candidate not in skip]
+
+            for _ in range(MAX_BOOKING_ATTEMPTS):
+                if not pending:
+                    break
+                calendars = await load_calendars(db, grid, interviewers)
+                interviews = []
+                for candidate, interviewer, first in allocate_slots(calendars, pending, length):
+                    if interviewer is None:
+                        unplaced.append(candidate)
+                        continue
+                    interviews.append({
+                        "_id": ObjectId(),
+                        "job_id": job["_id"],
+                        "candidate_email": candidate,
+                        "recruiter_email": interviewer,
+                        "start": grid.time(first),
+                        "end": grid.time(first + length),
+                        "duration_minutes": duration_minutes,
+                        "status": "scheduled",
+                        "created_at": datetime.now(),
+                    })
+                pending = await _insert_interviews(db, interviews, booked, grid.slot)
+            # Still clashing after every retry: report them rather than loop on
+            unplaced.extend(pending)
+    finally:
+        # Invite whoever got booked, even if a later insert failed
+        await enqueue_emails(db, [invite_email(interview, job) for interview in booked])
+    return booked, unplaced
+
+
+async def _insert_all(collection, documents: List[dict]) -> List[int]:
+    """Insert documents unordered.
+
+    :return: indexes of the ones rejected by a unique index
+    """
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        return sorted(error["index"] for error in errors)
+    return []
+
+
+async def _reserve_slots(db, interviews: List[dict], slot: timedelta) -> List[dict]:
+    """Reserve every slot each interview covers.
+
+    :return: the interviews that clashed; their other reservations are released
+    """
+    reservations = []
+    for interview in interviews:
+        start = interview["start"]
+        while start < interview["end"]:
+            reservations.append({
+                "recruiter_email": interview["recruiter_email"], "start": start, "interview_id": interview["_id"],
+            })
+            start += slot
+    failed = {reservations[i]["interview_id"] for i in await _insert_all(db[SLOTS_COLLECTION], reservations)}
+    if failed:
+        await db[SLOTS_COLLECTION].delete_many({"interview_id": {"$in": list(failed)}})
+    return [interview for interview in interviews if interview["_id"] in failed]
+
+
+async def _insert_interviews(db, interviews: List[dict], booked: List[dict], slot: timedelta) -> List[str]:
+    """Reserve slots for interviews and insert them, appending the stored ones to ``booked``.
+
+    :return: candidates whose slot another process booked first, to place again
+    """
+    if not interviews:
+        return []
+    clashed = await _reserve_slots(db, interviews, slot)
+    clashed_ids = {interview["_id"] for interview in clashed}
+    reserved = [interview for interview in interviews if interview["_id"] not in clashed_ids]
+    if reserved:
+        # Interviews booked before slots were reserved are caught by the
+        # unique (recruiter_email, start) index on interviews instead
+        try:
+            rejected = set(await _insert_all(db[INTERVIEWS_COLLECTION], reserved))
+        except BulkWriteError as e:
+            rejected = {error["index"] for error in e.details.get("writeErrors", [])}
+            booked.extend(interview for i, interview in enumerate(reserved) if i not in rejected)
+            raise
+        failed = [interview for i, interview in enumerate(reserved) if i in rejected]
+        if failed:
+            await db[SLOTS_COLLECTION].delete_many({"interview_id": {"$in": [interview["_id"] for interview in failed]}})
+            clashed.extend(failed)
+        booked.extend(interview for i, interview in enumerate(reserved) if i not in rejected)
+    return [interview["candidate_email"] for interview in clashed]
@@ -0,0 +1,110 @@
+# services/job_listing.py
+import base64
+import binascii
+import hashlib
+import json
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import Request, Response
+
+from ..config import settings
+from ..utils.ttl_cache import TTLCache
+
+# Fields a client may ask for; ``id`` is always included
+LISTABLE_FIELDS = ("title", "description", "location", "skills_required", "posted_by")
+# Job board cards don't need the (long) description unless asked for
+DEFAULT_FIELDS = ("title", "location", "skills_required")
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma separated ``fields`` parameter; raises ValueError on unknown fields."""
+    if not fields:
+        return DEFAULT_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip() and field.strip() != "id"))
+    unknown = [field for field in requested if field not in LISTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(LISTABLE_FIELDS)}")
+    return requested
+
+
+def encode_cursor(job_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(job_id.binary).decode()
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+async def list_jobs(
+    db,
+    query: Dict,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict:
+    """One page of jobs, newest first, with only ``fields`` read from MongoDB.
+
+    Pages are keyed on ``_id`` (which grows with insertion time), so the
+    query seeks straight to the page through the index rather than skipping
+    over earlier pages, and jobs posted meanwhile don't shift later pages.
+    """
+    if cursor is not None:
+        query = {**query, "_id": {"$lt": decode_cursor(cursor)}}
+    projection = {field: 1 for field in fields}
+    docs = await db["jobs"].find(query, projection).sort("_id", -1).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]["_id"]) if len(docs) > limit else None
+    items = [{"id": str(doc.pop("_id")), **doc} for doc in docs[:limit]]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+class JobListCache:
+    """Short-lived cache of serialized job pages shared by every user of this process.
+
+    Entries hold the encoded response body and its ETag, so a hit costs no
+    query and no serialization. ``invalidate`` (called when jobs are written)
+    empties it; other worker processes catch up within ``ttl`` seconds.
+    A page read before an ``invalidate`` isn't stored after it.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generation = 0
+
+    async def page(self, key: Hashable, db, query: Dict, fields: Sequence[str], limit: int,
+                   cursor: Optional[str]) -> Tuple[bytes, str]:
+        """(JSON body, ETag) for a page, from the cache when possible."""
+        key = (key, tuple(fields), limit, cursor)
+        cached = self._cache.get(key)
+        if cached is None:
+            generation = self._generation
+            page = await list_jobs(db, query, fields, limit, cursor)
+            body = json.dumps(page, separators=(",", ":"), default=str).encode()
+            cached = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            if generation == self._generation:
+                self._cache.set(key, cached)
+        return cached
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+job_list_cache = JobListCache(maxsize=settings.JOB_LIST_CACHE_SIZE, ttl=settings.JOB_LIST_CACHE_TTL_SECONDS)
+
+
+def conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    """200 with the body, or 304 when the client's If-None-Match already has this ETag."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,158 @@
+# services/job_search.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from bson import ObjectId
+
+from ..config import settings
+from ..ml.bm25_index import BM25Index
+from ..utils.metrics import timed
+from .skill_index import normalize_skills, skill_list
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("location", "skills")
+_PROJECTION = {"title": 1, "description": 1, "location": 1, "skills_required": 1}
+# Writes from other workers are re-read this far back, to allow for clock skew between app servers
+_SKEW = timedelta(seconds=5)
+
+
+def normalize_location(location) -> str:
+    return location.strip().lower() if isinstance(location, str) else ""
+
+
+def _add_jobs(index: BM25Index, jobs: List[dict]) -> None:
+    for job in jobs:
+        location = normalize_location(job.get("location"))
+        index.add(
+            str(job["_id"]),
+            {"title": job.get("title") or "", "description": job.get("description") or ""},
+            {"location": [location] if location else [], "skills": normalize_skills(job.get("skills_required"))},
+        )
+
+
+class JobSearch:
+    """Full-text job search over an in-process BM25 index, with location/skill filters and facets.
+
+    The index is built from the jobs collection on first use (or at startup
+    via ``warm``). ``post_job``/``update_job`` add jobs to it as they are
+    written; every ``refresh_seconds`` a search also schedules a catch-up on
+    jobs whose ``updated_at`` is newer than the last sync, so writes handled
+    by other worker processes appear within that delay.
+    """
+
+    def __init__(self, refresh_seconds: float = 5, title_weight: float = 3, facet_size: int = 10):
+        self.refresh_seconds = refresh_seconds
+        self.title_weight = title_weight
+        self.facet_size = facet_size
+        self._index: Optional[BM25Index] = None
+        self._build: Optional[asyncio.Task] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self._synced_at: Optional[datetime] = None
+        self._next_refresh = 0.0
+
+    def warm(self, db) -> None:
+        """Start building the index in the background."""
+        if self._build is None:
+            self._build = asyncio.create_task(self._load(db))
+
+    async def _load(self, db, batch_size: int = 1000) -> None:
+        index = BM25Index({"title": self.title_weight, "description": 1.0}, facets=FACETS)
+        synced_at = datetime.now()
+        batch = []
+        async for job in db["jobs"].find({}, _PROJECTION).batch_size(batch_size):
+            batch.append(job)
+            if len(batch) == batch_size:
+                await asyncio.to_thread(_add_jobs, index, batch)
+                batch = []
+        await asyncio.to_thread(_add_jobs, index, batch)
+        await asyncio.to_thread(index.flush)
+        self._index = index
+        self._synced_at = synced_at
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    async def _catch_up(self, db) -> None:
+        synced_at = datetime.now()
+        try:
+            jobs = await db["jobs"].find(
+                {"updated_at": {"$gte": self._synced_at - _SKEW}}, _PROJECTION
+            ).to_list(length=None)
+            await asyncio.to_thread(_add_jobs, self._index, jobs)
+        except Exception as e:  # searches go on with the index as it is; the next refresh retries
+            logger.warning("Job search refresh failed: %s", e)
+            return
+        self._synced_at = synced_at
+
+    async def index(self, db) -> BM25Index:
+        self.warm(db)
+        if self._index is None:
+            try:
+                # Shielded: a client disconnecting mid-build mustn't cancel it for everyone else
+                await asyncio.shield(self._build)
+            except Exception:
+                self._build = None  # let the next search retry
+                raise
+        if time.monotonic() >= self._next_refresh and (self._refresh is None or self._refresh.done()):
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+            self._refresh = asyncio.create_task(self._catch_up(db))
+        return self._index
+
+    async def add(self, job_id, job: dict) -> None:
+        """Index a job written by this process; a no-op until the index exists."""
+        if self._index is not None:
+            await asyncio.to_thread(_add_jobs, self._index, [{**job, "_id": job_id}])
+
+    async def search(
+        self,
+        db,
+        query: str = "",
+        locations: Sequence[str] = (),
+        skills: Sequence[str] = (),
+        fields: Sequence[str] = ("title", "location", "skills_required"),
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict:
+        """Jobs matching ``query`` on title and description, best first, with facet counts.
+
+        Jobs must be in one of ``locations`` and require one of ``skills``
+        when those are given. Facets count every match, not just this page.
+
+        :return: {"total": int, "items": [{id, score, *fields}], "facets": {field: [{value, count}]}}
+        """
+        index = await self.index(db)
+        filters = {
+            "location": [normalize_location(location) for location in locations],
+            "skills": normalize_skills(list(skills)),
+        }
+        result = await asyncio.to_thread(timed("job_search", index.search), query, filters, limit, offset, self.facet_size)
+        ids = [ObjectId(job_id) for job_id, _ in result["hits"]]
+        docs = await db["jobs"].find({"_id": {"$in": ids}}, {field: 1 for field in fields}).to_list(length=len(ids))
+        docs_by_id = {str(doc.pop("_id")): doc for doc in docs}
+        for doc in docs:
+            if "skills_required" in doc:
+                doc["skills_required"] = skill_list(doc["skills_required"])
+        items = [
+            {"id": job_id, "score": round(score, 4), **docs_by_id[job_id]}
+            for job_id, score in result["hits"]
+            if job_id in docs_by_id  # deleted since it was indexed
+        ]
+        facets = {
+            name: [{"value": value, "count": count} for value, count in counts]
+            for name, counts in result["facets"].items()
+        }
+        return {"total": result["total"], "items": items, "facets": facets}
+
+    async def aclose(self) -> None:
+        for task in (self._build, self._refresh):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+job_search = JobSearch(
+    refresh_seconds=settings.JOB_SEARCH_REFRESH_SECONDS,
+    title_weight=settings.JOB_SEARCH_TITLE_WEIGHT,
+    facet_size=settings.JOB_SEARCH_FACET_SIZE,
+)
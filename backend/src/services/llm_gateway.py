@@ -0,0 +1,238 @@
+# services/llm_gateway.py
+import asyncio
+import json
+import logging
+import random
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from ..config import settings
+from ..utils.result_cache import ResultCache, content_key
+from .content_cache import llm_cache
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    """The provider failed or kept failing after retries."""
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"{response.status_code} from LLM provider")
+        self.response = response
+
+
+class OpenAIProvider:
+    """OpenAI-compatible Chat Completions API (OpenAI, Azure-style proxies, vLLM, Ollama, LocalAI...)."""
+
+    path = "/chat/completions"
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    def body(self, model: str, messages: Messages, temperature: float, max_tokens: Optional[int], stream: bool) -> dict:
+        body = {"model": model, "messages": messages, "temperature": temperature, "stream": stream}
+        if max_tokens:
+            body["max_tokens"] = max_tokens
+        return body
+
+    def text(self, payload: dict) -> str:
+        return payload["choices"][0]["message"]["content"] or ""
+
+    def delta(self, event: dict) -> str:
+        choices = event.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
+
+
+class AnthropicProvider:
+    """Anthropic Messages API."""
+
+    path = "/messages"
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        return {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+
+    def body(self, model: str, messages: Messages, temperature: float, max_tokens: Optional[int], stream: bool) -> dict:
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        body = {
+            "model": model,
+            "messages": [m for m in messages if m["role"] != "system"],
+            "temperature": temperature,
+            "max_tokens": max_tokens or 1024,
+            "stream": stream,
+        }
+        if system:
+            body["system"] = system
+        return body
+
+    def text(self, payload: dict) -> str:
+        return "".join(block.get("text", "") for block in payload.get("content", []))
+
+    def delta(self, event: dict) -> str:
+        return event.get("delta", {}).get("text", "") if event.get("type") == "content_block_delta" else ""
+
+
+PROVIDERS = {"openai": OpenAIProvider, "anthropic": AnthropicProvider}
+
+
+class LLMGateway:
+    """Shared async client for chat completions.
+
+    One pooled ``httpx.AsyncClient`` (keep-alive connections) serves every
+    request in the process, a semaphore caps in-flight calls, and transient
+    failures (connection errors, 429, 5xx) are retried with jittered
+    exponential backoff, honouring Retry-After. A streamed completion is only
+    retried until its first token has been sent. Completions requested with
+    ``cache=True`` are stored in ``cache`` keyed by the full request, so a
+    deterministic prompt (temperature 0) is generated once.
+    """
+
+    def __init__(
+        self,
+        provider: str = settings.LLM_PROVIDER,
+        base_url: str = settings.LLM_BASE_URL,
+        api_key: str = settings.LLM_API_KEY,
+        model: str = settings.LLM_MODEL,
+        max_concurrency: int = settings.LLM_MAX_CONCURRENCY,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        cache: Optional[ResultCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        self.provider = PROVIDERS[provider]()
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.cache = cache
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        # Created lazily so the client and semaphore belong to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.provider.headers(self.api_key),
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                ),
+                transport=self._transport,
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return settings.LLM_RETRY_BASE_SECONDS * 2 ** attempt * (0.5 + random.random() / 2)
+
+    async def _retrying(self, attempt_fn):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await attempt_fn()
+            except (httpx.TransportError, _RetryableStatus) as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"LLM request failed after {attempt + 1} attempts: {e}") from e
+                delay = self._backoff(attempt, getattr(e, "response", None))
+                logger.warning("LLM request failed (%s), retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableStatus(response)
+        if response.status_code >= 400:
+            raise LLMError(f"LLM provider rejected the request: {response.status_code} {response.text[:200]}")
+
+    async def complete(
+        self,
+        messages: Messages,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        cache: bool = False,
+    ) -> str:
+        """Return the full completion for ``messages``."""
+        body = self.provider.body(self.model, messages, temperature, max_tokens, stream=False)
+        key = content_key(json.dumps(body, sort_keys=True))
+        if cache and self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+
+        client = self._ensure_client()
+
+        async def attempt():
+            response = await client.post(self.provider.path, json=body)
+            self._check(response)
+            return self.provider.text(response.json())
+
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                text = await self._retrying(attempt)
+            finally:
+                self.in_flight -= 1
+        if cache and self.cache is not None:
+            await self.cache.aset(key, text)
+        return text
+
+    async def stream(
+        self,
+        messages: Messages,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Yield completion tokens as the provider produces them (server-sent events)."""
+        body = self.provider.body(self.model, messages, temperature, max_tokens, stream=True)
+        client = self._ensure_client()
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                for attempt in range(self.max_retries + 1):
+                    started = False
+                    try:
+                        async with client.stream("POST", self.provider.path, json=body) as response:
+                            if response.status_code >= 400:
+                                await response.aread()
+                            self._check(response)
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                try:
+                                    token = self.provider.delta(json.loads(data))
+                                except (ValueError, AttributeError) as e:
+                                    raise LLMError(f"LLM stream sent malformed data: {data[:200]}") from e
+                                if token:
+                                    started = True
+                                    yield token
+                        return
+                    except (httpx.TransportError, _RetryableStatus) as e:
+                        if started or attempt == self.max_retries:
+                            raise LLMError(f"LLM stream failed: {e}") from e
+                        await asyncio.sleep(self._backoff(attempt, getattr(e, "response", None)))
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+llm_gateway = LLMGateway(cache=llm_cache)
@@ -0,0 +1,359 @@
+# services/match_worker.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+
+from ..config import settings
+from ..ml.job_matcher import JobMatcher
+from .candidate_ranking import candidate_text, latest_resumes
+from .retrieval import job_text
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ("jobs", "candidates", "resumes")
+MATCHES_COLLECTION = "matches"
+CHECKPOINTS_COLLECTION = "change_stream_checkpoints"
+CHANGE_LOG_COLLECTION = "change_log"
+
+JOB_FIELDS = {"title": 1, "description": 1, "skills_required": 1}
+CANDIDATE_FIELDS = {"email": 1, "bio": 1, "skills": 1}
+
+# (resume token, change event) pairs, in the shape of a MongoDB change stream
+Change = Tuple[Any, Dict[str, Any]]
+
+
+class MongoChangeSource:
+    """Database-level change stream over the watched collections (needs a replica set)."""
+
+    def __init__(self, db, max_await_ms: int = 1000):
+        self.db = db
+        self.max_await_ms = max_await_ms
+        self._stream = None
+        self._pending = None
+
+    async def open(self, resume_token=None) -> Any:
+        """Start the stream and return a token for its starting point."""
+        pipeline = [{"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}}}]
+        self._stream = self.db.watch(
+            pipeline, full_document="updateLookup", resume_after=resume_token, max_await_time_ms=self.max_await_ms
+        )
+        # The first (possibly empty) batch sets the stream's post-batch resume token
+        self._pending = await self._stream.try_next()
+        return self._stream.resume_token
+
+    async def batch(self, max_events: int) -> List[Change]:
+        changes = []
+        if self._pending is not None:
+            changes.append((self._stream.resume_token, self._pending))
+            self._pending = None
+        while len(changes) < max_events:
+            event = await self._stream.try_next()
+            if event is None:
+                break
+            changes.append((self._stream.resume_token, event))
+        return changes
+
+    async def close(self) -> None:
+        if self._stream is not None:
+            await self._stream.close()
+
+
+class PollingChangeSource:
+    """Local stand-in for a change stream: polls an oplog-like ``change_log`` collection.
+
+    Each document is a change event (``ns``, ``operationType``, ``documentKey``
+    and optionally ``fullDocument``) with an ObjectId ``_id``. The app's job,
+    profile and resume writes append these events when ``MATCH_CHANGE_LOG``
+    is set. Lets the worker run against a standalone mongod, or mongomock in
+    tests.
+
+    ObjectIds come from the writing process, so two app workers can commit
+    events slightly out of ``_id`` order. Each poll therefore re-reads the
+    last ``overlap_seconds`` before the newest event returned and skips the
+    ones it already returned. The resume token is the newest ``_id``; resuming
+    replays that overlap, which is harmless because applying an event only
+    recomputes from the current documents.
+    """
+
+    def __init__(self, db, poll_interval: float = 1.0, collection: str = CHANGE_LOG_COLLECTION,
+                 overlap_seconds: Optional[float] = None):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.collection = collection
+        self.overlap = timedelta(seconds=settings.MATCH_CHANGE_LOG_OVERLAP_SECONDS if overlap_seconds is None
+                                 else overlap_seconds)
+        self._newest: Optional[ObjectId] = None
+        self._seen: Set[ObjectId] = set()
+
+    def _floor(self) -> Optional[ObjectId]:
+        return ObjectId.from_datetime(self._newest.generation_time - self.overlap) if self._newest else None
+
+    async def open(self, resume_token=None) -> Any:
+        self._seen = set()
+        if resume_token is None:
+            # Start from now: everything already logged counts as seen
+            last = await self.db[self.collection].find_one({}, {"_id": 1}, sort=[("_id", -1)])
+            self._newest = last["_id"] if last else None
+            if self._newest is not None:
+                self._seen = {event["_id"] async for event in self.db[self.collection].find(
+                    {"_id": {"$gt": self._floor()}}, {"_id": 1}
+                )}
+            return {"_id": self._newest} if self._newest else None
+        self._newest = resume_token["_id"]
+        return resume_token
+
+    async def batch(self, max_events: int) -> List[Change]:
+        floor = self._floor()
+        cursor = self.db[self.collection].find({"_id": {"$gt": floor}} if floor else {}).sort("_id", 1)
+        events = []
+        try:
+            async for event in cursor:
+                if event["_id"] not in self._seen:
+                    events.append(event)
+                    if len(events) == max_events:
+                        break
+        finally:
+            await cursor.close()
+        if not events:
+            await asyncio.sleep(self.poll_interval)
+            return []
+        self._seen.update(event["_id"] for event in events)
+        self._newest = max(self._newest or events[-1]["_id"], events[-1]["_id"])
+        floor = self._floor()
+        self._seen = {event_id for event_id in self._seen if event_id > floor}
+        return [({"_id": self._newest}, event) for event in events]
+
+    async def close(self) -> None:
+        pass
+
+
+def _change_event(collection: str, operation: str, document_id, full_document: Optional[dict]) -> dict:
+    event = {
+        "ns": {"coll": collection},
+        "operationType": operation,
+        "documentKey": {"_id": document_id},
+        "logged_at": datetime.now(),
+    }
+    if full_document is not None:
+        event["fullDocument"] = full_document
+    return event
+
+
+async def log_change(db, collection: str, operation: str, document_id, full_document: Optional[dict] = None) -> None:
+    """Append an event to the polling stand-in's change log; a no-op unless MATCH_CHANGE_LOG is set."""
+    if settings.MATCH_CHANGE_LOG:
+        await db[CHANGE_LOG_COLLECTION].insert_one(_change_event(collection, operation, document_id, full_document))
+
+
+async def log_changes(db, collection: str, operation: str, documents: List[Tuple[Any, Optional[dict]]]) -> None:
+    """:func:`log_change` for a batch of ``(document_id, full_document)`` pairs, in one write."""
+    if settings.MATCH_CHANGE_LOG and documents:
+        await db[CHANGE_LOG_COLLECTION].insert_many(
+            [_change_event(collection, operation, document_id, full_document) for document_id, full_document in documents]
+        )
+
+
+class MatchWorker:
+    """Keeps ``matches`` up to date with one document per (job, candidate) pair scoring at least ``min_score``.
+
+    Change events are read in batches and coalesced, so a burst of edits to
+    one job or candidate is recomputed once. A job change rescores that job
+    against every candidate; a candidate or resume change rescores that
+    candidate against the in-memory job index. The resume token of the last
+    applied batch is checkpointed, so a restart carries on from there; only
+    the very first run computes every pair.
+    """
+
+    def __init__(self, db, source, name: str = "matches", min_score: Optional[float] = None,
+                 batch_size: Optional[int] = None):
+        self.db = db
+        self.source = source
+        self.name = name
+        self.min_score = settings.MATCH_MIN_SCORE if min_score is None else min_score
+        self.batch_size = batch_size or settings.MATCH_WORKER_BATCH_SIZE
+        self.matcher = JobMatcher()
+        self._stopping = asyncio.Event()
+
+    async def load_checkpoint(self) -> Optional[dict]:
+        return await self.db[CHECKPOINTS_COLLECTION].find_one({"_id": self.name})
+
+    async def save_checkpoint(self, token) -> None:
+        await self.db[CHECKPOINTS_COLLECTION].update_one(
+            {"_id": self.name}, {"$set": {"token": token, "updated_at": datetime.now()}}, upsert=True
+        )
+
+    async def _load_jobs(self) -> None:
+        jobs = await self.db["jobs"].find({}, JOB_FIELDS).to_list(length=None)
+        await asyncio.to_thread(self.matcher.set_jobs, [job["_id"] for job in jobs], [job_text(job) for job in jobs])
+
+    async def _write(self, upserts: List[Tuple[Any, dict, float]], deletes: List[dict]) -> None:
+        now = datetime.now()
+        ops = [
+            UpdateOne(
+                {"job_id": job_id, "email": profile["email"]},
+                {"$set": {"candidate_id": profile["_id"], "score": score, "updated_at": now}},
+                upsert=True,
+            )
+            for job_id, profile, score in upserts
+        ]
+        ops.extend(DeleteOne(query) for query in deletes)
+        for start in range(0, len(ops), self.batch_size):
+            await self.db[MATCHES_COLLECTION].bulk_write(ops[start:start + self.batch_size], ordered=False)
+
+    async def _candidate_texts(self, profiles: List[dict]) -> List[str]:
+        resumes = await latest_resumes(self.db, [profile["email"] for profile in profiles])
+        return [candidate_text(profile, resumes.get(profile["email"])) for profile in profiles]
+
+    async def recompute_candidates(self, profiles: List[dict]) -> None:
+        """Rescore candidates against every job and replace their pairs.
+
+        New pairs are written before the stale ones are deleted, so readers
+        never see a candidate with no matches in between.
+        """
+        if not profiles:
+            return
+        texts = await self._candidate_texts(profiles)
+        results = await asyncio.to_thread(
+            self.matcher.match_many, texts, top_k=self.matcher.job_count, min_score=self.min_score
+        )
+        started = datetime.now()
+        await self._write(
+            [(job_id, profile, score) for profile, matches in zip(profiles, results) for job_id, score in matches],
+            [],
+        )
+        await self.db[MATCHES_COLLECTION].delete_many({
+            "candidate_id": {"$in": [profile["_id"] for profile in profiles]},
+            "updated_at": {"$lt": started},
+        })
+
+    async def recompute_job(self, job: dict) -> None:
+        """Rescore one job against every candidate, upserting pairs above the threshold and dropping the rest."""
+        text = job_text(job)
+        cursor = self.db["candidates"].find({}, CANDIDATE_FIELDS).batch_size(self.batch_size)
+        batch = []
+        async for profile in cursor:
+            batch.append(profile)
+            if len(batch) == self.batch_size:
+                await self._rescore_job_batch(job["_id"], text, batch)
+                batch = []
+        if batch:
+            await self._rescore_job_batch(job["_id"], text, batch)
+
+    async def _rescore_job_batch(self, job_id, text: str, profiles: List[dict]) -> None:
+        texts = await self._candidate_texts(profiles)
+        scores = await asyncio.to_thread(self.matcher.similarities, text, texts)
+        upserts, deletes = [], []
+        for profile, score in zip(profiles, scores):
+            if score >= self.min_score:
+                upserts.append((job_id, profile, float(score)))
+            else:
+                deletes.append({"job_id": job_id, "email": profile["email"]})
+        await self._write(upserts, deletes)
+
+    async def recompute_all(self) -> None:
+        await self.db[MATCHES_COLLECTION].delete_many({"job_id": {"$exists": True}})
+        cursor = self.db["candidates"].find({}, CANDIDATE_FIELDS).batch_size(self.batch_size)
+        batch = []
+        async for profile in cursor:
+            batch.append(profile)
+            if len(batch) == self.batch_size:
+                await self.recompute_candidates(batch)
+                batch = []
+        await self.recompute_candidates(batch)
+
+    async def apply(self, events: List[Dict[str, Any]]) -> None:
+        """Recompute the pairs affected by a batch of change events."""
+        jobs: Dict[Any, bool] = {}  # job id -> deleted, last event wins
+        candidate_ids: Set[Any] = set()
+        deleted_candidates: Set[Any] = set()
+        emails: Set[str] = set()
+        for event in events:
+            collection = event["ns"]["coll"]
+            doc_id = event["documentKey"]["_id"]
+            deleted = event["operationType"] == "delete"
+            if collection == "jobs":
+                jobs[doc_id] = deleted
+            elif collection == "candidates":
+                (deleted_candidates if deleted else candidate_ids).add(doc_id)
+            elif collection == "resumes" and not deleted:
+                email = (event.get("fullDocument") or {}).get("email")
+                if email:
+                    emails.add(email)
+
+        changed_jobs = await self.db["jobs"].find(
+            {"_id": {"$in": [job_id for job_id, deleted in jobs.items() if not deleted]}}, JOB_FIELDS
+        ).to_list(length=None)
+        # A job updated and then deleted before the batch was read is not found: treat it as removed
+        found = {job["_id"] for job in changed_jobs}
+        removed_jobs = [job_id for job_id in jobs if job_id not in found]
+
+        if removed_jobs:
+            self.matcher.remove_jobs(removed_jobs)
+            await self.db[MATCHES_COLLECTION].delete_many({"job_id": {"$in": removed_jobs}})
+        if changed_jobs:
+            await asyncio.to_thread(
+                self.matcher.add_jobs, [job["_id"] for job in changed_jobs], [job_text(job) for job in changed_jobs]
+            )
+        if deleted_candidates:
+            await self.db[MATCHES_COLLECTION].delete_many({"candidate_id": {"$in": list(deleted_candidates)}})
+
+        profiles = await self.db["candidates"].find(
+            {"$or": [{"_id": {"$in": list(candidate_ids)}}, {"email": {"$in": list(emails)}}]}, CANDIDATE_FIELDS
+        ).to_list(length=None) if candidate_ids or emails else []
+        # Candidates whose pairs are rewritten below already see the changed jobs
+        await self.recompute_candidates(profiles)
+        for job in changed_jobs:
+            await self.recompute_job(job)
+
+    async def run(self) -> None:
+        checkpoint = await self.load_checkpoint()
+        start = await self.source.open(checkpoint["token"] if checkpoint else None)
+        # Loaded after the source is open, so a job written in between is
+        # both in the index and replayed as an event, never missed
+        await self._load_jobs()
+        if checkpoint is None:
+            # First run: the stream is already open, so writes made while the
+            # full computation runs are replayed afterwards, not lost.
+            logger.info("No checkpoint for %s, computing all matches", self.name)
+            await self.recompute_all()
+            await self.save_checkpoint(start)
+        try:
+            while not self._stopping.is_set():
+                changes = await self.source.batch(self.batch_size)
+                if not changes:
+                    continue
+                await self.apply([event for _, event in changes])
+                await self.save_checkpoint(changes[-1][0])
+        finally:
+            await self.source.close()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def top_matches(db, email: str, limit: int = 20) -> List[dict]:
+    """A candidate's materialized matches, best first, read off the (email, score) index."""
+    cursor = db[MATCHES_COLLECTION].find(
+        {"email": email, "job_id": {"$exists": True}}, {"_id": 0, "job_id": 1, "score": 1}
+    )
+    return await cursor.sort("score", -1).limit(limit).to_list(length=limit)
+
+
+if __name__ == "__main__":
+    # python -m src.services.match_worker            # tail change streams (replica set)
+    # python -m src.services.match_worker --poll     # poll the change_log collection instead
+    import sys
+    from ..database import mongo
+
+    logging.basicConfig(level=logging.INFO)
+    mongo.connect()
+    database = mongo.get_db()
+    source = PollingChangeSource(database) if "--poll" in sys.argv else MongoChangeSource(database)
+    try:
+        asyncio.run(MatchWorker(database, source).run())
+    except KeyboardInterrupt:
+        pass
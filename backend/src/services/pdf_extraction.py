@@ -0,0 +1,137 @@
+# services/pdf_extraction.py
+import asyncio
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from ..config import settings
+from ..ml.cv_parser import parse_resume_bytes
+from ..ml.pdf_text import PDF_BACKENDS, extract_text
+from ..utils.result_cache import content_key
+from .content_cache import pdf_text_caches, resume_parse_cache
+
+
+class PdfTimeoutError(Exception):
+    """Raised when a PDF takes longer than the per-file timeout to process."""
+
+
+class PdfProcessPool:
+    """Bounded process pool that keeps PDF parsing off the event loop.
+
+    At most ``max_pending`` files are submitted at once; further callers wait
+    for a slot. A file that exceeds ``timeout`` fails with PdfTimeoutError:
+    the pool's worker processes are killed and a fresh pool started, so a
+    pathological PDF can neither hold a worker nor leave a process running
+    behind it. Other files that were in that pool are resubmitted to the new
+    one rather than failed.
+    """
+
+    # Times a file is resubmitted after other files' timeouts killed its pool
+    MAX_RESUBMITS = 3
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, timeout: float = 20):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._killed: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers waiting for a slot plus files submitted to the workers."""
+        return self._waiting + self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs Motor and executor threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor, kill: bool = False) -> None:
+        """Stop using ``executor``; with ``kill``, terminate its workers too.
+
+        Shutting a pool down doesn't stop a worker stuck on a file, so after a
+        timeout the processes are killed. That breaks the pool, which fails
+        every other future in it with BrokenProcessPool; ``run`` resubmits those.
+        """
+        if self._executor is executor:
+            self._executor = None
+        if kill:
+            self._killed.add(executor)
+            # Not public API, but the only handle on the workers of a ProcessPoolExecutor
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                if process.is_alive():
+                    process.kill()
+        executor.shutdown(wait=False)
+
+    async def run(self, fn: Callable, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            for attempt in range(self.MAX_RESUBMITS + 1):
+                executor = self._get_executor()
+                future = loop.run_in_executor(executor, fn, *args)
+                try:
+                    return await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    self._recycle(executor, kill=True)
+                    raise PdfTimeoutError(f"PDF processing exceeded {self.timeout:g}s")
+                except BrokenProcessPool:
+                    if executor in self._killed and attempt < self.MAX_RESUBMITS:
+                        continue  # killed for another file's timeout; this one gets a fresh pool
+                    # A worker died (e.g. crashed on a malformed file); start fresh for the next caller
+                    self._recycle(executor)
+                    raise
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+pdf_pool = PdfProcessPool(
+    max_workers=settings.PDF_WORKERS,
+    max_pending=settings.PDF_MAX_PENDING,
+    timeout=settings.PDF_TIMEOUT_SECONDS,
+)
+
+
+async def extract_pdf_text(data: bytes, backend: Optional[str] = None) -> str:
+    """Extract PDF text in the process pool, served from the content cache when possible."""
+    backend = backend or settings.PDF_BACKEND
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    cache = pdf_text_caches[backend]
+    key = content_key(data)
+    text = await cache.aget(key)
+    if text is None:
+        text = await pdf_pool.run(extract_text, data, backend, settings.PDF_MAX_PAGES)
+        await cache.aset(key, text)
+    return text
+
+
+async def parse_resume(data: bytes) -> Dict:
+    """Run ml.cv_parser on a PDF in the process pool, served from the content cache when possible."""
+    key = content_key(data)
+    parsed = await resume_parse_cache.aget(key)
+    if parsed is None:
+        parsed = await pdf_pool.run(parse_resume_bytes, data, settings.PDF_MAX_PAGES)
+        await resume_parse_cache.aset(key, parsed)
+    return parsed
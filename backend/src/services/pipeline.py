@@ -0,0 +1,519 @@
+# services/pipeline.py
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from bson import ObjectId
+
+from ..config import settings
+from ..ml.job_matcher import JobMatcher
+from .interview_scheduler import schedule_interviews
+from .pdf_extraction import parse_resume, pdf_pool
+from .resume_ingest import Source, list_pdf_sources, read_source
+from .shortlisting import Shortlister
+from .summarization import summarization_service
+
+logger = logging.getLogger(__name__)
+
+# Stages, in DAG order:
+#
+#   summarize (JD) ──┐
+#   parse (per CV) ──┴─> match (per CV) ──> shortlist ──> schedule
+SUMMARIZE, PARSE, MATCH, SHORTLIST, SCHEDULE = "summarize", "parse", "match", "shortlist", "schedule"
+STAGES = (SUMMARIZE, PARSE, MATCH, SHORTLIST, SCHEDULE)
+
+# Task and run states
+RUNNING, DONE, FAILED = "running", "done", "failed"
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+_END = object()
+
+
+class TaskStore:
+    """Durable run and task state for the pipeline, in SQLite (WAL).
+
+    Every task's result is written as soon as it finishes, so a run that
+    crashes or is interrupted picks up where it stopped: finished tasks are
+    replayed from here instead of being recomputed, and tasks left
+    ``running`` are simply run again. Every call is blocking SQLite I/O, so
+    Pipeline makes them with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pipeline_runs ("
+            " run_id TEXT PRIMARY KEY, spec TEXT NOT NULL, status TEXT NOT NULL,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pipeline_tasks ("
+            " run_id TEXT NOT NULL, stage TEXT NOT NULL, key TEXT NOT NULL, status TEXT NOT NULL,"
+            " result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (run_id, stage, key))"
+        )
+        self._lock = threading.Lock()
+
+    def create_run(self, run_id: str, spec: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pipeline_runs (run_id, spec, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, json.dumps(spec), RUNNING, now, now),
+            )
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT spec, status, created_at, updated_at FROM pipeline_runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"run_id": run_id, "spec": json.loads(row[0]), "status": row[1], "created_at": row[2], "updated_at": row[3]}
+
+    def set_run_status(self, run_id: str, status: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pipeline_runs SET status = ?, updated_at = ? WHERE run_id = ?", (status, time.time(), run_id)
+            )
+
+    def completed(self, run_id: str, stage: str, unless: Optional[str] = None) -> Dict[str, Any]:
+        """Results of the stage's finished tasks by key, leaving out keys already finished in ``unless``."""
+        query = "SELECT key, result FROM pipeline_tasks WHERE run_id = ? AND stage = ? AND status = ?"
+        params = [run_id, stage, DONE]
+        if unless is not None:
+            query += " AND key NOT IN (SELECT key FROM pipeline_tasks WHERE run_id = ? AND stage = ? AND status = ?)"
+            params += [run_id, unless, DONE]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {key: json.loads(result) for key, result in rows}
+
+    def start(self, run_id: str, stage: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pipeline_tasks (run_id, stage, key, status, attempts, updated_at) VALUES (?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT (run_id, stage, key) DO UPDATE SET"
+                " status = excluded.status, attempts = attempts + 1, error = NULL, updated_at = excluded.updated_at",
+                (run_id, stage, key, RUNNING, time.time()),
+            )
+
+    def finish(self, run_id: str, stage: str, key: str, result: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pipeline_tasks SET status = ?, result = ?, updated_at = ? WHERE run_id = ? AND stage = ? AND key = ?",
+                (DONE, json.dumps(result, default=str), time.time(), run_id, stage, key),
+            )
+
+    def fail(self, run_id: str, stage: str, key: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pipeline_tasks SET status = ?, error = ?, updated_at = ? WHERE run_id = ? AND stage = ? AND key = ?",
+                (FAILED, error[:1000], time.time(), run_id, stage, key),
+            )
+
+    def start_many(self, run_id: str, stage: str, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.start(run_id, stage, key)
+
+    def finish_many(self, run_id: str, stage: str, results: Dict[str, Any]) -> None:
+        for key, result in results.items():
+            self.finish(run_id, stage, key, result)
+
+    def fail_many(self, run_id: str, stage: str, keys: Iterable[str], error: str) -> None:
+        for key in keys:
+            self.fail(run_id, stage, key, error)
+
+    def counts(self, run_id: str) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, status, COUNT(*) FROM pipeline_tasks WHERE run_id = ? GROUP BY stage, status", (run_id,)
+            ).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for stage, status, count in rows:
+            counts.setdefault(stage, {})[status] = count
+        return counts
+
+    def failures(self, run_id: str, limit: int = 20) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, key, error FROM pipeline_tasks WHERE run_id = ? AND status = ? ORDER BY updated_at LIMIT ?",
+                (run_id, FAILED, limit),
+            ).fetchall()
+        return [{"stage": stage, "key": key, "error": error} for stage, key, error in rows]
+
+
+# A resume to parse: a file path, or a ZIP member from list_pdf_sources
+ResumeSource = Union[str, Source]
+
+
+def resume_sources(paths: List[str], files: ExitStack) -> Dict[str, ResumeSource]:
+    """Expand files, directories (searched recursively for PDFs) and ZIPs into resumes keyed by name.
+
+    ZIPs stay open for their members to be read; ``files`` closes them.
+    """
+    sources: Dict[str, ResumeSource] = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        full = os.path.join(root, name)
+                        sources[full] = full
+        elif path.lower().endswith(".zip"):
+            for source in list_pdf_sources(path, files.enter_context(open(path, "rb"))):
+                sources[source[0]] = source
+        else:
+            sources[path] = path
+    return sources
+
+
+def _load(source: ResumeSource) -> bytes:
+    if not isinstance(source, str):
+        return read_source(source)
+    if os.path.getsize(source) > settings.BULK_MAX_FILE_BYTES:
+        raise ValueError(f"File exceeds {settings.BULK_MAX_FILE_BYTES} bytes")
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _score(jd_text: str, resume_texts: List[str]) -> List[float]:
+    return JobMatcher().similarities(jd_text, resume_texts).tolist()
+
+
+async def score_resumes(jd_text: str, resume_texts: List[str]) -> List[float]:
+    """Score a batch of resumes against the JD in the PDF process pool, next to the parsing."""
+    return await pdf_pool.run(_score, jd_text, resume_texts)
+
+
+class Pipeline:
+    """Runs the recruiting agents as a DAG over bounded async queues.
+
+    The JD is summarized (on the summarization service's thread) while
+    resumes are parsed ``parse_workers`` at a time in the PDF process pool.
+    Parsed resumes are scored against the summary in batches of
+    ``match_batch_size`` in the same pool, so neither stage holds the event
+    loop or the GIL. Scores are streamed into a Shortlister, and the shortlist is
+    booked into interviews. Each queue holds at most ``queue_size`` items, so
+    a slow stage holds back the ones before it instead of buffering.
+
+    Task results go to ``store`` as they finish; ``run`` on an interrupted
+    run id replays finished work and only computes the rest. Stage
+    functions can be swapped out (``summarize``, ``parse``, ``score``), e.g.
+    for tests.
+    """
+
+    def __init__(
+        self,
+        store: TaskStore,
+        db=None,
+        summarize: Optional[Callable] = None,
+        parse: Optional[Callable] = None,
+        score: Optional[Callable[[str, List[str]], Awaitable[List[float]]]] = None,
+        parse_workers: int = settings.PIPELINE_PARSE_CONCURRENCY,
+        match_batch_size: int = settings.PIPELINE_MATCH_BATCH_SIZE,
+        queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+    ):
+        self.store = store
+        self.db = db
+        self.summarize = summarize or summarization_service.summarize
+        self.parse = parse or parse_resume
+        self.score = score or score_resumes
+        self.parse_workers = parse_workers
+        self.match_batch_size = match_batch_size
+        self.queue_size = queue_size
+
+    def create(
+        self,
+        jd_text: str,
+        resumes: List[str],
+        title: Optional[str] = None,
+        job_id: Optional[str] = None,
+        interviewers: Optional[List[str]] = None,
+        min_score: float = 0.1,
+        top_k: int = 10,
+        required_skills: Optional[List[str]] = None,
+        duration_minutes: int = 30,
+        run_id: Optional[str] = None,
+    ) -> str:
+        """Record a new run and return its id; nothing is executed until ``run``."""
+        run_id = run_id or uuid.uuid4().hex
+        # Called before the run starts (and by the CLI outside any event loop), so synchronous
+        self.store.create_run(run_id, {
+            "jd_text": jd_text,
+            "resumes": [os.path.abspath(path) for path in resumes],
+            "title": title,
+            "job_id": job_id,
+            "interviewers": interviewers or [],
+            "min_score": min_score,
+            "top_k": top_k,
+            "required_skills": required_skills or [],
+            "duration_minutes": duration_minutes,
+        })
+        return run_id
+
+    async def _task(self, run_id: str, stage: str, key: str, compute: Callable) -> Any:
+        """Run one task, recording its state; returns None if it failed."""
+        await asyncio.to_thread(self.store.start, run_id, stage, key)
+        try:
+            result = await compute()
+        except Exception as e:
+            logger.warning("Pipeline %s: %s %s failed: %s", run_id, stage, key, e)
+            await asyncio.to_thread(self.store.fail, run_id, stage, key, str(e) or type(e).__name__)
+            return None
+        await asyncio.to_thread(self.store.finish, run_id, stage, key, result)
+        return result
+
+    async def _stage(
+        self,
+        run_id: str,
+        stage: str,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        fn: Callable,
+        done: Dict[str, Any],
+        workers: int = 1,
+        batch_size: int = 1,
+    ) -> None:
+        """Move ``(key, payload)`` items from ``inbox`` through ``fn`` to ``outbox``.
+
+        ``fn`` maps a list of payloads to a list of results; a batch takes
+        whatever is already queued, up to ``batch_size``. Items with a stored
+        result skip ``fn``. Failed items are recorded and dropped.
+        """
+
+        async def worker() -> None:
+            while True:
+                items = [await inbox.get()]
+                while len(items) < batch_size and not inbox.empty():
+                    items.append(inbox.get_nowait())
+                ended = _END in items
+                items = [item for item in items if item is not _END]
+                todo = []
+                for key, payload in items:
+                    if key in done:
+                        await outbox.put((key, done.pop(key)))
+                    else:
+                        todo.append((key, payload))
+                if todo:
+                    keys = [key for key, _ in todo]
+                    await asyncio.to_thread(self.store.start_many, run_id, stage, keys)
+                    try:
+                        results = await fn([payload for _, payload in todo])
+                    except Exception as e:
+                        logger.warning("Pipeline %s: %s batch of %d failed: %s", run_id, stage, len(todo), e)
+                        await asyncio.to_thread(self.store.fail_many, run_id, stage, keys, str(e) or type(e).__name__)
+                    else:
+                        finished = dict(zip(keys, results))
+                        await asyncio.to_thread(self.store.finish_many, run_id, stage, finished)
+                        for item in finished.items():
+                            await outbox.put(item)
+                if ended:
+                    await inbox.put(_END)  # let the sibling workers see it too
+                    return
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await outbox.put(_END)
+
+    async def _parse(self, sources: List[ResumeSource]) -> List[dict]:
+        results = []
+        for source in sources:
+            data = await asyncio.to_thread(_load, source)
+            parsed = await self.parse(data)
+            email = EMAIL_RE.search(parsed["full_text"])
+            results.append({
+                "text": parsed["full_text"],
+                "skills": parsed["extracted_skills"],
+                "email": email.group(0).lower() if email else None,
+            })
+        return results
+
+    async def _shortlist(self, run_id: str, spec: dict) -> dict:
+        """Everything up to the shortlist, streamed: summarize + parse -> match -> shortlister."""
+        match_done = await asyncio.to_thread(self.store.completed, run_id, MATCH)
+        # Parses whose match already finished are never needed again, so aren't loaded
+        parse_done = await asyncio.to_thread(self.store.completed, run_id, PARSE, MATCH)
+        stored_summary = (await asyncio.to_thread(self.store.completed, run_id, SUMMARIZE)).get("jd")
+        summary = None if stored_summary else asyncio.create_task(
+            self._task(run_id, SUMMARIZE, "jd", lambda: self.summarize(spec["jd_text"]))
+        )
+
+        async def match(parsed: List[dict]) -> List[dict]:
+            jd = stored_summary or await summary
+            if jd is None:
+                raise RuntimeError("JD summary failed")
+            scores = await self.score(jd["summary"], [p["text"] for p in parsed])
+            return [
+                {"email": p["email"], "skills": p["skills"], "match_score": round(float(score), 4)}
+                for p, score in zip(parsed, scores)
+            ]
+
+        parse_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        match_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        shortlist_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        files = ExitStack()
+
+        async def feed() -> None:
+            try:
+                for path in spec["resumes"]:
+                    try:
+                        sources = resume_sources([path], files)
+                    except Exception as e:
+                        # A missing or corrupt archive fails as a task of its own, not the run
+                        logger.warning("Pipeline %s: could not read %s: %s", run_id, path, e)
+                        await asyncio.to_thread(self.store.start, run_id, PARSE, path)
+                        await asyncio.to_thread(self.store.fail, run_id, PARSE, path, str(e) or type(e).__name__)
+                        continue
+                    for key, source in sources.items():
+                        if key not in match_done:
+                            await parse_q.put((key, source))
+            finally:
+                # However feeding ended, the parse stage must see the end of its input
+                if not asyncio.current_task().cancelling():
+                    await parse_q.put(_END)
+
+        async def collect() -> None:
+            while (item := await shortlist_q.get()) is not _END:
+                key, matched = item
+                shortlister.offer({"id": key, **matched})
+
+        shortlister = Shortlister(
+            min_score=spec["min_score"],
+            top_k=spec["top_k"],
+            required_skills={None: spec["required_skills"]} if spec["required_skills"] else None,
+        )
+        for key, matched in match_done.items():
+            shortlister.offer({"id": key, **matched})
+
+        stages = [
+            asyncio.create_task(feed()),
+            asyncio.create_task(self._stage(run_id, PARSE, parse_q, match_q, self._parse, parse_done, workers=self.parse_workers)),
+            asyncio.create_task(self._stage(run_id, MATCH, match_q, shortlist_q, match, {}, batch_size=self.match_batch_size)),
+            asyncio.create_task(collect()),
+        ]
+        try:
+            # Waited on together, so a crashed stage fails the run instead of leaving the rest waiting
+            await asyncio.gather(*stages)
+            if summary and await summary is None:
+                raise RuntimeError("JD summary failed")
+        finally:
+            for task in (*stages, summary):
+                if task is not None and not task.done():
+                    task.cancel()
+            files.close()
+
+        shortlisted = shortlister.shortlist().get(None, [])
+        return {"shortlist": shortlisted, "stats": shortlister.stats()}
+
+    async def _schedule(self, run_id: str, spec: dict, shortlisted: List[dict]) -> dict:
+        emails = [candidate["email"] for candidate in shortlisted if candidate.get("email")]
+        # Without a posted job the run itself stands in, so reruns don't double-book
+        job = {"_id": ObjectId(spec["job_id"]) if spec["job_id"] else run_id, "title": spec["title"]}
+        interviews, unplaced = await schedule_interviews(
+            self.db, job, emails, spec["interviewers"], duration_minutes=spec["duration_minutes"]
+        )
+        return {
+            "scheduled": [
+                {key: interview[key] for key in ("candidate_email", "recruiter_email", "start", "end")}
+                for interview in interviews
+            ],
+            "unplaced": unplaced,
+            "no_email": [candidate["id"] for candidate in shortlisted if not candidate.get("email")],
+        }
+
+    async def run(self, run_id: str) -> dict:
+        """Execute (or resume) a run and return its report."""
+        run = await asyncio.to_thread(self.store.get_run, run_id)
+        if run is None:
+            raise KeyError(f"Unknown pipeline run: {run_id}")
+        spec = run["spec"]
+        if run["status"] != DONE:
+            await asyncio.to_thread(self.store.set_run_status, run_id, RUNNING)
+            status = DONE
+            shortlisted = (await asyncio.to_thread(self.store.completed, run_id, SHORTLIST)).get("job")
+            if shortlisted is None:
+                shortlisted = await self._task(run_id, SHORTLIST, "job", lambda: self._shortlist(run_id, spec))
+            if shortlisted is None:
+                status = FAILED
+            elif (spec["interviewers"] and self.db is not None
+                  and "job" not in await asyncio.to_thread(self.store.completed, run_id, SCHEDULE)):
+                if await self._task(run_id, SCHEDULE, "job", lambda: self._schedule(run_id, spec, shortlisted["shortlist"])) is None:
+                    status = FAILED
+            await asyncio.to_thread(self.store.set_run_status, run_id, status)
+        return await asyncio.to_thread(self.report, run_id)
+
+    def report(self, run_id: str) -> dict:
+        """Status, task counts, failures and results of a run (blocking: several SQLite reads)."""
+        run = self.store.get_run(run_id)
+        if run is None:
+            raise KeyError(f"Unknown pipeline run: {run_id}")
+        return {
+            "run_id": run_id,
+            "status": run["status"],
+            "tasks": self.store.counts(run_id),
+            "failures": self.store.failures(run_id),
+            "shortlist": self.store.completed(run_id, SHORTLIST).get("job"),
+            "interviews": self.store.completed(run_id, SCHEDULE).get("job"),
+        }
+
+
+if __name__ == "__main__":
+    # python -m src.services.pipeline run --jd jd.txt resumes/ cvs.zip [--interviewer a@example.com ...]
+    # python -m src.services.pipeline resume RUN_ID   # continue an interrupted run
+    # python -m src.services.pipeline status RUN_ID
+    import argparse
+    from ..database import mongo
+    from .pdf_extraction import pdf_pool
+
+    parser = argparse.ArgumentParser(prog="python -m src.services.pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    start = commands.add_parser("run", help="start a new run")
+    start.add_argument("resumes", nargs="+", help="resume PDFs, directories or ZIPs")
+    start.add_argument("--jd", required=True, help="file with the job description")
+    start.add_argument("--title")
+    start.add_argument("--job-id", help="existing job to book interviews under")
+    start.add_argument("--interviewer", action="append", default=[])
+    start.add_argument("--min-score", type=float, default=0.1)
+    start.add_argument("--top-k", type=int, default=10)
+    start.add_argument("--skill", action="append", default=[], help="required skill")
+    start.add_argument("--run-id")
+    for name in ("resume", "status"):
+        commands.add_parser(name).add_argument("run_id")
+    args = parser.parse_args()
+
+    async def main() -> dict:
+        db = None
+        if args.command != "status":
+            mongo.connect()
+            db = mongo.get_db()
+        pipeline = Pipeline(TaskStore(settings.PIPELINE_DB_PATH), db)
+        try:
+            if args.command == "status":
+                return await asyncio.to_thread(pipeline.report, args.run_id)
+            run_id = args.run_id
+            if args.command == "run":
+                with open(args.jd) as f:
+                    run_id = pipeline.create(
+                        f.read(), args.resumes, title=args.title, job_id=args.job_id,
+                        interviewers=args.interviewer, min_score=args.min_score, top_k=args.top_k,
+                        required_skills=args.skill, run_id=args.run_id,
+                    )
+            return await pipeline.run(run_id)
+        finally:
+            await summarization_service.aclose()
+            pdf_pool.shutdown()
+            if db is not None:
+                mongo.close()
+
+    print(json.dumps(asyncio.run(main()), indent=2, default=str))
@@ -0,0 +1,147 @@
+# services/resume_ingest.py
+import asyncio
+import re
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.result_cache import content_key
+from .candidate_ranking import candidate_rescorer
+from .match_worker import log_changes
+from .pdf_extraction import PdfTimeoutError, parse_resume
+from .retrieval import RESUMES, index_documents
+
+# (display name, zip member or None, open file)
+Source = Tuple[str, object, BinaryIO]
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+
+def contact_email(text: str) -> Optional[str]:
+    """The first email address in a resume: in bulk uploads, the only link to its candidate."""
+    match = _EMAIL_RE.search(text)
+    if not match:
+        return None
+    # Normalized like the EmailStr addresses users register with: only the domain is case-insensitive
+    local, domain = match.group(0).rsplit("@", 1)
+    return f"{local}@{domain.lower()}"
+
+
+def list_pdf_sources(filename: str, fileobj: BinaryIO) -> List[Source]:
+    """Expand an upload into the PDFs it holds: a ZIP yields its .pdf members, anything else itself.
+
+    Only the ZIP central directory is read here; member contents are read one
+    at a time during ingestion.
+    """
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        archive = zipfile.ZipFile(fileobj)
+        return [
+            (f"{filename}/{info.filename}", info, archive)
+            for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(".pdf")
+            and not info.filename.startswith("__MACOSX/")
+        ]
+    fileobj.seek(0)
+    return [(filename, None, fileobj)]
+
+
+def read_source(source: Source) -> bytes:
+    name, member, handle = source
+    size = member.file_size if member is not None else handle.seek(0, 2)
+    if size > settings.BULK_MAX_FILE_BYTES:
+        raise ValueError(f"File exceeds {settings.BULK_MAX_FILE_BYTES} bytes")
+    if member is not None:
+        with handle.open(member) as f:
+            # Cap the read as well: the declared size in a ZIP can lie
+            data = f.read(settings.BULK_MAX_FILE_BYTES + 1)
+        if len(data) > settings.BULK_MAX_FILE_BYTES:
+            raise ValueError(f"File exceeds {settings.BULK_MAX_FILE_BYTES} bytes")
+        return data
+    handle.seek(0)
+    return handle.read()
+
+
+async def _insert(db, docs: List[Dict]) -> int:
+    """Store a batch of parsed resumes and bring search, rankings and matches up to date, as a single upload does."""
+    await db["resumes"].insert_many(docs, ordered=False)
+    await index_documents(db, RESUMES, [doc["_id"] for doc in docs])
+    for email in dict.fromkeys(doc["email"] for doc in docs if "email" in doc):
+        candidate_rescorer.schedule(db, email)
+    await log_changes(db, "resumes", "insert", [(doc["_id"], {"email": doc["email"]}) for doc in docs if "email" in doc])
+    return len(docs)
+
+
+async def ingest_resumes(sources: List[Source], db, concurrency: int = None) -> AsyncIterator[Dict]:
+    """Parse resumes in parallel and store them in batches, yielding one progress event per file.
+
+    At most ``concurrency`` files are held in memory at once. Events are
+    ``{"event": "progress", ...}`` per file followed by one ``{"event": "done", ...}``.
+    """
+    concurrency = concurrency or settings.PDF_MAX_PENDING
+    total = len(sources)
+    slots = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def process(source: Source) -> None:
+        name = source[0]
+        try:
+            data = await asyncio.to_thread(read_source, source)
+            parsed = await parse_resume(data)
+            doc = {
+                "filename": name,
+                "content": parsed["full_text"],
+                "extracted_skills": parsed["extracted_skills"],
+                "skill_categories": parsed["skill_categories"],
+                "education": parsed["education"],
+                "experience": parsed["experience"],
+                "certifications": parsed["certifications"],
+                "content_hash": content_key(data),
+                "uploaded_at": datetime.now(),
+            }
+            email = contact_email(parsed["full_text"])
+            if email:
+                doc["email"] = email
+            await results.put((name, doc, None))
+        except (ValueError, PdfTimeoutError, zipfile.BadZipFile, RuntimeError) as e:
+            await results.put((name, None, str(e)))
+        except Exception as e:
+            await results.put((name, None, f"Error processing resume: {e}"))
+        finally:
+            slots.release()
+
+    async def produce() -> None:
+        for source in sources:
+            await slots.acquire()
+            task = asyncio.create_task(process(source))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    tasks = set()
+    producer = asyncio.create_task(produce())
+    pending: List[Dict] = []
+    inserted = failed = 0
+    try:
+        for processed in range(1, total + 1):
+            name, doc, error = await results.get()
+            if doc is not None:
+                pending.append(doc)
+            else:
+                failed += 1
+            if len(pending) >= settings.BULK_INSERT_BATCH_SIZE:
+                inserted += await _insert(db, pending)
+                pending = []
+            event = {"event": "progress", "file": name, "status": "ok" if error is None else "error",
+                     "processed": processed, "total": total}
+            if error is not None:
+                event["error"] = error
+            yield event
+        if pending:
+            inserted += await _insert(db, pending)
+        yield {"event": "done", "inserted": inserted, "failed": failed, "total": total}
+    finally:
+        # Stop work if the client went away mid-stream
+        producer.cancel()
+        for task in list(tasks):
+            task.cancel()
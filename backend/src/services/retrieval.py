@@ -0,0 +1,258 @@
+# services/retrieval.py
+import asyncio
+import logging
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from ..config import settings
+from ..ml.ann_index import IVFIndex
+from ..ml.embeddings import TextEmbedder
+from ..ml.job_matcher import JobMatcher
+from ..ml.model_registry import (
+    current_artifact_version,
+    new_artifact_version,
+    publish_artifact,
+    registry,
+)
+from ..utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+JOBS = "jobs"
+RESUMES = "resumes"
+
+
+def job_text(job: dict) -> str:
+    skills = job.get("skills_required") or []
+    if isinstance(skills, str):
+        skills = [skills]
+    return " ".join([job.get("title", ""), job.get("description", ""), " ".join(skills)])
+
+
+def resume_text(resume: dict) -> str:
+    return resume.get("content", "")
+
+
+TEXT_FIELDS = {
+    JOBS: (job_text, {"title": 1, "description": 1, "skills_required": 1}),
+    RESUMES: (resume_text, {"content": 1}),
+}
+
+
+class SemanticIndex:
+    """An embedder plus one ANN index per collection, published together as one artifact."""
+
+    def __init__(self, embedder: TextEmbedder, indexes: Dict[str, IVFIndex]):
+        self.embedder = embedder
+        self.indexes = indexes
+        # Searches and updates run on worker threads; the lists they share aren't thread-safe
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, ids: List[str], texts: List[str]) -> None:
+        if ids:
+            vectors = self.embedder.embed(texts)
+            with self._lock:
+                self.indexes[kind].add(ids, vectors)
+
+    def remove(self, kind: str, ids: List[str]) -> None:
+        with self._lock:
+            self.indexes[kind].remove(ids)
+
+    def search(self, kind: str, text: str, k: int, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        query = self.embedder.embed([text])[0]
+        with self._lock:
+            return self.indexes[kind].search(query, k, nprobe)
+
+    def save(self, artifact_dir: str) -> str:
+        """Write the bundle as a new version and publish it; returns the version."""
+        version, version_dir = new_artifact_version(artifact_dir)
+        self.embedder.save(os.path.join(version_dir, "embedder"))
+        with self._lock:
+            for kind, index in self.indexes.items():
+                index.save(os.path.join(version_dir, kind))
+        publish_artifact(artifact_dir, version)
+        return version
+
+    @classmethod
+    def load(cls, artifact_dir: str) -> "SemanticIndex":
+        version = current_artifact_version(artifact_dir)
+        if version is None:
+            raise FileNotFoundError(f"No published semantic index in {artifact_dir}")
+        version_dir = os.path.join(artifact_dir, version)
+        return cls(
+            TextEmbedder.load(os.path.join(version_dir, "embedder")),
+            {kind: IVFIndex.load(os.path.join(version_dir, kind)) for kind in TEXT_FIELDS},
+        )
+
+
+registry.register(
+    "semantic_index",
+    lambda: SemanticIndex.load(settings.ANN_INDEX_DIR),
+    version=lambda: current_artifact_version(settings.ANN_INDEX_DIR),
+)
+
+
+def get_semantic_index() -> SemanticIndex:
+    """The published index, shared by the process; raises FileNotFoundError until one is built.
+
+    The first call loads it from disk, so call it off the event loop.
+    """
+    return registry.get("semantic_index")
+
+
+async def _load_texts(db, kind: str, ids: List[str]) -> Dict[str, str]:
+    to_text, projection = TEXT_FIELDS[kind]
+    object_ids = []
+    for item_id in ids:
+        try:
+            object_ids.append(ObjectId(item_id))
+        except InvalidId:
+            continue
+    docs = await db[kind].find({"_id": {"$in": object_ids}}, projection).to_list(length=None)
+    return {str(doc["_id"]): to_text(doc) for doc in docs}
+
+
+def rerank(query: str, candidates: List[Tuple[str, str]], top_k: int) -> List[Tuple[str, float]]:
+    """Exact TF-IDF cosine re-scoring of (id, text) candidates with JobMatcher.
+
+    Cosine similarity is symmetric, so the same call ranks resumes for a job
+    (job text as the query) as it does jobs for a resume.
+    """
+    if not candidates:
+        return []
+    matches = JobMatcher().match(query, [text for _, text in candidates], top_k=top_k)
+    return [(candidates[i][0], float(score)) for i, score in matches]
+
+
+async def top_k(db, kind: str, query: str, k: int = 10, exact: bool = True) -> List[Tuple[str, float]]:
+    """Retrieve the ``k`` documents of ``kind`` closest to ``query``.
+
+    The ANN index proposes ``k * ANN_RERANK_FACTOR`` candidates; with ``exact``
+    they are re-scored with JobMatcher and the best ``k`` returned, otherwise
+    (or when no TF-IDF model is available) the ANN scores are returned as they are. Ids deleted from MongoDB since
+    they were indexed are dropped.
+    """
+    index = await asyncio.to_thread(get_semantic_index)
+    fetch = k * settings.ANN_RERANK_FACTOR if exact else k
+    hits = await asyncio.to_thread(timed("semantic_search", index.search), kind, query, fetch)
+    texts = await _load_texts(db, kind, [item_id for item_id, _ in hits])
+    if not exact:
+        return [(item_id, score) for item_id, score in hits if item_id in texts]
+    candidates = [(item_id, texts[item_id]) for item_id, _ in hits if item_id in texts]
+    try:
+        return await asyncio.to_thread(timed("rerank", rerank), query, candidates, k)
+    except FileNotFoundError as e:
+        # No TF-IDF model published: the approximate scores are still a ranking
+        logger.warning("Exact re-ranking unavailable, returning ANN scores: %s", e)
+        return [(item_id, score) for item_id, score in hits if item_id in texts][:k]
+
+
+async def top_k_jobs(db, resume: str, k: int = 10, exact: bool = True) -> List[Tuple[str, float]]:
+    return await top_k(db, JOBS, resume, k, exact)
+
+
+async def top_k_resumes(db, job: str, k: int = 10, exact: bool = True) -> List[Tuple[str, float]]:
+    return await top_k(db, RESUMES, job, k, exact)
+
+
+async def index_document(db, kind: str, item_id) -> None:
+    """Embed one new or updated document into the live index of this process.
+
+    Does nothing until an index has been built. Other worker processes see the
+    document after the next ``sync``/``build`` is published.
+    """
+    await index_documents(db, kind, [item_id])
+
+
+async def index_documents(db, kind: str, item_ids: List) -> None:
+    """:func:`index_document` for a batch, read and embedded together."""
+    try:
+        index = await asyncio.to_thread(get_semantic_index)
+    except FileNotFoundError:
+        return
+    texts = await _load_texts(db, kind, [str(item_id) for item_id in item_ids])
+    if texts:
+        await asyncio.to_thread(index.add, kind, list(texts), list(texts.values()))
+
+
+def unindex_document(kind: str, item_id) -> None:
+    try:
+        get_semantic_index().remove(kind, [str(item_id)])
+    except FileNotFoundError:
+        pass
+
+
+async def _read_collection(db, kind: str, exclude=None, batch_size: int = 1000) -> Tuple[List[str], List[str]]:
+    to_text, projection = TEXT_FIELDS[kind]
+    ids, texts = [], []
+    async for doc in db[kind].find({}, projection).batch_size(batch_size):
+        item_id = str(doc["_id"])
+        text = to_text(doc)
+        if text.strip() and (exclude is None or item_id not in exclude):
+            ids.append(item_id)
+            texts.append(text)
+    return ids, texts
+
+
+async def build(db, artifact_dir: Optional[str] = None) -> Dict[str, int]:
+    """Fit the embedder and ANN indexes on every job and resume, then publish them."""
+    artifact_dir = artifact_dir or settings.ANN_INDEX_DIR
+    corpus = {kind: await _read_collection(db, kind) for kind in TEXT_FIELDS}
+    all_texts = [text for _, texts in corpus.values() for text in texts]
+    if not all_texts:
+        raise ValueError("No jobs or resumes to index")
+
+    def fit() -> SemanticIndex:
+        embedder = TextEmbedder.fit(all_texts, dim=settings.ANN_DIM)
+        indexes = {}
+        for kind, (ids, texts) in corpus.items():
+            vectors = embedder.embed(texts) if texts else embedder.embed([""])
+            nlist = min(settings.ANN_NLIST, max(1, int(math.sqrt(len(ids)))))
+            indexes[kind] = IVFIndex.train(vectors, nlist=nlist, nprobe=settings.ANN_NPROBE)
+            if ids:
+                indexes[kind].add(ids, vectors)
+        return SemanticIndex(embedder, indexes)
+
+    index = await asyncio.to_thread(fit)
+    await asyncio.to_thread(index.save, artifact_dir)
+    return {kind: len(ids) for kind, (ids, _) in corpus.items()}
+
+
+async def sync(db, artifact_dir: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+    """Bring the published index up to date with MongoDB without refitting.
+
+    Documents missing from the index are embedded and inserted, ids no longer
+    in MongoDB are deleted, and the result is published as a new version.
+    Returns ``{kind: (added, removed)}``.
+    """
+    artifact_dir = artifact_dir or settings.ANN_INDEX_DIR
+    index = await asyncio.to_thread(SemanticIndex.load, artifact_dir)
+    changes = {}
+    for kind in TEXT_FIELDS:
+        ann = index.indexes[kind]
+        live = {str(doc["_id"]) async for doc in db[kind].find({}, {"_id": 1})}
+        stale = [item_id for item_id in ann if item_id not in live]
+        ids, texts = await _read_collection(db, kind, exclude=ann)
+        index.remove(kind, stale)
+        await asyncio.to_thread(index.add, kind, ids, texts)
+        changes[kind] = (len(ids), len(stale))
+    await asyncio.to_thread(index.save, artifact_dir)
+    return changes
+
+
+if __name__ == "__main__":
+    # python -m src.services.retrieval build   # refit on all jobs and resumes
+    # python -m src.services.retrieval sync    # incremental inserts/deletes only
+    import sys
+    from ..database import mongo
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "sync"
+    if command not in ("build", "sync"):
+        sys.exit("usage: python -m src.services.retrieval [build|sync]")
+    mongo.connect()
+    print(asyncio.run((build if command == "build" else sync)(mongo.get_db())))
@@ -1,5 +1,116 @@
 # services/shortlisting.py
-from typing import List, Dict
+import heapq
+import itertools
+from collections import Counter
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional
 
-def shortlist_candidates(candidates: List[Dict], min_score: float = 0.8) -> List[Dict]:
-    return [c for c in candidates if c.get("match_score", 0) >= min_score]
+from .skill_index import normalize_skills
+
+# Rejection reason codes
+BELOW_THRESHOLD = "below_threshold"   # match_score < min_score
+MISSING_SKILLS = "missing_skills"     # lacks more required skills than allowed
+OUTRANKED = "outranked"               # qualified, but the job's quota went to higher scores
+
+# At most this many missing skills are named in a rejection
+MAX_LISTED_SKILLS = 5
+
+
+class Shortlister:
+    """Streaming shortlister: keeps the best ``quota`` qualified candidates per job.
+
+    Candidates are dicts with a ``match_score`` and optionally ``job_id`` and
+    ``skills``. Each job holds a min-heap of at most its quota, so memory is
+    bounded by the quotas however many candidates are offered. Every
+    candidate that doesn't make the shortlist yields one compact rejection
+    record, either when it is offered or when a better one displaces it.
+    """
+
+    def __init__(
+        self,
+        min_score: float = 0.8,
+        top_k: int = 10,
+        quotas: Optional[Dict] = None,
+        required_skills: Optional[Dict] = None,
+        max_missing: int = 0,
+    ):
+        self.min_score = min_score
+        self.top_k = top_k
+        self.quotas = quotas or {}
+        self.required_skills = {job_id: set(normalize_skills(skills)) for job_id, skills in (required_skills or {}).items()}
+        self.max_missing = max_missing
+        self.rejections = Counter()
+        self.offered = 0
+        self._heaps: Dict = {}
+        self._seq = itertools.count()
+
+    @staticmethod
+    def _rejection(candidate: dict, reasons: List[str], missing: Iterable[str] = ()) -> dict:
+        rejection = {"id": candidate.get("id", candidate.get("email")), "job_id": candidate.get("job_id"), "reasons": reasons}
+        missing = sorted(missing)
+        if missing:
+            rejection["missing"] = missing[:MAX_LISTED_SKILLS]
+        return rejection
+
+    def offer(self, candidate: dict) -> Optional[dict]:
+        """Consider one candidate; returns the rejection it caused, if any."""
+        self.offered += 1
+        job_id = candidate.get("job_id")
+        score = candidate.get("match_score", 0)
+
+        reasons = []
+        if score < self.min_score:
+            reasons.append(BELOW_THRESHOLD)
+        missing = self.required_skills.get(job_id, set()) - set(normalize_skills(candidate.get("skills")))
+        if len(missing) > self.max_missing:
+            reasons.append(MISSING_SKILLS)
+        if reasons:
+            self.rejections.update(reasons)
+            return self._rejection(candidate, reasons, missing)
+
+        quota = self.quotas.get(job_id, self.top_k)
+        if quota <= 0:
+            self.rejections[OUTRANKED] += 1
+            return self._rejection(candidate, [OUTRANKED])
+        heap = self._heaps.setdefault(job_id, [])
+        # On equal scores the earlier candidate ranks higher (a later seq sorts lower)
+        entry = (score, -next(self._seq), candidate)
+        if len(heap) < quota:
+            heapq.heappush(heap, entry)
+            return None
+        if entry[:2] <= heap[0][:2]:
+            self.rejections[OUTRANKED] += 1
+            return self._rejection(candidate, [OUTRANKED])
+        displaced = heapq.heapreplace(heap, entry)[2]
+        self.rejections[OUTRANKED] += 1
+        return self._rejection(displaced, [OUTRANKED])
+
+    def shortlist(self) -> Dict:
+        """The current shortlist per job, best first."""
+        return {
+            job_id: [candidate for _, _, candidate in sorted(heap, reverse=True)]
+            for job_id, heap in self._heaps.items()
+        }
+
+    def stats(self) -> dict:
+        shortlisted = sum(len(heap) for heap in self._heaps.values())
+        return {"offered": self.offered, "shortlisted": shortlisted, "rejections": dict(self.rejections)}
+
+
+async def shortlist_stream(candidates: AsyncIterable[dict], shortlister: Shortlister) -> AsyncIterator[dict]:
+    """Feed an async stream of scored candidates through ``shortlister``, yielding rejections as they happen.
+
+    Once the stream is exhausted, ``shortlister.shortlist()`` holds the result.
+    """
+    async for candidate in candidates:
+        rejection = shortlister.offer(candidate)
+        if rejection is not None:
+            yield rejection
+
+
+def shortlist_candidates(candidates: List[Dict], min_score: float = 0.8, top_k: Optional[int] = None) -> List[Dict]:
+    """Shortlist an in-memory list, best first (``top_k`` per job; None keeps every qualifier)."""
+    shortlister = Shortlister(min_score=min_score, top_k=len(candidates) if top_k is None else top_k)
+    for candidate in candidates:
+        shortlister.offer(candidate)
+    shortlisted = [candidate for job in shortlister.shortlist().values() for candidate in job]
+    return sorted(shortlisted, key=lambda candidate: candidate.get("match_score", 0), reverse=True)
@@ -0,0 +1,143 @@
+# services/skill_index.py
+import base64
+import binascii
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple, Union
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+# Posting lists live in their own collection: one small document per
+# (normalized skill, job) pair, so writes and reads stay O(1) per posting
+# however many jobs share a skill. Served by the (skill, job_id) index.
+SKILL_INDEX_COLLECTION = "job_skill_index"
+
+
+def normalize_skills(skills: Union[str, Iterable[str], None]) -> List[str]:
+    """Lowercase, strip and de-duplicate skills (accepts a list or a comma separated string)."""
+    if not skills:
+        return []
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    keys = (skill.strip().lower() for skill in skills if isinstance(skill, str))
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def skill_list(skills: Union[str, List[str], None]) -> List[str]:
+    """A job's ``skills_required`` as posted, splitting legacy comma separated strings (case is kept)."""
+    if isinstance(skills, str):
+        return [skill.strip() for skill in skills.split(",") if skill.strip()]
+    return skills or []
+
+
+def encode_cursor(overlap: int, job_id: ObjectId) -> str:
+    raw = f"{overlap}:{job_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        overlap, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        return int(overlap), job_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def _posting(skill: str, job_id: ObjectId, indexed_at: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"skill": skill, "job_id": job_id}, {"$set": {"indexed_at": indexed_at}}, upsert=True
+    )
+
+
+async def index_job(db, job_id: ObjectId, skills) -> None:
+    """Add a job to the posting list of each of its skills."""
+    now = datetime.now()
+    ops = [_posting(skill, job_id, now) for skill in normalize_skills(skills)]
+    if ops:
+        await db[SKILL_INDEX_COLLECTION].bulk_write(ops, ordered=False)
+
+
+async def unindex_job(db, job_id: ObjectId, skills) -> None:
+    """Remove a job from the posting lists of the given skills."""
+    keys = normalize_skills(skills)
+    if keys:
+        await db[SKILL_INDEX_COLLECTION].delete_many({"skill": {"$in": keys}, "job_id": job_id})
+
+
+async def rebuild_skill_index(db, batch_size: int = 1000) -> int:
+    """Rebuild every posting list from the jobs collection; returns the number of jobs indexed.
+
+    Only needed to backfill jobs posted before the index existed (or written
+    in the old one-document-per-skill layout); ``post_job`` keeps it current
+    afterwards. Postings are upserted in place and stale ones deleted at the
+    end, so matching keeps working while it runs.
+    """
+    collection = db[SKILL_INDEX_COLLECTION]
+    started = datetime.now()
+    indexed = 0
+    ops = []
+    cursor = db["jobs"].find({}, {"skills_required": 1}).batch_size(batch_size)
+    async for job in cursor:
+        ops += [_posting(skill, job["_id"], started) for skill in normalize_skills(job.get("skills_required"))]
+        indexed += 1
+        if len(ops) >= batch_size:
+            await collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+    # Postings written by index_job meanwhile are newer than ``started`` and stay
+    await collection.delete_many({"$or": [{"indexed_at": {"$lt": started}}, {"skill": {"$exists": False}}]})
+    return indexed
+
+
+async def match_job_ids(
+    db,
+    skills,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[ObjectId, int]], Optional[str]]:
+    """Rank jobs by how many of ``skills`` they require.
+
+    Only the postings for the candidate's own skills are read, so the cost
+    depends on those lists rather than on the size of the jobs collection.
+    The overlap is counted and ranked by the database; only one page of ids
+    comes back. Results are ordered by overlap (desc) then job id, and
+    ``cursor`` resumes after the last job of the previous page.
+
+    :return: ([(job_id, overlap), ...], next_cursor)
+    """
+    keys = normalize_skills(skills)
+    if not keys:
+        return [], None
+
+    pipeline = [
+        {"$match": {"skill": {"$in": keys}}},
+        {"$group": {"_id": "$job_id", "overlap": {"$sum": 1}}},
+    ]
+    if cursor is not None:
+        after_overlap, after_id = decode_cursor(cursor)
+        try:
+            after_id = ObjectId(after_id)
+        except InvalidId:
+            raise ValueError("Invalid cursor")
+        pipeline.append({"$match": {"$or": [
+            {"overlap": {"$lt": after_overlap}},
+            {"overlap": after_overlap, "_id": {"$gt": after_id}},
+        ]}})
+    pipeline += [{"$sort": {"overlap": -1, "_id": 1}}, {"$limit": limit + 1}]
+
+    page = await db[SKILL_INDEX_COLLECTION].aggregate(pipeline, allowDiskUse=True).to_list(length=limit + 1)
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]["overlap"], page[-1]["_id"])
+    return [(entry["_id"], entry["overlap"]) for entry in page], next_cursor
+
+
+if __name__ == "__main__":
+    import asyncio
+    from ..database import mongo
+
+    mongo.connect()
+    print(f"Indexed {asyncio.run(rebuild_skill_index(mongo.get_db()))} jobs")
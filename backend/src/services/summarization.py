@@ -0,0 +1,154 @@
+# services/summarization.py
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..ml.jd_summarizer import summarize_jds
+from ..utils.metrics import timed
+from ..utils.result_cache import ResultCache, content_key
+from .content_cache import summary_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SummarizationService:
+    """Async front end for JD summarization that batches concurrent requests.
+
+    Callers are queued; a single background task drains the queue into
+    micro-batches of at most ``max_batch_size`` texts, waiting no longer than
+    ``max_wait_ms`` for a batch to fill, and runs each batch on a dedicated
+    thread so generation never blocks the event loop. While one batch is
+    generating the next one fills up, so throughput grows with load.
+
+    With a ``cache``, JDs summarized before are answered without queueing
+    and identical JDs submitted concurrently share a single generation.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 25,
+        max_queue: int = 256,
+        batch_fn=summarize_jds,
+        cache: Optional[ResultCache] = None,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._batch_fn = batch_fn
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cache = cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or self._worker.done():
+            # A worker that died leaves its queue behind: keep it, so requests
+            # already waiting in it are served by the new worker
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._executor = self._executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+            self._worker = asyncio.create_task(self._run())
+
+    async def summarize(self, jd_text: str) -> Dict:
+        """Summarize one JD; waits (backpressure) if the queue is full."""
+        key = content_key(jd_text)
+        if self._cache is not None:
+            cached = await self._cache.aget(key)
+            if cached is not None:
+                return cached
+        future = self._inflight.get(key)
+        if future is None:
+            self._ensure_started()
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            try:
+                await self._queue.put((jd_text, future))
+            except BaseException:
+                future.cancel()
+                raise
+        # Shield so one caller giving up doesn't cancel the summary for the others
+        return await asyncio.shield(future)
+
+    async def _next_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Skip requests withdrawn before they were batched
+        return [(text, future) for text, future in batch if not future.done()]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, timed("jd_summarize_batch", self._batch_fn), [text for text, _ in batch]
+                )
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Summarization service stopped"))
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (text, future), result in zip(batch, results):
+                    # Cached before it resolves, so a request for the same JD arriving now finds it
+                    if self._cache is not None:
+                        try:
+                            await self._cache.aset(content_key(text), result)
+                        except Exception as e:  # a summary that isn't cached is still a summary
+                            logger.warning("Could not cache summary: %s", e)
+                    if not future.done():
+                        future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Stop the batching task and fail any requests still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Summarization service stopped"))
+            self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+summarization_service = SummarizationService(
+    max_batch_size=settings.SUMMARY_MAX_BATCH_SIZE,
+    max_wait_ms=settings.SUMMARY_MAX_WAIT_MS,
+    max_queue=settings.SUMMARY_MAX_QUEUE,
+    cache=summary_cache,
+)
@@ -1,9 +1,11 @@
-import openai
+from ..services.llm_gateway import llm_gateway
 
-def generate_questions(job_role: str):
+
+async def generate_questions(job_role: str) -> str:
     prompt = f"Generate 5 interview questions for a {job_role} position."
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}]
+    # Deterministic prompt: generated once per role, then served from the result cache
+    return await llm_gateway.complete(
+        [{"role": "user", "content": prompt}],
+        temperature=0,
+        cache=True,
     )
-    return response['choices'][0]['message']['content']
@@ -1,31 +1,75 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt, JWTError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from ..config import settings
+from .ttl_cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-def create_access_token(data: dict):
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+# Verified claims keyed by the SHA-256 of the token, so a token is decoded
+# and its signature checked once rather than on every request. Entries never
+# outlive the token's own expiry.
+_claims_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
+
+def _create_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    expire = datetime.utcnow() + expires_delta
+    to_encode.update({"exp": expire, "type": token_type})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def verify_token(token: str, credentials_exception):
-    try:
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    return _create_token(data, ACCESS_TOKEN, expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    return _create_token(data, REFRESH_TOKEN, expires_delta or timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES))
+
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN) -> dict:
+    """Verify a token and return its claims as ``{"sub", "email", "role", "exp"}``.
+
+    Raises JWTError if the token is invalid, expired or of another type.
+    """
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    cached = _claims_cache.get(digest)
+    if cached is None:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        return payload
+        if payload.get("sub") is None:
+            raise JWTError("Token has no subject")
+        # jose only validates exp when present; a token that never expires isn't one we issued
+        if not isinstance(payload.get("exp"), (int, float)):
+            raise JWTError("Token has no expiry")
+        cached = (payload.get("type", ACCESS_TOKEN), {
+            "sub": payload["sub"],
+            "email": payload["sub"],
+            "role": payload.get("role"),
+            "exp": payload["exp"],
+        })
+        ttl = min(settings.TOKEN_CACHE_TTL_SECONDS, payload["exp"] - time.time())
+        if ttl > 0:
+            _claims_cache.set(digest, cached, ttl=ttl)
+    cached_type, claims = cached
+    if cached_type != token_type:
+        raise JWTError("Wrong token type")
+    return dict(claims)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    """Auth dependency for protected routes; FastAPI resolves it once per request."""
+    try:
+        return decode_token(token)
     except JWTError:
-        raise credentials_exception
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    return verify_token(token, credentials_exception)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,199 @@
+import asyncio
+import functools
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+
+from .profiler import SlowRequestProfiler
+
+# Latency buckets from 5 ms to 30 s: API calls, DB commands and model calls share them
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being served")
+HTTP_REQUEST_DB_COMMANDS = Histogram(
+    "http_request_db_commands", "MongoDB commands issued per request",
+    ["route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Total MongoDB command time per request",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+DB_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trips, as reported by the driver",
+    ["command"], buckets=LATENCY_BUCKETS,
+)
+DB_COMMAND_FAILURES = Counter("mongodb_command_failures_total", "MongoDB commands that failed", ["command"])
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+EXECUTOR_QUEUE_DEPTH = Gauge("executor_queue_depth", "Calls waiting for a worker", ["executor"])
+ML_INFERENCE_SECONDS = Histogram(
+    "ml_inference_seconds", "Model and parsing calls, timed in the worker that runs them",
+    ["operation"], buckets=LATENCY_BUCKETS,
+)
+
+
+class _RequestDb:
+    __slots__ = ("commands", "seconds")
+
+    def __init__(self):
+        self.commands = 0
+        self.seconds = 0.0
+
+
+# The request a DB command belongs to. Motor copies the context into the
+# executor thread that runs the command, so the listener below sees it.
+_request_db: ContextVar[Optional[_RequestDb]] = ContextVar("request_db", default=None)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the DB metrics; pass it in the client's ``event_listeners``."""
+
+    def started(self, event) -> None:
+        pass
+
+    def _record(self, event) -> None:
+        seconds = event.duration_micros / 1e6
+        DB_COMMAND_SECONDS.labels(event.command_name).observe(seconds)
+        request = _request_db.get()
+        if request is not None:
+            request.commands += 1
+            request.seconds += seconds
+
+    def succeeded(self, event) -> None:
+        self._record(event)
+
+    def failed(self, event) -> None:
+        self._record(event)
+        DB_COMMAND_FAILURES.labels(event.command_name).inc()
+
+
+command_metrics = CommandMetrics()
+
+
+def timed(operation: str, fn: Callable) -> Callable:
+    """``fn`` wrapped to record each call under ``operation`` in ml_inference_seconds.
+
+    Wrap the function handed to a thread pool, so the time is the call's own
+    rather than time spent waiting for a worker.
+    """
+    histogram = ML_INFERENCE_SECONDS.labels(operation)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def track_queue(executor: str, depth: Callable[[], int]) -> None:
+    """Report ``depth()`` as the executor's queue depth whenever metrics are scraped."""
+    EXECUTOR_QUEUE_DEPTH.labels(executor).set_function(depth)
+
+
+def track_default_executor() -> None:
+    """Track the running loop's default executor, which serves asyncio.to_thread (model calls, file reads)."""
+    loop = asyncio.get_running_loop()
+
+    def depth() -> int:
+        # The executor is created on first use; neither it nor its queue is public API
+        queue = getattr(getattr(loop, "_default_executor", None), "_work_queue", None)
+        return queue.qsize() if queue is not None else 0
+
+    track_queue("default", depth)
+
+
+class LoopLagMonitor:
+    """Sleeps ``interval`` seconds at a time and records how much later than that it woke up.
+
+    Lag means something blocked the event loop (CPU work or blocking I/O in
+    a coroutine) and every request in the process waited that long.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(max(time.perf_counter() - start - self.interval, 0))
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _route(scope) -> str:
+    # FastAPI leaves the matched route in the scope; its path template keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and DB usage of every HTTP request by route.
+
+    With a ``profiler``, requests slower than its threshold also get their
+    sampled stacks written out.
+    """
+
+    def __init__(self, app, profiler: Optional[SlowRequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db = _RequestDb()
+        token = _request_db.set(db)
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        profile = self.profiler.begin() if self.profiler else None
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = _route(scope)
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _request_db.reset(token)
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(elapsed)
+            HTTP_REQUEST_DB_COMMANDS.labels(route).observe(db.commands)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(db.seconds)
+            if profile is not None:
+                await self.profiler.end(profile, f"{scope['method']} {route}", elapsed)
+
+
+def render() -> tuple:
+    """(body, content type) of the Prometheus text exposition of every metric."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from ..config import settings
+from .ttl_cache import TTLCache
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full; callers should answer 503 and let the client retry."""
+
+
+class PasswordHasher:
+    """bcrypt hashing on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so the pool hashes in parallel while the event
+    loop keeps serving other requests. Once ``max_queue`` calls are waiting
+    for a worker, new ones are rejected with HasherBusyError instead of
+    growing the backlog.
+
+    Every hash is pinned to ``rounds``: hashes made with another cost are
+    reported by verify_and_update (passlib's needs_update), so callers can
+    store the rehashed value. Successful verifications are remembered for
+    ``cache_ttl`` seconds, keyed by an HMAC of the password and stored hash,
+    so login retry storms don't pay for bcrypt again.
+    """
+
+    def __init__(
+        self,
+        rounds: int = 12,
+        max_workers: int = 4,
+        max_queue: int = 64,
+        cache_size: int = 10_000,
+        cache_ttl: float = 60,
+        secret: str = "",
+    ):
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._verified = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._secret = secret.encode()
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker."""
+        return max(self._pending - self.max_workers, 0)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+            "verified_cache": self._verified.stats(),
+        }
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HasherBusyError("Password hashing queue is full")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    def _cache_key(self, password: str, hashed: str) -> str:
+        return hmac.new(self._secret, f"{hashed}\0{password}".encode(), hashlib.sha256).hexdigest()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check a password; returns (valid, new_hash) where new_hash is set if the stored hash should be replaced."""
+        key = self._cache_key(password, hashed)
+        if self._verified.get(key):
+            return True, None
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed)
+        if valid and new_hash is None:
+            self._verified.set(key, True)
+        return valid, new_hash
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    cache_size=settings.CREDENTIAL_CACHE_SIZE,
+    cache_ttl=settings.CREDENTIAL_CACHE_TTL_SECONDS,
+    secret=settings.SECRET_KEY,
+)
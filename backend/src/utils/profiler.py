@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames of a thread that is only waiting: an idle event loop or pool worker
+_IDLE = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class SlowRequestProfiler:
+    """Opt-in sampling profiler that writes flamegraph stacks for slow requests.
+
+    While any request is in flight, a background thread samples the stack of
+    every busy thread every ``interval_ms`` into a ring buffer: event loop and
+    executor threads alike, skipping threads that are waiting for work. When
+    a request took at least ``threshold_ms``, the samples taken during it are
+    written to ``out_dir`` in folded format (``thread;outer;...;inner count``
+    per line), which flamegraph.pl, speedscope and inferno read directly.
+
+    Requests share the event loop, so a dump also holds whatever concurrent
+    requests were doing; the heaviest stacks are usually the culprit.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float = 5, out_dir: str = "profiles", window_seconds: float = 60):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.out_dir = out_dir
+        self._samples: Deque[Tuple[float, str]] = deque(maxlen=max(1, int(window_seconds / self.interval)))
+        self._active = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            os.makedirs(self.out_dir, exist_ok=True)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = f"{name} ({os.path.basename(code.co_filename)})".replace(";", ":")
+        return label
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if not self._active:
+                continue
+            now = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples.append((now, ";".join(reversed(stack))))
+
+    def begin(self) -> float:
+        self._active += 1
+        return time.perf_counter()
+
+    async def end(self, started: float, request: str, elapsed: float) -> None:
+        self._active -= 1
+        if elapsed < self.threshold:
+            return
+        ended = started + elapsed
+        stacks = Counter(stack for at, stack in list(self._samples) if started <= at <= ended)
+        if not stacks:
+            return
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{re.sub(r'[^A-Za-z0-9]+', '_', request).strip('_')}-{elapsed * 1000:.0f}ms.folded"
+        path = os.path.join(self.out_dir, name)
+        try:
+            await asyncio.to_thread(_write_folded, path, stacks)
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", path, e)
+            return
+        logger.info("%s took %.0f ms; stacks written to %s", request, elapsed * 1000, path)
+
+
+def _write_folded(path: str, stacks: Counter) -> None:
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from .ttl_cache import TTLCache
+
+_MISSING = object()
+
+
+def content_key(content: Union[bytes, str]) -> str:
+    """SHA-256 digest of the content; identical inputs share a cache entry."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class SQLiteStore:
+    """Persistent cache tier shared by every ResultCache pointing at the same file.
+
+    The database is opened on first use (or by ``open``), not on construction,
+    so importing the module that creates a store touches no files. Every call
+    is blocking SQLite I/O: from async code, go through ResultCache's
+    ``aget``/``aset``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        with self._lock:
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (namespace, accessed_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, namespace: str, key: str, ttl: float) -> Any:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM result_cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            if row[1] + ttl <= now:
+                conn.execute("DELETE FROM result_cache WHERE namespace = ? AND key = ?", (namespace, key))
+                return _MISSING
+            conn.execute(
+                "UPDATE result_cache SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO result_cache (namespace, key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now, now),
+            )
+
+    def prune(self, namespace: str, ttl: float, max_rows: int) -> int:
+        """Drop expired rows, then the least recently used ones beyond ``max_rows``."""
+        with self._lock:
+            conn = self._connect()
+            expired = conn.execute(
+                "DELETE FROM result_cache WHERE namespace = ? AND created_at <= ?", (namespace, time.time() - ttl)
+            ).rowcount
+            overflow = conn.execute(
+                "DELETE FROM result_cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM result_cache WHERE namespace = ?"
+                " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (namespace, namespace, max_rows),
+            ).rowcount
+        return expired + overflow
+
+
+class ResultCache:
+    """Two-tier cache for expensive, deterministic results keyed by content hash.
+
+    Lookups hit an in-process LRU first, then the shared SQLite tier (which
+    survives restarts and is visible to every worker). Values must be JSON
+    serializable. Coroutines use ``aget``/``aset``, which serve memory hits
+    inline and run the SQLite tier on a worker thread. ``namespace`` should include the producer and its version so
+    results from a different model or extractor are never mixed.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(
+        self,
+        namespace: str,
+        store: Optional[SQLiteStore] = None,
+        memory_size: int = 256,
+        ttl: float = 7 * 24 * 3600,
+        max_rows: int = 100_000,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.memory = TTLCache(maxsize=memory_size, ttl=ttl)
+        self.store = store
+        self.disk_hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.store is not None:
+            value = self.store.get(self.namespace, key, self.ttl)
+            if value is not _MISSING:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        self.misses += 1
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.store is not None:
+            self.store.set(self.namespace, key, value)
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self.store.prune(self.namespace, self.ttl, self.max_rows)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.store is None:
+            self.misses += 1
+            return default
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key: str, value: Any) -> None:
+        if self.store is None:
+            self.memory.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def get_or_compute(self, content: Union[bytes, str], compute: Callable[[], Any]) -> Any:
+        key = content_key(content)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_size": len(self.memory),
+        }
@@ -0,0 +1,38 @@
+import os
+import pickle
+import tempfile
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# The committed model.pkl is the training script, so fit a small vectorizer
+# and point the model registry at it before any app module is imported.
+_model_dir = tempfile.mkdtemp(prefix="recruitment-tests-")
+_model_path = os.path.join(_model_dir, "tfidf.pkl")
+with open(_model_path, "wb") as f:
+    pickle.dump(TfidfVectorizer().fit([
+        "python fastapi mongodb backend engineer",
+        "react typescript frontend developer",
+        "data scientist python pandas machine learning",
+        "devops kubernetes docker aws",
+    ]), f)
+os.environ.setdefault("TFIDF_PICKLE_PATH", _model_path)
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(_model_dir, "result_cache.sqlite"))
+os.environ.setdefault("CHAT_MEMORY_DB_PATH", os.path.join(_model_dir, "chat_memory.sqlite"))
+
+import pytest  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from src.database import mongo  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    mongo.close()
+    mongo.connect(AsyncMongoMockClient())
+    yield mongo.get_db()
+    mongo.close()
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.ml.ann_index import IVFIndex
+
+
+def test_id_repeated_in_a_batch_is_indexed_once_with_its_last_vector():
+    index = IVFIndex(np.eye(2, dtype=np.float32), nprobe=2)
+    index.add(["a", "b", "a"], np.array([[1, 0], [0, 1], [0.6, 0.8]], dtype=np.float32))
+
+    hits = index.search(np.array([[0.6, 0.8]], dtype=np.float32), k=5)
+    assert sorted(item_id for item_id, _ in hits) == ["a", "b"]
+    assert dict(hits)["a"] > 0.99
+
+
+def test_re_adding_an_id_replaces_it():
+    index = IVFIndex(np.eye(2, dtype=np.float32), nprobe=2)
+    index.add(["a"], np.array([[1, 0]], dtype=np.float32))
+    index.add(["a"], np.array([[0, 1]], dtype=np.float32))
+    assert index.search(np.array([[0, 1]], dtype=np.float32), k=5) == [("a", 1.0)]
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src import main
+from src.services import candidate_ranking
+from src.services.candidate_ranking import CandidateRescorer
+from src.utils.jwt_handler import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_changes_during_a_rescore_coalesce_into_one_more_run(monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    runs = []
+
+    async def rescore_candidate(db, email):
+        runs.append(email)
+        started.set()
+        await release.wait()
+
+    monkeypatch.setattr(candidate_ranking, "rescore_candidate", rescore_candidate)
+    rescorer = CandidateRescorer(concurrency=1)
+    rescorer.schedule(None, "a@x.com")
+    await started.wait()
+    for _ in range(3):
+        rescorer.schedule(None, "a@x.com")
+    release.set()
+    await rescorer.drain()
+    assert runs == ["a@x.com", "a@x.com"]
+    assert rescorer.pending == 0
+
+
+async def test_failed_rescore_is_logged_not_raised(monkeypatch):
+    async def rescore_candidate(db, email):
+        raise FileNotFoundError("no model")
+
+    monkeypatch.setattr(candidate_ranking, "rescore_candidate", rescore_candidate)
+    rescorer = CandidateRescorer()
+    rescorer.schedule(None, "a@x.com")
+    await rescorer.drain()
+    assert rescorer.pending == 0
+
+
+async def test_ranking_without_a_model_is_unavailable(db, monkeypatch):
+    def no_model():
+        raise FileNotFoundError("model.pkl is not a pickled vectorizer")
+
+    recruiter = {"Authorization": "Bearer " + create_access_token({"sub": "r@x.com", "role": "recruiter"})}
+    job = await db.jobs.insert_one({"title": "Engineer", "description": "python", "posted_by": "r@x.com"})
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        monkeypatch.setattr(candidate_ranking, "JobMatcher", no_model)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for path in ("ranking", "shortlist"):
+                response = await client.get(f"/recruiter/job/{job.inserted_id}/{path}", headers=recruiter)
+                assert response.status_code == 503
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.services import chat_hub as chat_hub_module
+from src.services.chat_memory import ChatMemory, ChatMemoryStore
+from src.services.llm_gateway import LLMGateway
+from src.utils.jwt_handler import create_access_token
+
+TOKEN = create_access_token({"sub": "c@x.com", "role": "candidate"})
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    memory = ChatMemory(ChatMemoryStore(str(tmp_path / "chat_memory.sqlite")), max_chars=10_000)
+    monkeypatch.setattr(chat_hub_module, "chat_memory", memory)
+    return memory
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    async def stream(messages, **kwargs):
+        for token in ("Hello", " there"):
+            yield token
+
+    monkeypatch.setattr(chat_hub_module.llm_gateway, "stream", stream)
+
+
+def test_exchange_is_stored_when_client_leaves_after_done(memory, llm):
+    with TestClient(main.app).websocket_connect(f"/chat/ws?token={TOKEN}") as ws:
+        ws.send_json({"type": "message", "content": "Hi"})
+        frames = [ws.receive_json() for _ in range(3)]
+    assert [frame["type"] for frame in frames] == ["token", "token", "done"]
+    assert memory.load("c@x.com")["turns"] == [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello there"},
+    ]
+
+
+def test_malformed_stream_line_sends_an_error_frame(memory, monkeypatch):
+    def provider(request):
+        return httpx.Response(200, text='data: {"choices": [{"delta": {"content": "Hel"}}]}\n\ndata: {oops\n\n')
+
+    gateway = LLMGateway(provider="openai", base_url="http://llm", transport=httpx.MockTransport(provider))
+    monkeypatch.setattr(chat_hub_module, "llm_gateway", gateway)
+    with TestClient(main.app).websocket_connect(f"/chat/ws?token={TOKEN}") as ws:
+        ws.send_json({"type": "message", "content": "Hi"})
+        frames = [ws.receive_json() for _ in range(2)]
+        assert [frame["type"] for frame in frames] == ["token", "error"]
+        assert "malformed" in frames[1]["detail"]
+        # The connection survives and takes the next message
+        ws.send_json({"type": "message", "content": "Again"})
+        assert ws.receive_json()["type"] == "token"
+    assert memory.load("c@x.com")["turns"] == []
+
+
+def test_binary_frame_closes_with_unsupported_data(memory):
+    with TestClient(main.app).websocket_connect(f"/chat/ws?token={TOKEN}") as ws:
+        ws.send_bytes(b"\x00\x01")
+        message = ws.receive()
+    assert message["type"] == "websocket.close"
+    assert message["code"] == chat_hub_module.UNSUPPORTED_DATA
+
+
+@pytest.mark.anyio
+async def test_cancelled_compaction_keeps_the_exchange(tmp_path, monkeypatch):
+    memory = ChatMemory(ChatMemoryStore(str(tmp_path / "chat_memory.sqlite")), max_chars=10, keep_turns=1)
+    summarizing = asyncio.Event()
+
+    async def summarize(summary, turns):
+        summarizing.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(memory, "summarize", summarize)
+    conversation = {"summary": "", "turns": [{"role": "user", "content": "an older question"},
+                                             {"role": "assistant", "content": "an older answer"}]}
+    task = asyncio.create_task(memory.record("c@x.com", conversation, "new question", "new answer"))
+    await summarizing.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert [turn["content"] for turn in memory.load("c@x.com")["turns"]] == [
+        "an older question", "an older answer", "new question", "new answer"
+    ]
+    assert len(conversation["turns"]) == 4
+
+
+def test_stream_and_questions_require_a_signed_in_user(llm):
+    client = TestClient(main.app)
+    assert client.post("/chat/stream", json={"message": "Hi"}).status_code in (401, 403)
+    assert client.get("/chat/questions", params={"job_role": "Engineer"}).status_code in (401, 403)
+
+    response = client.post("/chat/stream", json={"message": "Hi"}, headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert response.text.count("event: token") == 2 and "event: done" in response.text
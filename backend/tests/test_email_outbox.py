@@ -0,0 +1,68 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from src.config import settings
+from src.services.email_outbox import OUTBOX_COLLECTION, OutboxSender, enqueue_emails
+
+pytestmark = pytest.mark.anyio
+
+
+class Sink:
+    """SMTP handler that keeps every message, refusing recipients in ``reject``."""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    sink = Sink(reject={"nobody@x.com"})
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(settings, "SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", port)
+    monkeypatch.setattr(settings, "SMTP_START_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_USERNAME", "")
+    yield sink
+    controller.stop()
+
+
+def message(to):
+    return {"to": to, "subject": "Interview invitation", "body": "Hello", "reply_to": "r@x.com"}
+
+
+async def test_drain_sends_queued_messages(db, smtp):
+    await enqueue_emails(db, [message(f"c{i}@x.com") for i in range(5)])
+    sender = OutboxSender(db, connections=2, rate=1000)
+    await sender.drain()
+
+    assert sender.stats()["sent"] == 5
+    assert sorted(envelope.rcpt_tos[0] for envelope in smtp.messages) == [f"c{i}@x.com" for i in range(5)]
+    assert b"Reply-To: r@x.com" in smtp.messages[0].content
+    assert await db[OUTBOX_COLLECTION].count_documents({"status": "sent"}) == 5
+
+
+async def test_refused_recipient_fails_without_retry(db, smtp):
+    await enqueue_emails(db, [message("nobody@x.com"), message("c@x.com")])
+    sender = OutboxSender(db, connections=1, rate=1000, max_attempts=5)
+    await sender.drain()
+
+    refused = await db[OUTBOX_COLLECTION].find_one({"to": "nobody@x.com"})
+    assert refused["status"] == "failed" and refused["attempts"] == 1
+    assert [envelope.rcpt_tos for envelope in smtp.messages] == [["c@x.com"]]
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from src import main
+from src.database.indexes import ensure_indexes
+from src.services import interview_scheduler
+from src.services.email_outbox import OUTBOX_COLLECTION
+from src.services.interview_scheduler import (
+    INTERVIEWS_COLLECTION,
+    SLOTS_COLLECTION,
+    SlotGrid,
+    allocate_slots,
+    schedule_interviews,
+)
+from src.utils.jwt_handler import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+# A Monday, so the first slots fall inside working hours
+MONDAY = datetime(2030, 1, 7, 9, 0)
+
+
+def test_allocate_slots_spreads_candidates_over_interviewers():
+    grid = SlotGrid(MONDAY, days=1, slot_minutes=30)
+    hours = grid.working_hours(9, 17)
+    assignments = allocate_slots({"a@x.com": hours, "b@x.com": hours}, ["c1", "c2", "c3"], length=2)
+    assert [(interviewer, first) for _, interviewer, first in assignments] == [
+        ("a@x.com", 0), ("b@x.com", 0), ("a@x.com", 2)
+    ]
+
+
+def test_allocate_slots_reports_candidates_that_do_not_fit():
+    grid = SlotGrid(MONDAY, days=1, slot_minutes=30)
+    assignments = allocate_slots({"a@x.com": grid.span(MONDAY, MONDAY + timedelta(hours=1))}, ["c1", "c2"], length=2)
+    assert assignments[1] == ("c2", None, None)
+
+
+async def test_timezone_aware_start_after_books_again(db):
+    recruiter = {"Authorization": "Bearer " + create_access_token({"sub": "r@x.com", "role": "recruiter"})}
+    job = await db.jobs.insert_one({"title": "Engineer", "posted_by": "r@x.com"})
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for candidate in ("c1@x.com", "c2@x.com"):
+                response = await client.post("/interview/schedule", headers=recruiter, json={
+                    "job_id": str(job.inserted_id), "candidates": [candidate], "start_after": "2030-01-07T09:00:00Z",
+                })
+                assert response.status_code == 201, response.text
+    starts = [doc["start"] async for doc in db[INTERVIEWS_COLLECTION].find().sort("start", 1)]
+    assert len(starts) == 2 and starts[0] < starts[1]
+    assert all(start.tzinfo is None for start in starts)
+
+
+async def test_slot_taken_by_another_process_is_rebooked(db, monkeypatch):
+    await ensure_indexes(db)
+    job = {"_id": ObjectId(), "title": "Engineer"}
+    load_calendars = interview_scheduler.load_calendars
+    calls = []
+
+    async def stale_then_fresh(db, grid, interviewers):
+        calendars = await load_calendars(db, grid, interviewers)
+        if not calls:
+            # Another process books the first slot after this calendar was read
+            await db[INTERVIEWS_COLLECTION].insert_one({
+                "job_id": ObjectId(), "candidate_email": "other@x.com", "recruiter_email": "r@x.com",
+                "start": grid.time(0), "end": grid.time(1), "status": "scheduled",
+            })
+        calls.append(grid)
+        return calendars
+
+    monkeypatch.setattr(interview_scheduler, "load_calendars", stale_then_fresh)
+    booked, unplaced = await schedule_interviews(db, job, ["c1@x.com", "c2@x.com"], ["r@x.com"], start_after=MONDAY)
+
+    assert unplaced == [] and len(calls) == 2
+    assert sorted(interview["candidate_email"] for interview in booked) == ["c1@x.com", "c2@x.com"]
+    assert MONDAY not in {interview["start"] for interview in booked}
+    invited = {doc["to"] async for doc in db[OUTBOX_COLLECTION].find()}
+    assert invited == {"c1@x.com", "c2@x.com"}
+
+
+async def test_overlapping_booking_with_another_start_is_rebooked(db, monkeypatch):
+    await ensure_indexes(db)
+    job = {"_id": ObjectId(), "title": "Engineer"}
+    load_calendars = interview_scheduler.load_calendars
+    calls = []
+
+    async def stale_then_fresh(db, grid, interviewers):
+        calendars = await load_calendars(db, grid, interviewers)
+        if not calls:
+            # Another process books slots 1-2, overlapping the hour this one picks at slot 0
+            other = {
+                "_id": ObjectId(), "job_id": ObjectId(), "candidate_email": "other@x.com", "recruiter_email": "r@x.com",
+                "start": grid.time(1), "end": grid.time(3), "status": "scheduled",
+            }
+            assert await interview_scheduler._insert_interviews(db, [other], [], grid.slot) == []
+        calls.append(grid)
+        return calendars
+
+    monkeypatch.setattr(interview_scheduler, "load_calendars", stale_then_fresh)
+    booked, unplaced = await schedule_interviews(
+        db, job, ["c1@x.com"], ["r@x.com"], duration_minutes=60, start_after=MONDAY
+    )
+
+    assert unplaced == [] and len(calls) == 2
+    [interview] = booked
+    assert interview["start"] >= MONDAY + timedelta(minutes=90)
+    held = [slot["interview_id"] async for slot in db[SLOTS_COLLECTION].find()]
+    assert held.count(interview["_id"]) == 2 and len(held) == 4
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from src.services import job_listing
+from src.services.job_listing import JobListCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_page_read_before_invalidate_is_not_cached(db, monkeypatch):
+    cache = JobListCache()
+    await db.jobs.insert_one({"title": "Old"})
+    reading, release = asyncio.Event(), asyncio.Event()
+    list_jobs = job_listing.list_jobs
+
+    async def slow_list_jobs(*args):
+        page = await list_jobs(*args)
+        reading.set()
+        await release.wait()
+        return page
+
+    monkeypatch.setattr(job_listing, "list_jobs", slow_list_jobs)
+    stale = asyncio.create_task(cache.page("all", db, {}, ["title"], 20, None))
+    await reading.wait()
+    await db.jobs.insert_one({"title": "New"})
+    cache.invalidate()
+    release.set()
+    await stale
+
+    monkeypatch.setattr(job_listing, "list_jobs", list_jobs)
+    body, _ = await cache.page("all", db, {}, ["title"], 20, None)
+    assert b"New" in body
+
+
+async def test_page_is_served_from_cache(db):
+    cache = JobListCache()
+    await db.jobs.insert_one({"title": "Old"})
+    first = await cache.page("all", db, {}, ["title"], 20, None)
+    await db.jobs.insert_one({"title": "New"})
+    assert await cache.page("all", db, {}, ["title"], 20, None) == first
+    cache.invalidate()
+    assert await cache.page("all", db, {}, ["title"], 20, None) != first
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from src import main
+from src.config import settings
+from src.services.match_worker import (
+    CHANGE_LOG_COLLECTION,
+    MATCHES_COLLECTION,
+    MatchWorker,
+    PollingChangeSource,
+    _change_event,
+    log_change,
+)
+from src.utils.jwt_handler import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+PROFILE = {"location": "Remote", "resume": "cv.pdf"}
+
+
+def auth(email, role):
+    return {"Authorization": "Bearer " + create_access_token({"sub": email, "role": role})}
+
+
+async def wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+def change_log(monkeypatch):
+    monkeypatch.setattr(settings, "MATCH_CHANGE_LOG", True)
+
+
+async def test_log_change_is_a_noop_unless_enabled(db, monkeypatch):
+    monkeypatch.setattr(settings, "MATCH_CHANGE_LOG", False)
+    await log_change(db, "jobs", "insert", 1)
+    assert await db[CHANGE_LOG_COLLECTION].count_documents({}) == 0
+
+
+async def test_polling_source_resumes_after_token(db, change_log):
+    await log_change(db, "jobs", "insert", 1)
+    source = PollingChangeSource(db, poll_interval=0)
+    start = await source.open()  # starts after the existing event
+    await log_change(db, "jobs", "update", 2)
+    await log_change(db, "candidates", "update", 3)
+
+    changes = await source.batch(10)
+    assert [event["documentKey"]["_id"] for _, event in changes] == [2, 3]
+    assert await source.batch(10) == []
+
+    # Resuming replays the overlap window; applying an event again is harmless
+    replay = PollingChangeSource(db, poll_interval=0)
+    await replay.open(start)
+    assert [event["documentKey"]["_id"] for _, event in await replay.batch(10)] == [1, 2, 3]
+
+
+async def test_polling_source_picks_up_an_event_committed_late(db, change_log):
+    source = PollingChangeSource(db, poll_interval=0, overlap_seconds=10)
+    await source.open()
+    await log_change(db, "jobs", "insert", 1)
+    [(token, first)] = await source.batch(10)
+
+    # Another app process generated its ObjectId earlier but committed after the poll
+    late = ObjectId.from_datetime(first["_id"].generation_time - timedelta(seconds=2))
+    await db[CHANGE_LOG_COLLECTION].insert_one({**_change_event("jobs", "insert", 2, None), "_id": late})
+    changes = await source.batch(10)
+    assert [event["documentKey"]["_id"] for _, event in changes] == [2]
+    assert changes[0][0] == token  # the newest id seen does not move back
+    assert await source.batch(10) == []
+
+
+async def test_worker_follows_app_writes(db, change_log):
+    worker = MatchWorker(db, PollingChangeSource(db, poll_interval=0.01), min_score=0.1)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/candidate/profile", headers=auth("c@x.com", "candidate"),
+                json={**PROFILE, "bio": "react typescript frontend", "skills": ["react"]},
+            )
+            assert response.status_code == 200
+            task = asyncio.create_task(worker.run())
+            try:
+                response = await client.post(
+                    "/recruiter/job", headers=auth("r@x.com", "recruiter"),
+                    json={"title": "Backend engineer", "description": "python fastapi mongodb",
+                          "location": "Remote", "skills_required": ["python"]},
+                )
+                job_id = response.json()["job_id"]
+
+                async def matched():
+                    return await db[MATCHES_COLLECTION].count_documents({"email": "c@x.com"}) > 0
+
+                # The job doesn't match the profile yet; editing the profile is picked up from the log
+                await wait_for(lambda: _drained(db, worker))
+                assert not await matched()
+                await client.post(
+                    "/candidate/profile", headers=auth("c@x.com", "candidate"),
+                    json={**PROFILE, "bio": "python backend engineer", "skills": ["python"]},
+                )
+                await wait_for(matched)
+                match = await db[MATCHES_COLLECTION].find_one({"email": "c@x.com"})
+                assert str(match["job_id"]) == job_id
+            finally:
+                worker.stop()
+                await task
+
+
+async def _drained(db, worker):
+    checkpoint = await worker.load_checkpoint()
+    last = await db[CHANGE_LOG_COLLECTION].find_one({}, sort=[("_id", -1)])
+    return checkpoint is not None and last is not None and checkpoint["token"] == {"_id": last["_id"]}
@@ -0,0 +1,99 @@
+import asyncio
+import io
+import threading
+import zipfile
+
+import pytest
+
+from src.services.pipeline import DONE, FAILED, PARSE, Pipeline, TaskStore
+
+pytestmark = pytest.mark.anyio
+
+
+async def summarize(text):
+    return {"summary": text}
+
+
+async def parse(data):
+    if data.startswith(b"PK"):
+        raise ValueError("Not a PDF")
+    text = data.decode()
+    return {"full_text": text, "extracted_skills": []}
+
+
+async def score(jd, texts):
+    return [1.0 if "python" in text else 0.0 for text in texts]
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return Pipeline(TaskStore(str(tmp_path / "pipeline.sqlite")), summarize=summarize, parse=parse, score=score)
+
+
+@pytest.fixture
+def resumes(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"a@x.com python")
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("b.pdf", "b@x.com java")
+    (tmp_path / "cvs.zip").write_bytes(archive.getvalue())
+    (tmp_path / "corrupt.zip").write_bytes(b"PK\x03\x04 not really a zip")
+    return tmp_path
+
+
+async def test_unreadable_archives_fail_their_own_tasks(pipeline, resumes):
+    paths = [resumes / "a.pdf", resumes / "cvs.zip", resumes / "missing.zip", resumes / "corrupt.zip"]
+    run_id = pipeline.create("python developer", [str(path) for path in paths], top_k=5)
+
+    report = await asyncio.wait_for(pipeline.run(run_id), 10)
+
+    assert report["status"] == DONE
+    failed = {failure["key"] for failure in pipeline.store.failures(run_id) if failure["stage"] == PARSE}
+    assert failed == {str(resumes / "missing.zip"), str(resumes / "corrupt.zip")}
+    shortlisted = pipeline.store.completed(run_id, "shortlist")["job"]["shortlist"]
+    assert [candidate["email"] for candidate in shortlisted] == ["a@x.com"]
+
+
+async def test_crashed_stage_fails_the_run(pipeline, resumes, monkeypatch):
+    def broken_finish(*args):
+        raise RuntimeError("disk full")
+
+    run_id = pipeline.create("python developer", [str(resumes / "a.pdf")])
+    monkeypatch.setattr(pipeline.store, "finish", broken_finish)
+
+    report = await asyncio.wait_for(pipeline.run(run_id), 10)
+    assert report["status"] == FAILED
+
+
+async def test_archives_are_closed_after_the_run(pipeline, resumes, monkeypatch):
+    opened = []
+    real_open = open
+
+    def tracking_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        opened.append(f)
+        return f
+
+    monkeypatch.setattr("builtins.open", tracking_open)
+    run_id = pipeline.create("python developer", [str(resumes / "cvs.zip")])
+    await asyncio.wait_for(pipeline.run(run_id), 10)
+    archives = [f for f in opened if getattr(f, "name", "").endswith("cvs.zip")]
+    assert archives and all(f.closed for f in archives)
+
+
+async def test_task_state_is_written_off_the_event_loop(pipeline, resumes, monkeypatch):
+    loop_thread = threading.current_thread()
+    threads = set()
+    for name in ("start", "finish", "fail"):
+        method = getattr(pipeline.store, name)
+
+        def recording(*args, method=method):
+            threads.add(threading.current_thread())
+            return method(*args)
+
+        monkeypatch.setattr(pipeline.store, name, recording)
+
+    run_id = pipeline.create("python developer", [str(resumes / "a.pdf"), str(resumes / "missing.zip")])
+    report = await asyncio.wait_for(pipeline.run(run_id), 10)
+    assert report["status"] == DONE
+    assert threads and loop_thread not in threads
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+
+from src import main
+from src.services import resume_ingest
+from src.utils.jwt_handler import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+def auth(email, role):
+    return {"Authorization": "Bearer " + create_access_token({"sub": email, "role": role})}
+
+
+@pytest.fixture
+async def client(db):
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture
+def ingest(monkeypatch):
+    calls = {"indexed": [], "rescored": []}
+
+    async def parse_resume(data):
+        return {"full_text": data.decode(), "extracted_skills": [], "skill_categories": {}, "education": [],
+                "experience": [], "certifications": []}
+
+    async def index_documents(db, kind, ids):
+        calls["indexed"].extend(ids)
+
+    def schedule(db, email):
+        calls["rescored"].append(email)
+
+    monkeypatch.setattr(resume_ingest, "parse_resume", parse_resume)
+    monkeypatch.setattr(resume_ingest, "index_documents", index_documents)
+    monkeypatch.setattr(resume_ingest.candidate_rescorer, "schedule", schedule)
+    return calls
+
+
+FILES = [("files", ("a.pdf", b"Jane Doe jane@Example.com python", "application/pdf")),
+         ("files", ("b.pdf", b"No contact details", "application/pdf"))]
+
+
+async def test_bulk_upload_requires_a_recruiter(client, ingest):
+    assert (await client.post("/resume/bulk", files=FILES)).status_code in (401, 403)
+    response = await client.post("/resume/bulk", files=FILES, headers=auth("c@x.com", "candidate"))
+    assert response.status_code == 403
+    assert ingest["indexed"] == []
+
+
+async def test_bulk_upload_indexes_and_rescores(client, db, ingest):
+    response = await client.post("/resume/bulk", files=FILES, headers=auth("r@x.com", "recruiter"))
+    assert response.status_code == 200
+    assert '"inserted": 2' in response.text
+    ids = [doc["_id"] async for doc in db.resumes.find()]
+    assert sorted(ingest["indexed"]) == sorted(ids)
+    assert ingest["rescored"] == ["jane@example.com"]
+
+
+async def test_resume_file_upload_requires_sign_in(client):
+    response = await client.post("/resume", params={"email": "victim@x.com"},
+                                 files={"file": ("cv.pdf", b"%PDF-1.4", "application/pdf")})
+    assert response.status_code in (401, 403)